@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# Validates application configuration files against the option schema and
+# compiles them in to a single bundle that FEX can mmap and look up by executable name.
+#
+# Usage: app_config_generator.py <Config.json> <Output bundle> <AppConfig.json>...
+#
+# The bundle has to be built from every installed configuration. When it's present FEX doesn't
+# read the installed json files, an application missing from the bundle has no installed configuration.
+#
+# Bundle layout, everything is a little endian uint32_t:
+#  - Header: Magic, Version, EntryCount, Size of the whole bundle
+#  - EntryCount entries: NameHash, NameOffset, OptionsOffset, OptionCount
+#    Open addressed by NameHash & (EntryCount - 1) with linear probing, NameOffset 0 is an empty slot.
+#  - Per application OptionCount options: NameOffset, ValueOffset
+#  - NUL terminated strings
+# Offsets are from the start of the bundle. See Interface/Config/AppConfigBundle.h for the reader.
+import json
+import os
+import re
+import struct
+import sys
+
+BundleMagic = 0x43415846 # 'FXAC'
+BundleVersion = 1
+
+HeaderFormat = "<IIII"
+EntryFormat = "<IIII"
+OptionFormat = "<II"
+
+IntegerRanges = {
+    "bool": (0, 1),
+    "uint8": (0, 0xFF),
+    "int32": (-0x80000000, 0x7FFFFFFF),
+    "uint32": (0, 0xFFFFFFFF),
+    "uint64": (0, 0xFFFFFFFFFFFFFFFF),
+}
+
+# Sections FEX reads from application configs besides Config
+# ThunksDB enables or disables thunk libraries by name, FileManagement reads it from the json files, it isn't bundled
+OtherSections = ["ThunksDB"]
+
+# Matches what std::stoi and std::stoull accept with base 0
+IntegerPattern = re.compile(r"^\s*[+-]?(0[xX][0-9a-fA-F]+|0[0-7]*|[1-9][0-9]*)$")
+
+def app_name_hash(name):
+    # 32-bit FNV-1a, matches HashAppName in Config.cpp
+    hash = 0x811c9dc5
+    for c in name.encode("utf-8"):
+        hash ^= c
+        hash = (hash * 0x01000193) & 0xFFFFFFFF
+    return hash
+
+def get_app_name(filename):
+    name = os.path.basename(filename)
+    if not name.endswith(".json"):
+        raise Exception("Application config '{0}' isn't a .json file".format(filename))
+    return name[:-len(".json")]
+
+def load_schema(filename):
+    with open(filename, "r") as json_file:
+        json_object = json.load(json_file)
+
+    # Only named options can be set from a config file
+    schema = {}
+    for op_group, group_vals in json_object["Options"].items():
+        for op_key, op_vals in group_vals.items():
+            schema[op_key] = op_vals
+
+    return schema
+
+def check_option_value(filename, name, value, op_vals):
+    if not isinstance(value, str):
+        raise Exception("{0}: '{1}' needs a string value".format(filename, name))
+
+    value_type = op_vals["Type"]
+    if value_type in IntegerRanges:
+        if not IntegerPattern.match(value):
+            raise Exception("{0}: '{1}' is a {2} option, '{3}' isn't an integer".format(filename, name, value_type, value))
+
+        Low, High = IntegerRanges[value_type]
+        Stripped = value.strip()
+        Negative = Stripped.startswith("-")
+        Digits = Stripped.lstrip("+-")
+        if Digits.lower().startswith("0x"):
+            Parsed = int(Digits, 16)
+        elif Digits.startswith("0") and len(Digits) > 1:
+            Parsed = int(Digits, 8)
+        else:
+            Parsed = int(Digits, 10)
+
+        if Negative:
+            Parsed = -Parsed
+
+        if Parsed < Low or Parsed > High:
+            raise Exception("{0}: '{1}' value '{2}' is out of range for a {3} option".format(filename, name, value, value_type))
+    elif value_type == "str":
+        if "Choices" in op_vals and value not in op_vals["Choices"]:
+            raise Exception("{0}: '{1}' value '{2}' isn't one of {3}".format(filename, name, value, op_vals["Choices"]))
+
+def check_thunks_db(filename, thunks_db):
+    if not isinstance(thunks_db, dict):
+        raise Exception("{0}: ThunksDB section needs to be a JSON object".format(filename))
+
+    # Library name to 1 if its thunk is enabled, 0 if not
+    for library, enabled in thunks_db.items():
+        if type(enabled) != int or enabled not in [0, 1]:
+            raise Exception("{0}: ThunksDB entry '{1}' needs to be 0 or 1".format(filename, library))
+
+def load_app_config(filename, schema):
+    with open(filename, "r") as json_file:
+        try:
+            json_object = json.load(json_file)
+        except json.JSONDecodeError as e:
+            raise Exception("{0}: {1}".format(filename, e))
+
+    if not isinstance(json_object, dict):
+        raise Exception("{0}: Needs to be a JSON object".format(filename))
+
+    for key in json_object.keys():
+        if key != "Config" and key not in OtherSections:
+            raise Exception("{0}: Unknown section '{1}'".format(filename, key))
+
+    check_thunks_db(filename, json_object.get("ThunksDB", {}))
+
+    options = []
+    # A file without a Config section is valid, it just doesn't set anything
+    config = json_object.get("Config", {})
+    if not isinstance(config, dict):
+        raise Exception("{0}: Config section needs to be a JSON object".format(filename))
+
+    for name, value in config.items():
+        if name not in schema:
+            raise Exception("{0}: Unknown option '{1}'".format(filename, name))
+
+        check_option_value(filename, name, value, schema[name])
+        options.append((name, value))
+
+    return options
+
+class StringTable:
+    def __init__(self, base):
+        self.Base = base
+        self.Data = bytearray()
+        self.Offsets = {}
+
+    def add(self, string):
+        if string not in self.Offsets:
+            self.Offsets[string] = self.Base + len(self.Data)
+            self.Data += string.encode("utf-8") + b"\0"
+        return self.Offsets[string]
+
+def build_bundle(apps):
+    # Keep the table at most half full so probe sequences stay short
+    entry_count = 1
+    while entry_count < len(apps) * 2:
+        entry_count *= 2
+    mask = entry_count - 1
+
+    option_count = sum(len(options) for options in apps.values())
+    options_base = struct.calcsize(HeaderFormat) + struct.calcsize(EntryFormat) * entry_count
+    strings = StringTable(options_base + struct.calcsize(OptionFormat) * option_count)
+
+    entries = [(0, 0, 0, 0)] * entry_count
+    option_data = bytearray()
+
+    # Sorted so the bundle is reproducible
+    for name in sorted(apps.keys()):
+        options = apps[name]
+        hash = app_name_hash(name)
+        slot = hash & mask
+        while entries[slot][1] != 0:
+            slot = (slot + 1) & mask
+
+        entries[slot] = (hash, strings.add(name), options_base + len(option_data), len(options))
+        for option_name, option_value in options:
+            option_data += struct.pack(OptionFormat, strings.add(option_name), strings.add(option_value))
+
+    size = strings.Base + len(strings.Data)
+    bundle = bytearray(struct.pack(HeaderFormat, BundleMagic, BundleVersion, entry_count, size))
+    for entry in entries:
+        bundle += struct.pack(EntryFormat, *entry)
+    bundle += option_data
+    bundle += strings.Data
+
+    return bytes(bundle)
+
+if (len(sys.argv) < 3):
+    sys.exit("Usage: {0} <Config.json> <Output bundle> <AppConfig.json>...".format(sys.argv[0]))
+
+schema = load_schema(sys.argv[1])
+
+apps = {}
+for filename in sys.argv[3:]:
+    name = get_app_name(filename)
+    if name in apps:
+        raise Exception("Application config for '{0}' is duplicated by '{1}'".format(name, filename))
+
+    apps[name] = load_app_config(filename, schema)
+
+with open(sys.argv[2], "wb") as output_file:
+    output_file.write(build_bundle(apps))
@@ -238,6 +238,8 @@ def print_man_tail():
 Default FEX user configuration directory
 .It Pa $prefix/share/fex-emu/AppConfig
 System level application configuration files
+.It Pa $prefix/share/fex-emu/AppConfig.bin
+System level application configurations compiled for lookup, used instead of the AppConfig folder when present
 .It Pa $prefix/share/fex-emu/GuestThunks
 guest-side thunk data libraries
 .It Pa $prefix/lib/fex-emu/HostThunks
@@ -370,14 +372,9 @@ def print_parse_argloader_options(options):
             output_argloader.write("if (Options.is_set_by_user(\"{0}\")) {{\n".format(op_key))
 
             value_type = op_vals["Type"]
-            NeedsString = False
-            conversion_func = "std::to_string"
+            conversion_func = ""
             if ("ArgumentHandler" in op_vals):
-                NeedsString = True
                 conversion_func = "FEXCore::Config::Handler::{0}".format(op_vals["ArgumentHandler"])
-            if (value_type == "str"):
-                NeedsString = True
-                conversion_func = ""
 
             if (value_type == "strarray"):
                 # these need a bit more help
@@ -386,30 +383,221 @@ def print_parse_argloader_options(options):
                 output_argloader.write("\t\tSet(FEXCore::Config::ConfigOption::CONFIG_{0}, *iter);\n".format(op_key.upper()))
                 output_argloader.write("\t}\n")
             else:
-                if (NeedsString):
-                    output_argloader.write("\tstd::string UserValue = Options[\"{0}\"];\n".format(op_key))
-                else:
-                    output_argloader.write("\t{0} UserValue = Options.get(\"{1}\");\n".format(value_type, op_key))
-
-                output_argloader.write("\tSet(FEXCore::Config::ConfigOption::CONFIG_{0}, {1}(UserValue));\n".format(op_key.upper(), conversion_func))
+                # The parser already holds the argument as a string, forward it rather than converting it to a value and back
+                output_argloader.write("\tSet(FEXCore::Config::ConfigOption::CONFIG_{0}, {1}(Options[\"{2}\"]));\n".format(op_key.upper(), conversion_func, op_key))
             output_argloader.write("}\n")
 
     output_argloader.write("#endif\n")
 
 
+def env_option_hash(seed, name):
+    # 32-bit FNV-1a with the seed folded in to the offset basis, matches EnvOptionHash in the generated code
+    hash = 0x811c9dc5 ^ seed
+    for c in name.encode("utf-8"):
+        hash ^= c
+        hash = (hash * 0x01000193) & 0xFFFFFFFF
+    return hash
+
+def get_env_option_perfect_hash(names):
+    # Hash and displace
+    # Every name is first bucketed with seed 0, each bucket then gets a seed that moves its names in to free slots.
+    # Buckets with a single name are placed directly, stored as a negative slot index.
+    size = 1
+    while size < len(names):
+        size *= 2
+    mask = size - 1
+
+    buckets = [[] for i in range(0, size)]
+    for name in names:
+        buckets[env_option_hash(0, name) & mask].append(name)
+
+    displacements = [0] * size
+    slots = [None] * size
+    order = sorted(range(0, size), key = lambda i: len(buckets[i]), reverse = True)
+
+    for bucket_index in order:
+        bucket = buckets[bucket_index]
+        if len(bucket) <= 1:
+            break
+
+        seed = 1
+        while True:
+            placed = [env_option_hash(seed, name) & mask for name in bucket]
+            if len(set(placed)) == len(placed) and all(slots[slot] == None for slot in placed):
+                break
+            seed += 1
+            if seed > 0x7FFFFFFF:
+                raise Exception("Couldn't find a perfect hash for the environment options")
+
+        displacements[bucket_index] = seed
+        for name, slot in zip(bucket, placed):
+            slots[slot] = name
+
+    free_slots = [slot for slot in range(0, size) if slots[slot] == None]
+    for bucket_index in order:
+        bucket = buckets[bucket_index]
+        if len(bucket) != 1:
+            continue
+
+        slot = free_slots.pop()
+        displacements[bucket_index] = -slot - 1
+        slots[slot] = bucket[0]
+
+    return displacements, slots
+
+def print_parse_envloader_table(options, unnamed_options):
+    output_argloader.write("#ifdef ENVLOADER_TABLE\n")
+    output_argloader.write("#undef ENVLOADER_TABLE\n")
+
+    # FEX_<OPTION> to option and its argument handler
+    env_options = {}
+    for group_options in (options, unnamed_options):
+        for op_group, group_vals in group_options.items():
+            for op_key, op_vals in group_vals.items():
+                handler = "nullptr"
+                if ("ArgumentHandler" in op_vals):
+                    handler = "FEXCore::Config::Handler::{0}".format(op_vals["ArgumentHandler"])
+                env_options["FEX_{0}".format(op_key.upper())] = (op_key.upper(), handler)
+
+    displacements, slots = get_env_option_perfect_hash(list(env_options.keys()))
+
+    output_argloader.write("struct EnvOption {\n")
+    output_argloader.write("\tstd::string_view Name;\n")
+    output_argloader.write("\tFEXCore::Config::ConfigOption Option;\n")
+    output_argloader.write("\tstd::string_view (*Handler)(std::string_view);\n")
+    output_argloader.write("};\n\n")
+
+    output_argloader.write("static constexpr uint32_t EnvOptionMask = {0};\n\n".format(len(slots) - 1))
+
+    output_argloader.write("static constexpr std::array<int32_t, {0}> EnvOptionDisplacements = {{{{\n".format(len(displacements)))
+    for displacement in displacements:
+        output_argloader.write("\t{0},\n".format(displacement))
+    output_argloader.write("}};\n\n")
+
+    output_argloader.write("static constexpr std::array<EnvOption, {0}> EnvOptionTable = {{{{\n".format(len(slots)))
+    for name in slots:
+        if (name == None):
+            output_argloader.write("\t{},\n")
+        else:
+            enum, handler = env_options[name]
+            output_argloader.write("\t{{\"{0}\", FEXCore::Config::ConfigOption::CONFIG_{1}, {2}}},\n".format(name, enum, handler))
+    output_argloader.write("}};\n\n")
+
+    output_argloader.write("static constexpr uint32_t EnvOptionHash(uint32_t Seed, std::string_view Name) {\n")
+    output_argloader.write("\tuint32_t Hash = 0x811c9dc5U ^ Seed;\n")
+    output_argloader.write("\tfor (char c : Name) {\n")
+    output_argloader.write("\t\tHash ^= static_cast<uint8_t>(c);\n")
+    output_argloader.write("\t\tHash *= 0x01000193U;\n")
+    output_argloader.write("\t}\n")
+    output_argloader.write("\treturn Hash;\n")
+    output_argloader.write("}\n\n")
+
+    output_argloader.write("// Returns the option for a FEX_* environment variable, nullptr for anything else\n")
+    output_argloader.write("[[maybe_unused]] static constexpr const EnvOption *LookupEnvOption(std::string_view Key) {\n")
+    output_argloader.write("\tif (!Key.starts_with(\"FEX_\")) {\n")
+    output_argloader.write("\t\treturn nullptr;\n")
+    output_argloader.write("\t}\n\n")
+    output_argloader.write("\tconst int32_t Displacement = EnvOptionDisplacements[EnvOptionHash(0, Key) & EnvOptionMask];\n")
+    output_argloader.write("\tconst uint32_t Slot = Displacement < 0 ? -Displacement - 1 : EnvOptionHash(Displacement, Key) & EnvOptionMask;\n")
+    output_argloader.write("\tconst auto &Entry = EnvOptionTable[Slot];\n")
+    output_argloader.write("\treturn Entry.Name == Key ? &Entry : nullptr;\n")
+    output_argloader.write("}\n\n")
+
+    output_argloader.write("static_assert([] {\n")
+    output_argloader.write("\tfor (const auto &Entry : EnvOptionTable) {\n")
+    output_argloader.write("\t\tif (!Entry.Name.empty() && LookupEnvOption(Entry.Name) != &Entry) {\n")
+    output_argloader.write("\t\t\treturn false;\n")
+    output_argloader.write("\t\t}\n")
+    output_argloader.write("\t}\n")
+    output_argloader.write("\treturn true;\n")
+    output_argloader.write("}(), \"Environment option hash isn't perfect\");\n")
+
+    output_argloader.write("#endif\n")
+
 def print_parse_envloader_options(options):
     output_argloader.write("#ifdef ENVLOADER\n")
     output_argloader.write("#undef ENVLOADER\n")
-    output_argloader.write("if (false) {}\n")
+    output_argloader.write("if (const auto *Option = LookupEnvOption(Key)) {\n")
+    output_argloader.write("\tEraseSet(Option->Option, Option->Handler ? Option->Handler(Value) : Value);\n")
+    output_argloader.write("}\n")
+    output_argloader.write("#endif\n")
 
+TypedValueTypes = {
+    "bool": "bool",
+    "uint8": "uint8_t",
+    "int32": "int32_t",
+    "uint32": "uint32_t",
+    "uint64": "uint64_t",
+    "str": "std::string",
+}
+
+def get_typed_options(options, unnamed_options):
+    # (Field name, ConfigOption enum, C++ type) of every option that holds a single value
+    typed_options = []
     for op_group, group_vals in options.items():
         for op_key, op_vals in group_vals.items():
-            if ("ArgumentHandler" in op_vals):
-                conversion_func = "FEXCore::Config::Handler::{0}".format(op_vals["ArgumentHandler"])
-                output_argloader.write("else if (Key == \"FEX_{0}\") {{\n".format(op_key.upper()))
-                output_argloader.write("Value = {0}(Value);\n".format(conversion_func))
-                output_argloader.write("}\n")
-    output_argloader.write("#endif\n")
+            if (op_vals["Type"] in TypedValueTypes):
+                typed_options.append((op_key, op_key.upper(), TypedValueTypes[op_vals["Type"]]))
+
+    for op_group, group_vals in unnamed_options.items():
+        for op_key, op_vals in group_vals.items():
+            if (op_vals["Type"] in TypedValueTypes):
+                typed_options.append((op_key.upper(), op_key.upper(), TypedValueTypes[op_vals["Type"]]))
+
+    return typed_options
+
+def print_typed_values(options, unnamed_options):
+    typed_options = get_typed_options(options, unnamed_options)
+
+    output_typed.write("#ifndef TYPED_VALUES_IMPL\n")
+    output_typed.write("// Typed value of every option that holds a single value, string arrays only live in the layers\n")
+    output_typed.write("struct FEX_DEFAULT_VISIBILITY TypedValues {\n")
+    for name, enum, type in typed_options:
+        output_typed.write("\t{0} {1} {{DefaultValues::{2}}};\n".format(type, name, enum))
+    output_typed.write("\n")
+
+    for name, enum, type in typed_options:
+        if (type == "std::string"):
+            output_typed.write("\t[[nodiscard]] std::string const &Get{0}() const {{ return {0}; }}\n".format(name))
+            output_typed.write("\tvoid Set{0}(std::string_view Value) {{ {0} = Value; }}\n".format(name))
+        else:
+            output_typed.write("\t[[nodiscard]] {1} Get{0}() const {{ return {0}; }}\n".format(name, type))
+            output_typed.write("\tvoid Set{0}({1} Value) {{ {0} = Value; }}\n".format(name, type))
+    output_typed.write("\n")
+
+    output_typed.write("\t/**\n")
+    output_typed.write("\t * @brief Converts a layer's string value in to the option's field\n")
+    output_typed.write("\t *\n")
+    output_typed.write("\t * @return false for string arrays and values that don't convert, the field is left unchanged\n")
+    output_typed.write("\t */\n")
+    output_typed.write("\tbool Parse(ConfigOption Option, std::string_view Data);\n\n")
+    output_typed.write("\t// Resets the option's field to its default value\n")
+    output_typed.write("\tvoid Reset(ConfigOption Option);\n")
+    output_typed.write("};\n")
+
+    output_typed.write("#else\n")
+    output_typed.write("#undef TYPED_VALUES_IMPL\n")
+    output_typed.write("bool TypedValues::Parse(ConfigOption Option, std::string_view Data) {\n")
+    output_typed.write("\ttry {\n")
+    output_typed.write("\t\tswitch (Option) {\n")
+    for name, enum, type in typed_options:
+        output_typed.write("\t\t\tcase CONFIG_{0}: return FEXCore::StrConv::Conv(Data, &{1});\n".format(enum, name))
+    output_typed.write("\t\t\tdefault: return false;\n")
+    output_typed.write("\t\t}\n")
+    output_typed.write("\t}\n")
+    output_typed.write("\tcatch (const std::exception &) {\n")
+    output_typed.write("\t\treturn false;\n")
+    output_typed.write("\t}\n")
+    output_typed.write("}\n\n")
+
+    output_typed.write("void TypedValues::Reset(ConfigOption Option) {\n")
+    output_typed.write("\tswitch (Option) {\n")
+    for name, enum, type in typed_options:
+        output_typed.write("\t\tcase CONFIG_{0}: {1} = DefaultValues::{0}; break;\n".format(enum, name))
+    output_typed.write("\t\tdefault: break;\n")
+    output_typed.write("\t}\n")
+    output_typed.write("}\n")
+    output_typed.write("#endif\n")
 
 def check_for_duplicate_options(options):
     short_map = []
@@ -446,12 +634,13 @@ def check_for_duplicate_options(options):
                 else:
                     long_map.append(long_invert)
 
-if (len(sys.argv) < 5):
+if (len(sys.argv) < 6):
     sys.exit()
 
 output_filename = sys.argv[2]
 output_man_page = sys.argv[3]
 output_argumentloader_filename = sys.argv[4]
+output_typed_filename = sys.argv[5]
 
 json_file = open(sys.argv[1], "r")
 json_text = json_file.read()
@@ -487,6 +676,12 @@ print_argloader_options(options);
 print_parse_argloader_options(options);
 
 # Generate environment loader code
+print_parse_envloader_table(options, unnamed_options);
 print_parse_envloader_options(options);
 
 output_argloader.close()
+
+# Generate typed values
+output_typed = open(output_typed_filename, "w")
+print_typed_values(options, unnamed_options)
+output_typed.close()
@@ -1,23 +1,9 @@
-import collections
-import json
+import io
 import sys
 
-OpClasses = collections.OrderedDict()
+import json_ir_model
 
-def get_ir_classes(ops, defines):
-    global OpClasses
-
-    for op_class, opslist in ops.items():
-        if not (op_class in OpClasses):
-            OpClasses[op_class] = []
-
-        for op, op_val in opslist.items():
-            OpClasses[op_class].append([op, op_val])
-
-    # Sort the dictionary after we are done parsing it
-    OpClasses = collections.OrderedDict(sorted(OpClasses.items()))
-
-def print_ir_op_index():
+def print_ir_op_index(OpClasses):
     output_file.write("# Index\n")
     output_file.write("## Op Classes\n")
     for class_key, class_value in OpClasses.items():
@@ -26,7 +12,7 @@ def print_ir_op_index():
     output_file.write("## Definitions\n")
     output_file.write("- [Defines](#Defines)\n\n")
 
-def print_ir_ops():
+def print_ir_ops(OpClasses):
     for class_key, class_value in OpClasses.items():
         output_file.write("# %s\n\n" % (class_key))
         for op in class_value:
@@ -56,30 +42,30 @@ def print_ir_defines(defines):
         output_file.write("%s\n" % (define))
     output_file.write("```\n")
 
-if (len(sys.argv) < 3):
-    sys.exit()
-
-output_filename = sys.argv[2]
-json_file = open(sys.argv[1], "r")
-json_text = json_file.read()
-json_file.close()
-
-json_object = json.loads(json_text)
-json_object = {k.upper(): v for k, v in json_object.items()}
+# Returns the IR documentation in markdown
+def get_ir_doc(model):
+    global output_file
+    output_file = io.StringIO()
 
-ops = json_object["OPS"]
-defines = json_object["DEFINES"]
+    print_ir_op_index(model.OpClasses)
 
-get_ir_classes(ops, defines)
+    output_file.write("# IR documentation\n\n")
 
-output_file = open(output_filename, "w")
+    print_ir_ops(model.OpClasses)
 
-print_ir_op_index()
+    print_ir_defines(model.Defines)
 
-output_file.write("# IR documentation\n\n")
+    return output_file.getvalue()
 
-print_ir_ops()
+# Args: <IR.json> <Output>
+# json_ir_generator.py --doc writes the same documentation along with everything else generated from IR.json
+def main():
+    if (len(sys.argv) < 3):
+        sys.exit()
 
-print_ir_defines(defines)
+    Doc = get_ir_doc(json_ir_model.load_ir_model(sys.argv[1]))
+    with open(sys.argv[2], "w") as of:
+        of.write(Doc)
 
-output_file.close()
+if __name__ == "__main__":
+    main()
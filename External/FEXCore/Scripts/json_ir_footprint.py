@@ -0,0 +1,119 @@
+#!/bin/python3
+import collections
+import sys
+
+import json_ir_generator
+
+# Reports how many bytes every IR op takes in the IR buffer and checks them against a checked in baseline.
+# Sizes come from the same op model and type layouts json_ir_generator.py generates the op structs from.
+# Growth of ops in the hot classes fails the check, everything else is only reported.
+
+# Args: [--update] <IR.json> <Baseline>
+# --update rewrites the baseline with the current sizes instead of checking against it.
+
+# Loads, stores and ALU ops make up most of every block
+HotOpClasses = ["ALU", "Memory"]
+
+# Width of the histogram bars
+HistogramWidth = 40
+
+def get_ops():
+    return [op for op in json_ir_generator.IROps if op.Name != "Last"]
+
+def load_baseline(filename):
+    Baseline = {}
+    try:
+        with open(filename) as bf:
+            for line in bf:
+                line = line.split("#")[0].strip() # remove comments and empty spaces
+                if len(line) > 0:
+                    parts = line.split()
+                    Baseline[parts[0]] = int(parts[1])
+    except OSError:
+        pass
+
+    return Baseline
+
+def write_baseline(filename):
+    with open(filename, "w") as bf:
+        bf.write("# IR op struct sizes in bytes, checked by External/FEXCore/Scripts/json_ir_footprint.py\n")
+        bf.write("# Regenerate with json_ir_footprint.py --update <IR.json> <this file> once growth is intended\n")
+        for op in sorted(get_ops(), key = lambda op: op.Name):
+            bf.write("{} {}\n".format(op.Name, op.OpSize))
+
+def print_report():
+    print("{:<32} {:<10} {:>5} {:>4} {:>8}".format("Op", "Class", "Size", "SSA", "Non-SSA"))
+    for op in sorted(get_ops(), key = lambda op: (-op.OpSize, op.Name)):
+        NonSSASize = op.OpSize - json_ir_generator.get_non_ssa_offset(op)
+        print("{:<32} {:<10} {:>5} {:>4} {:>8}".format(op.Name, op.OpClass, op.OpSize, op.SSAArgNum, NonSSASize))
+    print()
+
+def print_histogram():
+    Classes = collections.OrderedDict()
+    for op in get_ops():
+        Classes.setdefault(op.OpClass, []).append(op.OpSize)
+
+    Largest = max(sum(Sizes) for Sizes in Classes.values())
+    print("{:<10} {:>4} {:>6} {:>6} {:>4}".format("Class", "Ops", "Bytes", "Avg", "Max"))
+    for OpClass, Sizes in sorted(Classes.items(), key = lambda item: -sum(item[1])):
+        Bar = "#" * max(1, round(HistogramWidth * sum(Sizes) / Largest))
+        print("{:<10} {:>4} {:>6} {:>6.1f} {:>4} {}".format(OpClass, len(Sizes), sum(Sizes), sum(Sizes) / len(Sizes), max(Sizes), Bar))
+
+    print("{:<10} {:>4} {:>6}".format("Total", len(get_ops()), sum(op.OpSize for op in get_ops())))
+    print()
+
+# Returns the number of hot ops that grew
+def compare_baseline(baseline):
+    Failures = 0
+    for op in sorted(get_ops(), key = lambda op: op.Name):
+        if not op.Name in baseline:
+            print("New op {} ({}) is {} bytes".format(op.Name, op.OpClass, op.OpSize))
+            continue
+
+        Previous = baseline[op.Name]
+        if op.OpSize > Previous:
+            Hot = op.OpClass in HotOpClasses
+            print("{} op {} ({}) grew from {} to {} bytes".format("Hot" if Hot else "Cold", op.Name, op.OpClass, Previous, op.OpSize))
+            if Hot:
+                Failures += 1
+        elif op.OpSize < Previous:
+            print("Op {} ({}) shrank from {} to {} bytes".format(op.Name, op.OpClass, Previous, op.OpSize))
+
+    Names = set(op.Name for op in get_ops())
+    for Name in sorted(baseline):
+        if not Name in Names:
+            print("Op {} was removed".format(Name))
+
+    Previous = sum(baseline.values())
+    Current = sum(op.OpSize for op in get_ops())
+    print("Total op bytes {} -> {} ({:+})".format(Previous, Current, Current - Previous))
+    return Failures
+
+def main():
+    Args = sys.argv[1:]
+    Update = len(Args) > 0 and Args[0] == "--update"
+    if Update:
+        Args = Args[1:]
+
+    if (len(Args) < 2):
+        json_ir_generator.ExitError("Usage: {} [--update] <IR.json> <Baseline>".format(sys.argv[0]))
+
+    json_ir_generator.parse_ir_json(Args[0])
+
+    if Update:
+        write_baseline(Args[1])
+        print("Wrote {} op sizes to {}".format(len(get_ops()), Args[1]))
+        return 0
+
+    print_report()
+    print_histogram()
+
+    Failures = compare_baseline(load_baseline(Args[1]))
+    if Failures:
+        print("{} hot ops grew. Rerun with --update if that is intended".format(Failures))
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,253 +1,107 @@
 #!/bin/python3
-import json
+import hashlib
+import io
 import sys
-from dataclasses import dataclass, field
-
-def ExitError(msg):
-    print(msg)
-    sys.exit(-1)
-
-@dataclass
-class IRType:
-    IRName: str
-    CXXName: str
-    def __init__(self, IRName, CXXName):
-        self.IRName = IRName
-        self.CXXName = CXXName
-
-@dataclass
-class OpArgument:
-    Type: str
-    IsSSA: bool
-    Temporary: bool
-    Name: str
-    NameWithPrefix: str
-    DefaultInitializer: str
-
-    def __init__(self):
-        self.Type = None
-        self.IsSSA = False
-        self.Temporary = False
-        self.Name = None
-        self.NameWithPrefix = None
-        self.DefaultInitializer = None
-        return
-
-    def print(self):
-        attrs = vars(self)
-        print(", ".join("%s: %s" % item for item in attrs.items()))
-
-@dataclass
-class OpDefinition:
-    Name: str
-    HasDest: bool
-    DestType: str
-    DestSize: str
-    NumElements: str
-    OpClass: str
-    HasSideEffects: bool
-    RAOverride: int
-    SwitchGen: bool
-    ArgPrinter: bool
-    SSAArgNum: int
-    NonSSAArgNum: int
-    Arguments: list
-    EmitValidation: list
-    Desc: list
-
-    def __init__(self):
-        self.Name = None
-        self.HasDest = False
-        self.DestType = None
-        self.DestSize = None
-        self.NumElements = None
-        self.OpClass = None
-        self.OpSize = 0
-        self.HasSideEffects = False
-        self.RAOverride = -1
-        self.SwitchGen = True
-        self.ArgPrinter = True
-        self.SSAArgNum = 0
-        self.NonSSAArgNum = 0
-        self.Arguments = []
-        self.EmitValidation = []
-        self.Desc = []
-        return
-
-    def print(self):
-        attrs = vars(self)
-        print(", ".join("%s: %s" % item for item in attrs.items()))
 
+import json_ir_doc_generator
+import json_ir_model
+from json_ir_model import CostAttributes, CostBackends, ExitError, OpTraits
+
+# Filled in by parse_ir_json from the shared IR model
 IRTypesToCXX = {}
 CXXTypeToIR = {}
 IROps = []
-
 IROpNameMap = {}
 
-def is_ssa_type(type):
-    if (type == "SSA" or
-       type == "GPR" or
-       type == "GPRPair" or
-       type == "FPR"):
-       return True
-    return False
-
-def parse_irtypes(irtypes):
-    for op_key, op_val in irtypes.items():
-        IRTypesToCXX[op_key] = IRType(op_key, op_val)
-        CXXTypeToIR[op_val] = IRType(op_key, op_val)
-
-def parse_ops(ops):
-    for op_class, opslist in ops.items():
-        for op, op_val in opslist.items():
-            if "Ignore" in op_val:
-                # Skip these
-                continue
-
-            OpDef = OpDefinition()
-
-            # Check if we have a destination
-            # Only happens if the IR name contains `=`
-            EqualSplit = op.split("=", 1)
-
-            RHS = EqualSplit[0].strip()
-            if len(EqualSplit) > 1:
-                OpDef.HasDest = True
-                RHS = EqualSplit[1].strip()
-
-                # Parse the destination, must be one type of SSA, GPR, or FPR
-                ResultType = EqualSplit[0].strip()
-                if ResultType == "SSA":
-                    OpDef.DestType = "SSA" # We don't know this type right now
-                elif ResultType == "GPR":
-                    OpDef.DestType = "GPR"
-                elif ResultType == "GPRPair":
-                    OpDef.DestType = "GPRPair"
-                elif ResultType == "FPR":
-                    OpDef.DestType = "FPR"
-                else:
-                    ExitError("Unknown destination class type {}. Needs to be one of {SSA, GPR, GPRPair, FPR}".format(ResultType))
-
-            # IR Op needs to start with a name
-            RHS = RHS.split(" ", 1)
-
-            if len(RHS) < 1:
-                ExitError("Missing IR op name. Needs to be a string")
-
-            # Set the op name
-            OpDef.Name = RHS[0]
-
-            # Parse the arguments
-            if len(RHS) > 1:
-                Arguments = RHS[1].strip().split(",")
-                for Argument in Arguments:
-                    Argument = Argument.strip()
-                    OpArg = OpArgument()
-
-                    Split = Argument.split(":")
-                    if len(Split) != 2:
-                        ExitError("Error parsing argument. Missing Type and name colon split")
-
-                    # Type is the first argument
-                    OpArg.Type = Split[0]
-
-                    # Validate typing is in our type map
-                    if not OpArg.Type in IRTypesToCXX:
-                        ExitError("IR type {} isn't in IR type map. From IR op {}, argument {}".format(OpArg.Type, OpDef.Name, Argument))
-
-                    # Style is the first byte of the name
-                    if Split[1][0] == "#":
-                        OpArg.Temporary = True
-                        OpArg.IsSSA = False
-                    elif Split[1][0] == "$":
-                        OpArg.Temporary = False
-                        OpArg.IsSSA = is_ssa_type(OpArg.Type)
-                        if OpArg.IsSSA:
-                            OpDef.SSAArgNum = OpDef.SSAArgNum + 1
-                        else:
-                            OpDef.NonSSAArgNum = OpDef.NonSSAArgNum + 1
-                    else:
-                        ExitError("IR Op {} missing value argument style specifier. Needs to be one of {{#, $}}".format(OpDef.Name))
-
-                    Prefix = Split[1][0]
-                    ArgName = Split[1][1:]
-                    NameWithPrefix = Prefix + ArgName
-
-                    if len(ArgName) == 0:
-                        ExitError("Argument is missing variable name")
-
-                    DefaultInit = ArgName.split("{", 1)
-                    if len(DefaultInit) > 1:
-                        # We have a default initializer, need to do some more work
-                        # First argument will still be the argument name
-                        ArgName = DefaultInit[0].strip()
-                        NameWithPrefix = Prefix + ArgName
-                        # Second argument will be the default initializer
-                        # Since we stripped the opening curly brace then it'll end with a closing brace
-                        if DefaultInit[1][-1] != "}":
-                            ExitError("IR op {} Argument {} is missing closing curly brace in default initializer?".format(OpDef.Name, ArgName))
-
-                        OpArg.DefaultInitializer = DefaultInit[1][:-1]
-
-                    # If SSA type then we can generate validation for this op
-                    if (OpArg.IsSSA and
-                        (OpArg.Type == "GPR" or
-                        OpArg.Type == "GPRPair" or
-                        OpArg.Type == "FPR")):
-                        OpDef.EmitValidation.append("GetOpRegClass({}) == InvalidClass || WalkFindRegClass({}) == {}Class".format(NameWithPrefix, NameWithPrefix, OpArg.Type))
-
-                    OpArg.Name = ArgName
-                    OpArg.NameWithPrefix = NameWithPrefix
-                    OpDef.Arguments.append(OpArg)
-
-            # Additional metadata
-            if "DestSize" in op_val:
-                OpDef.DestSize = op_val["DestSize"]
-
-            if "NumElements" in op_val:
-                OpDef.NumElements = op_val["NumElements"]
-
-            if len(op_class):
-                OpDef.OpClass = op_class
-
-            if "HasSideEffects" in op_val:
-                OpDef.HasSideEffects = bool(op_val["HasSideEffects"])
-
-            if "ArgPrinter" in op_val:
-                OpDef.ArgPrinter = bool(op_val["ArgPrinter"])
-
-            if "RAOverride" in op_val:
-                OpDef.RAOverride = int(op_val["RAOverride"])
-
-            if "SwitchGen" in op_val:
-                OpDef.SwitchGen = op_val["SwitchGen"]
-
-            if "EmitValidation" in op_val:
-                OpDef.EmitValidation.extend(op_val["EmitValidation"])
-
-            if "Desc" in op_val:
-                OpDef.Desc = op_val["Desc"]
+# Size and natural alignment of the C++ types stored in IR op structs
+CXXTypeLayouts = {
+    "bool": [1, 1],
+    "int8_t": [1, 1],
+    "int16_t": [2, 2],
+    "int32_t": [4, 4],
+    "int64_t": [8, 8],
+    "uint8_t": [1, 1],
+    "uint16_t": [2, 2],
+    "uint32_t": [4, 4],
+    "uint64_t": [8, 8],
+    "FenceType": [1, 1],
+    "RegisterClassType": [4, 4],
+    "CondClassType": [1, 1],
+    "FEXCore::IR::SyscallFlags": [1, 1],
+    "SHA256Sum": [32, 1],
+    "MemOffsetType": [1, 1],
+    "BreakDefinition": [6, 2],
+    "RoundType": [1, 1],
+}
+
+# IROps Op, uint8_t Size and uint8_t ElementSize
+IROpHeaderSize = 3
+# SSA arguments are stored as OrderedNodeWrapper
+SSAArgSize = 4
+
+# Largest allowed op struct in bytes, None for no limit
+SizeBudget = None
+
+def get_type_layout(op, arg):
+    CType = IRTypesToCXX[arg.Type].CXXName
+    if not CType in CXXTypeLayouts:
+        ExitError("IR op {} argument {} has type {} without a known size. Add it to CXXTypeLayouts".format(op.Name, arg.Name, CType))
+    return CXXTypeLayouts[CType]
+
+def get_stored_non_ssa_args(op):
+    return [arg for arg in op.Arguments if not arg.Temporary and not arg.IsSSA]
+
+def get_non_ssa_offset(op):
+    return IROpHeaderSize + op.SSAArgNum * SSAArgSize
+
+# Returns how many bytes of the arguments aren't naturally aligned relative to the start of the op
+def get_misaligned_bytes(op, args):
+    Offset = get_non_ssa_offset(op)
+    Misaligned = 0
+    for arg in args:
+        Size, Align = get_type_layout(op, arg)
+        if Offset % Align != 0:
+            Misaligned += Size
+        Offset += Size
+    return Misaligned
+
+def calculate_op_sizes():
+    for op in IROps:
+        op.OpSize = get_non_ssa_offset(op)
+        for arg in get_stored_non_ssa_args(op):
+            op.OpSize += get_type_layout(op, arg)[0]
+
+# Fails generation if any op grew past the budget
+def check_op_size_budget(budget):
+    OverBudget = [op for op in IROps if op.Name != "Last" and op.OpSize > budget]
+    if len(OverBudget):
+        ExitError("IR ops over the {} byte size budget: {}".format(budget, ", ".join("{} ({} bytes)".format(op.Name, op.OpSize) for op in OverBudget)))
+
+def get_layout_report():
+    Lines = []
+    Lines.append("# IR op struct layouts. Offsets are relative to the start of the op\n")
+    Lines.append("# {:<32} {:>5} {:>10}  {}\n".format("Op", "Size", "Misaligned", "Non-SSA fields"))
+
+    TotalMisaligned = 0
+    for op in sorted(IROps, key = lambda op: (-op.OpSize, op.Name)):
+        if op.Name == "Last":
+            continue
 
-            # Do some fixups of the data here
-            if len(OpDef.EmitValidation) != 0:
-                for i in range(len(OpDef.EmitValidation)):
-                    # Patch up all the argument names
-                    for Arg in OpDef.Arguments:
-                        if Arg.Temporary:
-                            # Temporary ops just replace all instances no prefix variant
-                            OpDef.EmitValidation[i] = OpDef.EmitValidation[i].replace(Arg.NameWithPrefix, Arg.Name)
-                        else:
-                            # All other ops replace $ with _ variant for argument passed in
-                            OpDef.EmitValidation[i] = OpDef.EmitValidation[i].replace(Arg.NameWithPrefix, "_{}".format(Arg.Name))
+        Layout = get_stored_non_ssa_args(op)
+        Misaligned = get_misaligned_bytes(op, Layout)
+        TotalMisaligned += Misaligned
 
-            #OpDef.print()
+        Fields = []
+        Offset = get_non_ssa_offset(op)
+        for arg in Layout:
+            Size, Align = get_type_layout(op, arg)
+            Fields.append("{}@{}{}".format(arg.Name, Offset, "" if Offset % Align == 0 else "!"))
+            Offset += Size
 
-            # Error on duplicate op
-            if OpDef.Name in IROpNameMap:
-                ExitError("Duplicate Op defined! {}".format(OpDef.Name))
+        Lines.append("  {:<32} {:>5} {:>10}  {}\n".format(op.Name, op.OpSize, Misaligned, " ".join(Fields)))
 
-            IROps.append(OpDef)
-            IROpNameMap[OpDef.Name] = 1
+    Lines.append("# {} ops, {} bytes of misaligned non-SSA fields\n".format(len(IROps) - 1, TotalMisaligned))
+    return "".join(Lines)
 
 # Print out enum values
 def print_enums():
@@ -307,13 +161,12 @@ def print_ir_structs(defines):
                 if arg.IsSSA:
                     output_file.write("\tOrderedNodeWrapper {};\n".format(arg.Name));
 
-        # Non-SSA arguments are also placed in order of declaration, after SSA though
+        # Non-SSA arguments are placed after SSA
         if op.NonSSAArgNum > 0:
             output_file.write("\t// Non-SSA arguments\n")
-            for arg in op.Arguments:
-                if not arg.Temporary and not arg.IsSSA:
-                    CType = IRTypesToCXX[arg.Type].CXXName
-                    output_file.write("\t{} {};\n".format(CType, arg.Name));
+            for arg in get_stored_non_ssa_args(op):
+                CType = IRTypesToCXX[arg.Type].CXXName
+                output_file.write("\t{} {};\n".format(CType, arg.Name));
 
         output_file.write("\tstatic constexpr IROps OPCODE = OP_{};\n".format(op.Name.upper()))
 
@@ -331,7 +184,13 @@ def print_ir_structs(defines):
 
         # Add a static assert that the IR ops must be pod
         output_file.write("static_assert(std::is_trivial_v<IROp_{}>);\n".format(op.Name))
-        output_file.write("static_assert(std::is_standard_layout_v<IROp_{}>);\n\n".format(op.Name))
+        output_file.write("static_assert(std::is_standard_layout_v<IROp_{}>);\n".format(op.Name))
+        # The footprint report, schema hash and serializer bounds all use the packed size model
+        if op.Name != "Last":
+            output_file.write("static_assert(sizeof(IROp_{}) == {}, \"IR op layout doesn't match the packed size model\");\n".format(op.Name, op.OpSize))
+        if SizeBudget != None and op.Name != "Last":
+            output_file.write("static_assert(sizeof(IROp_{}) <= {}, \"IR op is over the size budget\");\n".format(op.Name, SizeBudget))
+        output_file.write("\n")
 
     output_file.write("#undef IROP_STRUCTS\n")
     output_file.write("#endif\n\n")
@@ -364,6 +223,80 @@ def print_ir_sizes():
     output_file.write("#undef IROP_SIZES\n")
     output_file.write("#endif\n\n")
 
+def get_ra_args(op):
+    if op.RAOverride != -1:
+        if op.RAOverride > op.SSAArgNum:
+            ExitError("Op {} has RA override of {} which is more than total SSA values {}. This doesn't work".format(op.Name, op.RAOverride, op.SSAArgNum))
+        return op.RAOverride
+    return op.SSAArgNum
+
+def get_reg_class(op):
+    if op.HasDest and op.DestType == None:
+        ExitError("IR op {} has destination with no destination class".format(op.Name))
+
+    if op.HasDest and op.DestType == "SSA": # Special case SSA type
+        return "FEXCore::IR::ComplexClass"
+    elif op.HasDest:
+        return "FEXCore::IR::{}Class".format(op.DestType)
+    else:
+        # No destination so it has an invalid destination class
+        return "FEXCore::IR::InvalidClass"
+
+# Print out the packed per-op descriptors
+# Every property passes query about an op in one word, instead of one out of line call per table
+def print_ir_descriptors():
+    output_file.write("#ifdef IROP_DESCRIPTORS\n")
+
+    output_file.write("// [7:0] Op struct size, [10:8] Destination register class, [14:11] SSA arguments, [18:15] RA'd SSA arguments\n")
+    output_file.write("// [19] Has side effects, [20] Has destination\n")
+    output_file.write("struct IROpDescriptor final {\n")
+    output_file.write("\tuint32_t Val;\n\n")
+
+    output_file.write("\t[[nodiscard]] static constexpr IROpDescriptor Make(size_t Size, FEXCore::IR::RegisterClassType RegClass, uint8_t Args, uint8_t RAArgs, bool SideEffects, bool HasDest) {\n")
+    output_file.write("\t\treturn IROpDescriptor{static_cast<uint32_t>((Size & 0xFF) | ((RegClass.Val & 0x7) << 8) | ((Args & 0xF) << 11) | ((RAArgs & 0xF) << 15) | (SideEffects << 19) | (HasDest << 20))};\n")
+    output_file.write("\t}\n\n")
+
+    output_file.write("\t[[nodiscard]] constexpr size_t Size() const { return Val & 0xFF; }\n")
+    output_file.write("\t[[nodiscard]] constexpr FEXCore::IR::RegisterClassType RegClass() const { return FEXCore::IR::RegisterClassType{(Val >> 8) & 0x7}; }\n")
+    output_file.write("\t[[nodiscard]] constexpr uint8_t Args() const { return (Val >> 11) & 0xF; }\n")
+    output_file.write("\t[[nodiscard]] constexpr uint8_t RAArgs() const { return (Val >> 15) & 0xF; }\n")
+    output_file.write("\t[[nodiscard]] constexpr bool HasSideEffects() const { return (Val >> 19) & 1; }\n")
+    output_file.write("\t[[nodiscard]] constexpr bool HasDest() const { return (Val >> 20) & 1; }\n")
+    output_file.write("};\n\n")
+
+    output_file.write("constexpr std::array<IROpDescriptor, IROps::OP_LAST + 1> IRDescriptors = {\n")
+    for op in IROps:
+        if op.Name == "Last":
+            output_file.write("\tIROpDescriptor{0},\n")
+            continue
+
+        RAArgs = get_ra_args(op)
+        if op.SSAArgNum > 0xF:
+            ExitError("Op {} has {} SSA arguments which doesn't fit in the op descriptor".format(op.Name, op.SSAArgNum))
+
+        output_file.write("\tIROpDescriptor::Make(sizeof(IROp_{}), {}, {}, {}, {}, {}),\n".format(
+            op.Name,
+            get_reg_class(op),
+            op.SSAArgNum,
+            RAArgs,
+            "true" if op.HasSideEffects else "false",
+            "true" if op.HasDest else "false"))
+
+    output_file.write("};\n\n")
+
+    output_file.write("// Op struct sizes are only known to the compiler, make sure none of them got truncated\n")
+    output_file.write("static_assert([] {\n")
+    output_file.write("\tfor (size_t i = 0; i < IROps::OP_LAST; ++i) {\n")
+    output_file.write("\t\tif (IRDescriptors[i].Size() != IRSizes[i]) return false;\n")
+    output_file.write("\t}\n")
+    output_file.write("\treturn true;\n")
+    output_file.write("}(), \"IR op too large for the op descriptor\");\n\n")
+
+    output_file.write("[[nodiscard]] inline IROpDescriptor GetDescriptor(IROps Op) { return IRDescriptors[Op]; }\n")
+
+    output_file.write("#undef IROP_DESCRIPTORS\n")
+    output_file.write("#endif\n\n")
+
 def print_ir_reg_classes():
     output_file.write("#ifdef IROP_REG_CLASSES_IMPL\n")
 
@@ -371,18 +304,10 @@ def print_ir_reg_classes():
     for op in IROps:
         if op.Name == "Last":
             output_file.write("\tFEXCore::IR::InvalidClass,\n")
+        elif not op.HasDest:
+            output_file.write("\t{}, // No destination\n".format(get_reg_class(op)))
         else:
-            Class = "Invalid"
-            if op.HasDest and op.DestType == None:
-                ExitError("IR op {} has destination with no destination class".format(op.Name))
-
-            if op.HasDest and op.DestType == "SSA": # Special case SSA type
-                output_file.write("\tFEXCore::IR::ComplexClass,\n")
-            elif op.HasDest:
-                output_file.write("\tFEXCore::IR::{}Class,\n".format(op.DestType))
-            else:
-                # No destination so it has an invalid destination class
-                output_file.write("\tFEXCore::IR::InvalidClass, // No destination\n")
+            output_file.write("\t{},\n".format(get_reg_class(op)))
 
 
     output_file.write("};\n\n")
@@ -419,14 +344,7 @@ def print_ir_getraargs():
 
     output_file.write("constexpr std::array<uint8_t, OP_LAST + 1> IRRAArgs = {\n")
     for op in IROps:
-        SSAArgs = op.SSAArgNum
-
-        if op.RAOverride != -1:
-            if op.RAOverride > op.SSAArgNum:
-                ExitError("Op {} has RA override of {} which is more than total SSA values {}. This doesn't work".format(op.Name, op.RAOverride, op.SSAArgNum))
-            SSAArgs = op.RAOverride
-
-        output_file.write("\t{},\n".format(SSAArgs))
+        output_file.write("\t{},\n".format(get_ra_args(op)))
 
     output_file.write("};\n\n")
 
@@ -496,8 +414,9 @@ def print_ir_arg_printer():
 
         if len(op.Arguments) != 0:
             output_file.write("\t[[maybe_unused]] auto Op = IROp->C<IR::IROp_{}>();\n".format(op.Name))
-            output_file.write("\t*out << \" \";\n")
 
+            # Literal text between arguments is merged so each run is a single append
+            Literal = " "
             SSAArgNum = 0
             for i in range(0, len(op.Arguments)):
                 arg = op.Arguments[i]
@@ -505,17 +424,24 @@ def print_ir_arg_printer():
 
                 if arg.Temporary:
                     # Temporary that we can't recover
-                    output_file.write("\t*out << \"{}:Tmp:{}\";\n".format(arg.Type, arg.Name))
-                elif arg.IsSSA:
-                    # SSA value
-                    output_file.write("\tPrintArg(out, IR, Op->Header.Args[{}], RAData);\n".format(SSAArgNum))
-                    SSAArgNum = SSAArgNum + 1
+                    Literal += "{}:Tmp:{}".format(arg.Type, arg.Name)
                 else:
-                    # User defined op that is stored
-                    output_file.write("\tPrintArg(out, IR, Op->{});\n".format(arg.Name))
+                    output_file.write("\tout->append(\"{}\");\n".format(Literal))
+                    Literal = ""
+
+                    if arg.IsSSA:
+                        # SSA value
+                        output_file.write("\tPrintArg(out, IR, Op->Header.Args[{}], RAData);\n".format(SSAArgNum))
+                        SSAArgNum = SSAArgNum + 1
+                    else:
+                        # User defined op that is stored
+                        output_file.write("\tPrintArg(out, IR, Op->{});\n".format(arg.Name))
 
                 if not LastArg:
-                    output_file.write("\t*out << \", \";\n")
+                    Literal += ", "
+
+            if len(Literal) != 0:
+                output_file.write("\tout->append(\"{}\");\n".format(Literal))
 
         output_file.write("break;\n")
         output_file.write("}\n")
@@ -523,6 +449,35 @@ def print_ir_arg_printer():
     output_file.write("#undef IROP_ARGPRINTER_HELPER\n")
     output_file.write("#endif\n")
 
+    # Compact dump, tab separated raw values
+    output_file.write("#ifdef IROP_ARGPRINTER_COMPACT_HELPER\n")
+    output_file.write("switch (IROp->Op) {\n")
+    for op in IROps:
+        if not op.ArgPrinter or len(op.Arguments) == 0:
+            continue
+
+        output_file.write("case IROps::OP_{}: {{\n".format(op.Name.upper()))
+        output_file.write("\t[[maybe_unused]] auto Op = IROp->C<IR::IROp_{}>();\n".format(op.Name))
+
+        SSAArgNum = 0
+        for arg in op.Arguments:
+            if arg.Temporary:
+                output_file.write("\tout->append(\"\\t-\");\n")
+                continue
+
+            output_file.write("\tout->push_back('\\t');\n")
+            if arg.IsSSA:
+                output_file.write("\tPrintCompactArg(out, IR, Op->Header.Args[{}]);\n".format(SSAArgNum))
+                SSAArgNum = SSAArgNum + 1
+            else:
+                output_file.write("\tPrintCompactArg(out, IR, Op->{});\n".format(arg.Name))
+
+        output_file.write("break;\n")
+        output_file.write("}\n")
+
+    output_file.write("#undef IROP_ARGPRINTER_COMPACT_HELPER\n")
+    output_file.write("#endif\n")
+
 # Print out IR allocator helpers
 def print_ir_allocator_helpers():
     output_file.write("#ifdef IROP_ALLOCATE_HELPERS\n")
@@ -566,6 +521,23 @@ def print_ir_allocator_helpers():
     output_file.write("\t\treturn IRPair<T>{Op, CreateNode(&Op->Header)};\n")
     output_file.write("\t}\n\n")
 
+    # Generated builders write every argument of the op themselves, ArgsSize is how many bytes those take after the header.
+    # When the op is exactly the header and its arguments only the header needs zeroing.
+    # Compilers that don't honour the packed attribute for every member pad the op, then all of it is zeroed.
+    output_file.write("\ttemplate<class T, IROps T2, size_t ArgsSize>\n")
+    output_file.write("\tIRPair<T> AllocateUninitializedOp() {\n")
+    output_file.write("\t\tconstexpr size_t HeaderSize = offsetof(IROp_Header, Args);\n")
+    output_file.write("\t\tauto Op = reinterpret_cast<T*>(DualListData.DataAllocate(sizeof(T)));\n")
+    output_file.write("\t\tif constexpr (sizeof(T) == HeaderSize + ArgsSize) {\n")
+    output_file.write("\t\t\tmemset(Op, 0, HeaderSize);\n")
+    output_file.write("\t\t}\n")
+    output_file.write("\t\telse {\n")
+    output_file.write("\t\t\tmemset(Op, 0, sizeof(T));\n")
+    output_file.write("\t\t}\n")
+    output_file.write("\t\tOp->Header.Op = T2;\n")
+    output_file.write("\t\treturn IRPair<T>{Op, CreateNode(&Op->Header)};\n")
+    output_file.write("\t}\n\n")
+
     output_file.write("\tuint8_t GetOpSize(const OrderedNode *Op) const {\n")
     output_file.write("\t\tauto HeaderOp = Op->Header.Value.GetNode(DualListData.DataBegin());\n")
     output_file.write("\t\treturn HeaderOp->Size;\n")
@@ -629,7 +601,7 @@ def print_ir_allocator_helpers():
 
             output_file.write(") {\n")
 
-            output_file.write("\t\tauto Op = AllocateOp<IROp_{}, IROps::OP_{}>();\n".format(op.Name, op.Name.upper()))
+            output_file.write("\t\tauto Op = AllocateUninitializedOp<IROp_{}, IROps::OP_{}, {}>();\n".format(op.Name, op.Name.upper(), op.OpSize - IROpHeaderSize))
 
             if op.SSAArgNum != 0:
                 output_file.write("\t\tauto ListDataBegin = DualListData.ListBegin();\n")
@@ -686,42 +658,404 @@ def print_ir_allocator_helpers():
     output_file.write("#undef IROP_ALLOCATE_HELPERS\n")
     output_file.write("#endif\n")
 
-def print_ir_parser_switch_helper():
-    output_file.write("#ifdef IROP_PARSER_SWITCH_HELPERS\n")
+# Print out the op trait bitsets
+def print_ir_traits():
+    output_file.write("#ifdef IROP_TRAITS\n")
+
+    output_file.write("enum class OpTrait : uint8_t {\n")
+    for Trait in OpTraits:
+        output_file.write("\t{},\n".format(Trait))
+    output_file.write("};\n\n")
+
+    Words = (len(IROps) + 63) // 64
+    output_file.write("// One bit per op for each trait, indexed by IROps\n")
+    output_file.write("constexpr std::array<std::array<uint64_t, {}>, {}> IROpTraits = {{{{\n".format(Words, len(OpTraits)))
+    for Trait in OpTraits:
+        Bits = [0] * Words
+        Names = []
+        for Index, op in enumerate(IROps):
+            if Trait in op.Traits:
+                Bits[Index // 64] |= 1 << (Index % 64)
+                Names.append(op.Name)
+        output_file.write("\t// {}: {}\n".format(Trait, ", ".join(Names) if len(Names) else "None"))
+        output_file.write("\t{{{}}},\n".format(", ".join("0x{:016x}ULL".format(Word) for Word in Bits)))
+    output_file.write("}};\n\n")
+
+    output_file.write("constexpr bool HasTrait(IROps Op, OpTrait Trait) {\n")
+    output_file.write("\treturn (IROpTraits[static_cast<size_t>(Trait)][Op / 64] >> (Op % 64)) & 1;\n")
+    output_file.write("}\n\n")
+
+    for Trait in OpTraits:
+        output_file.write("constexpr bool Is{}(IROps Op) {{ return HasTrait(Op, OpTrait::{}); }}\n".format(Trait, Trait))
+
+    output_file.write("#undef IROP_TRAITS\n")
+    output_file.write("#endif\n\n")
+
+# Cost of ops without cost data for a backend, in CostAttributes order
+DefaultOpCost = [1, 1.0, 4]
+
+def get_op_cost(op, backend):
+    Cost = op.Costs.get(backend, {})
+    return [Cost.get(Attribute, Default) for Attribute, Default in zip(CostAttributes, DefaultOpCost)]
+
+# Print out the per-backend cost tables
+# Ops without cost data for a backend get the default cost, HasData tells them apart
+def print_ir_costs():
+    output_file.write("#ifdef IROP_COSTS\n")
+
+    output_file.write("enum class CostBackend : uint8_t {\n")
+    for Backend in CostBackends:
+        output_file.write("\t{},\n".format(Backend))
+    output_file.write("};\n\n")
+
+    output_file.write("// Estimated cost of an op on a backend\n")
+    output_file.write("struct IROpCost final {\n")
+    output_file.write("\t// Cycles until the result is available\n")
+    output_file.write("\tuint16_t Latency;\n")
+    output_file.write("\t// Bytes of host code emitted\n")
+    output_file.write("\tuint16_t CodeSize;\n")
+    output_file.write("\t// Reciprocal throughput, cycles per op\n")
+    output_file.write("\tfloat Throughput;\n")
+    output_file.write("\t// False if IR.json has no cost data for the op and the cost is the default\n")
+    output_file.write("\tbool HasData;\n")
+    output_file.write("};\n\n")
+
+    Latency, Throughput, CodeSize = DefaultOpCost
+    output_file.write("constexpr IROpCost DefaultOpCost {{{}, {}, {}f, false}};\n\n".format(Latency, CodeSize, float(Throughput)))
+
+    output_file.write("// Indexed by CostBackend, then IROps\n")
+    output_file.write("constexpr std::array<std::array<IROpCost, OP_LAST + 1>, {}> IROpCosts = {{{{\n".format(len(CostBackends)))
+    for Backend in CostBackends:
+        output_file.write("\t// {}\n".format(Backend))
+        output_file.write("\t{{\n")
+        for op in IROps:
+            if Backend in op.Costs:
+                Latency, Throughput, CodeSize = get_op_cost(op, Backend)
+                output_file.write("\t\t{{{}, {}, {}f, true}}, // {}\n".format(Latency, CodeSize, float(Throughput), op.Name))
+            else:
+                output_file.write("\t\tDefaultOpCost, // {}\n".format(op.Name))
+        output_file.write("\t}},\n")
+    output_file.write("}};\n\n")
+
+    output_file.write("constexpr const IROpCost &GetOpCost(CostBackend Backend, IROps Op) {\n")
+    output_file.write("\treturn IROpCosts[static_cast<size_t>(Backend)][Op];\n")
+    output_file.write("}\n")
+
+    output_file.write("#undef IROP_COSTS\n")
+    output_file.write("#endif\n\n")
+
+# Lists the ops without cost data, or with only some of the cost attributes, per backend
+def get_cost_report():
+    Lines = []
+    Lines.append("# IR ops without cost data. Costs are the optional Cost member of ops in IR.json\n")
+
+    Ops = [op for op in IROps if op.Name != "Last"]
+    for Backend in CostBackends:
+        WithData = [op for op in Ops if Backend in op.Costs]
+        Lines.append("# {}: {} of {} ops have cost data\n".format(Backend, len(WithData), len(Ops)))
+
+        Missing = {}
+        for op in Ops:
+            if not Backend in op.Costs:
+                Missing.setdefault(op.OpClass, []).append(op.Name)
+            else:
+                Attributes = [Attribute for Attribute in CostAttributes if not Attribute in op.Costs[Backend]]
+                if len(Attributes):
+                    Missing.setdefault(op.OpClass, []).append("{}(no {})".format(op.Name, "/".join(Attributes)))
+
+        for OpClass in sorted(Missing):
+            Lines.append("  {:<10} {}\n".format(OpClass, " ".join(Missing[OpClass])))
+
+    return "".join(Lines)
+
+# Print out per-op execution counters for profiling the interpreter and JIT
+def print_ir_counters():
+    output_file.write("#ifdef IROP_COUNTERS\n")
+
+    output_file.write("// Number of times each op executed, indexed by IROps\n")
+    output_file.write("inline std::array<std::atomic<uint64_t>, OP_LAST + 1> OpCounters{};\n\n")
+
+    output_file.write("static inline void CountOp(IROps Op) {\n")
+    output_file.write("\tOpCounters[Op].fetch_add(1, std::memory_order_relaxed);\n")
+    output_file.write("}\n\n")
+
+    output_file.write("// For JITs incrementing the counter from generated code\n")
+    output_file.write("static inline std::atomic<uint64_t> *GetOpCounter(IROps Op) {\n")
+    output_file.write("\treturn &OpCounters[Op];\n")
+    output_file.write("}\n\n")
+
+    output_file.write("constexpr std::array<std::string_view, OP_LAST + 1> IROpClasses = {\n")
     for op in IROps:
-        if op.Name != "Last" and op.SwitchGen:
-            output_file.write("\tcase FEXCore::IR::IROps::OP_%s: {\n" % (op.Name.upper()))
+        output_file.write("\t\"{}\",\n".format(op.OpClass))
+    output_file.write("};\n\n")
 
-            for i in range(0, len(op.Arguments)):
-                arg = op.Arguments[i]
-                LastArg = len(op.Arguments) - i - 1 == 0
+    output_file.write("// Writes every op that executed sorted by count, followed by the totals of each op class\n")
+    output_file.write("static inline void DumpOpCounters(FILE *Output) {\n")
+    output_file.write("\tstd::array<std::pair<uint64_t, IROps>, OP_LAST + 1> Counts;\n")
+    output_file.write("\tuint64_t Total = 0;\n")
+    output_file.write("\tfor (size_t i = 0; i < Counts.size(); ++i) {\n")
+    output_file.write("\t\tCounts[i] = {OpCounters[i].load(std::memory_order_relaxed), static_cast<IROps>(i)};\n")
+    output_file.write("\t\tTotal += Counts[i].first;\n")
+    output_file.write("\t}\n")
+    output_file.write("\tif (Total == 0) {\n")
+    output_file.write("\t\treturn;\n")
+    output_file.write("\t}\n\n")
 
-                if arg.Temporary:
-                    CType = IRTypesToCXX[arg.Type].CXXName
-                    output_file.write("\t\tauto arg{} = DecodeValue<{}>(Def.Args[{}]);\n".format(i, CType, i))
-                    output_file.write("\t\tif (!CheckPrintErrorArg(Def, arg{}.first, {})) return false;\n".format(i, i))
-                elif arg.IsSSA:
-                    # SSA value
-                    output_file.write("\t\tauto arg{} = DecodeValue<OrderedNode*>(Def.Args[{}]);\n".format(i, i))
-                    output_file.write("\t\tif (!CheckPrintErrorArg(Def, arg{}.first, {})) return false;\n".format(i, i))
-                else:
-                    # User defined op that is stored
-                    CType = IRTypesToCXX[arg.Type].CXXName
-                    output_file.write("\t\tauto arg{} = DecodeValue<{}>(Def.Args[{}]);\n".format(i, CType, i))
-                    output_file.write("\t\tif (!CheckPrintErrorArg(Def, arg{}.first, {})) return false;\n".format(i, i))
+    output_file.write("\tstd::sort(Counts.begin(), Counts.end(), [](auto const &a, auto const &b) { return a.first > b.first; });\n\n")
 
-            output_file.write("\t\tDef.Node = _{}(\n".format(op.Name))
+    output_file.write("\tfprintf(Output, \"%-32s %-10s %16s %7s\\n\", \"Op\", \"Class\", \"Count\", \"%\");\n")
+    output_file.write("\tfor (auto const &[Count, Op] : Counts) {\n")
+    output_file.write("\t\tif (Count == 0) {\n")
+    output_file.write("\t\t\tbreak;\n")
+    output_file.write("\t\t}\n")
+    output_file.write("\t\tauto const &Name = GetName(Op);\n")
+    output_file.write("\t\tfprintf(Output, \"%-32.*s %-10s %16\" PRIu64 \" %6.2f%%\\n\", static_cast<int>(Name.size()), Name.data(), IROpClasses[Op].data(), Count, 100.0 * Count / Total);\n")
+    output_file.write("\t}\n\n")
 
-            for i in range(0, len(op.Arguments)):
-                arg = op.Arguments[i]
-                LastArg = len(op.Arguments) - i - 1 == 0
-                output_file.write("\t\t\targ{}.second".format(i))
-                if not LastArg:
-                    output_file.write(",\n")
-                else:
-                    output_file.write("\n")
+    OpClasses = []
+    for op in IROps:
+        if not op.OpClass in OpClasses:
+            OpClasses.append(op.OpClass)
+
+    output_file.write("\tstd::array<std::pair<uint64_t, std::string_view>, {}> ClassCounts = {{{{\n".format(len(OpClasses)))
+    for OpClass in OpClasses:
+        output_file.write("\t\t{{0, \"{}\"}},\n".format(OpClass))
+    output_file.write("\t}};\n")
+    output_file.write("\tfor (auto const &[Count, Op] : Counts) {\n")
+    output_file.write("\t\tfor (auto &[ClassCount, Class] : ClassCounts) {\n")
+    output_file.write("\t\t\tif (Class == IROpClasses[Op]) {\n")
+    output_file.write("\t\t\t\tClassCount += Count;\n")
+    output_file.write("\t\t\t}\n")
+    output_file.write("\t\t}\n")
+    output_file.write("\t}\n")
+    output_file.write("\tstd::sort(ClassCounts.begin(), ClassCounts.end(), [](auto const &a, auto const &b) { return a.first > b.first; });\n\n")
+
+    output_file.write("\tfprintf(Output, \"\\n%-10s %16s %7s\\n\", \"Class\", \"Count\", \"%\");\n")
+    output_file.write("\tfor (auto const &[Count, Class] : ClassCounts) {\n")
+    output_file.write("\t\tfprintf(Output, \"%-10s %16\" PRIu64 \" %6.2f%%\\n\", Class.data(), Count, 100.0 * Count / Total);\n")
+    output_file.write("\t}\n")
+    output_file.write("\tfprintf(Output, \"%-10s %16\" PRIu64 \"\\n\", \"Total\", Total);\n")
+    output_file.write("}\n\n")
+
+    output_file.write("// Dumps the counters to stderr at exit, only registers once\n")
+    output_file.write("static inline void RegisterOpCountersDump() {\n")
+    output_file.write("\t[[maybe_unused]] static const bool Registered = std::atexit([] { DumpOpCounters(stderr); }) == 0;\n")
+    output_file.write("}\n")
+
+    output_file.write("#undef IROP_COUNTERS\n")
+    output_file.write("#endif\n\n")
+
+# Print out functions building one of every op of each op class, for measuring IR emission throughput
+# Arguments are zeroed, so this only builds with emit time validation disabled
+# Non-SSA arguments get the value IR.json gives for them, first from the op then from the global BenchmarkArgs, or zero
+# SSA arguments get a node of the register class their type asks for
+def print_ir_emitter_benchmark(benchmark_args):
+    output_file.write("#ifdef IROP_EMITTER_BENCHMARK\n")
 
-            output_file.write("\t\t);\n")
+    output_file.write("struct BenchmarkNodes {\n")
+    for SSAType in ["GPR", "FPR", "GPRPair"]:
+        output_file.write("\tFEXCore::IR::OrderedNode *{};\n".format(SSAType))
+    output_file.write("};\n\n")
+
+    OpClasses = []
+    for op in IROps:
+        if op.Name != "Last" and not op.OpClass in OpClasses:
+            OpClasses.append(op.OpClass)
+
+    for OpClass in OpClasses:
+        output_file.write("static size_t EmitOpClass_{}(FEXCore::IR::IREmitter *IR, BenchmarkNodes const &Nodes) {{\n".format(OpClass))
+        Count = 0
+        for op in IROps:
+            if op.Name != "Last" and op.OpClass == OpClass:
+                Args = []
+                for arg in op.Arguments:
+                    if arg.IsSSA:
+                        Args.append("Nodes.{}".format(arg.Type if arg.Type in ["FPR", "GPRPair"] else "GPR"))
+                    else:
+                        Value = op.BenchmarkArgs.get(arg.Name, benchmark_args.get(arg.Name, ""))
+                        Args.append("{}{{{}}}".format(IRTypesToCXX[arg.Type].CXXName, Value))
+                output_file.write("\tIR->_{}({});\n".format(op.Name, ", ".join(Args)))
+                Count += 1
+        output_file.write("\treturn {};\n".format(Count))
+        output_file.write("}\n\n")
+
+    output_file.write("struct OpClassBenchmark {\n")
+    output_file.write("\tstd::string_view Name;\n")
+    output_file.write("\tsize_t (*Emit)(FEXCore::IR::IREmitter *IR, BenchmarkNodes const &Nodes);\n")
+    output_file.write("};\n\n")
+
+    output_file.write("static constexpr std::array<OpClassBenchmark, {}> OpClassBenchmarks = {{{{\n".format(len(OpClasses)))
+    for OpClass in OpClasses:
+        output_file.write("\t{{\"{}\", EmitOpClass_{}}},\n".format(OpClass, OpClass))
+    output_file.write("}};\n")
+
+    output_file.write("#undef IROP_EMITTER_BENCHMARK\n")
+    output_file.write("#endif\n\n")
+
+# C++ type an argument gets decoded as by the parser
+def get_parser_arg_type(arg):
+    if arg.IsSSA:
+        return "OrderedNode*"
+    return IRTypesToCXX[arg.Type].CXXName
+
+# Argument kind enum entry for a C++ type
+def get_parser_arg_kind(cxx_type):
+    if cxx_type == "OrderedNode*":
+        return "SSA"
+    return CXXTypeToIR[cxx_type].IRName
+
+def is_parser_table_driven(op):
+    return op.Name != "Last" and op.SwitchGen
+
+# 32-bit FNV-1a with the seed mixed in to the offset basis, must match OpNameHash in the parser tables
+def op_name_hash(name, seed):
+    Hash = (2166136261 ^ seed) & 0xFFFFFFFF
+    for c in name.encode("utf-8"):
+        Hash ^= c
+        Hash = (Hash * 16777619) & 0xFFFFFFFF
+    return Hash
+
+# Builds a perfect hash of the op names with hash and displace.
+# Names are split in to buckets by their unseeded hash, then each bucket gets the first seed that
+# places all of its names in free slots, largest buckets first.
+# Returns [Seeds per bucket, Op index per slot]
+def build_op_name_hash(names):
+    NumBuckets = max(1, len(names) // 2)
+    NumSlots = 1
+    while NumSlots < len(names) * 2:
+        NumSlots *= 2
+
+    Buckets = [[] for i in range(NumBuckets)]
+    for Index, Name in enumerate(names):
+        Buckets[op_name_hash(Name, 0) % NumBuckets].append(Index)
+
+    Seeds = [0] * NumBuckets
+    Slots = [None] * NumSlots
+    for Bucket in sorted(range(NumBuckets), key = lambda Bucket: -len(Buckets[Bucket])):
+        if len(Buckets[Bucket]) == 0:
+            continue
+
+        for Seed in range(1, 0x10000):
+            Placed = set(op_name_hash(names[Index], Seed) & (NumSlots - 1) for Index in Buckets[Bucket])
+            if len(Placed) == len(Buckets[Bucket]) and all(Slots[Slot] == None for Slot in Placed):
+                break
+        else:
+            ExitError("Couldn't find a perfect hash for the IR op names")
+
+        Seeds[Bucket] = Seed
+        for Index in Buckets[Bucket]:
+            Slots[op_name_hash(names[Index], Seed) & (NumSlots - 1)] = Index
+
+    return [Seeds, Slots]
+
+# Print out the tables driving the IR parser
+# Included inside of the parser class
+def print_ir_parser_tables():
+    output_file.write("#ifdef IROP_PARSER_TABLES\n")
+
+    ArgTypes = []
+    for op in IROps:
+        if is_parser_table_driven(op):
+            for arg in op.Arguments:
+                CType = get_parser_arg_type(arg)
+                if not CType in ArgTypes:
+                    ArgTypes.append(CType)
+
+    output_file.write("enum class ArgKind : uint8_t {\n")
+    for CType in ArgTypes:
+        output_file.write("\t{},\n".format(get_parser_arg_kind(CType)))
+    output_file.write("};\n\n")
+
+    output_file.write("DecodeFailure DecodeArg(ArgKind Kind, const std::string &Arg, ParsedArg *Out) {\n")
+    output_file.write("\tswitch (Kind) {\n")
+    for CType in ArgTypes:
+        output_file.write("\t\tcase ArgKind::{}: return Out->Set(DecodeValue<{}>(Arg));\n".format(get_parser_arg_kind(CType), CType))
+    output_file.write("\t}\n")
+    output_file.write("\treturn DecodeFailure::DECODE_UNKNOWN_TYPE;\n")
+    output_file.write("}\n\n")
+
+    # Argument kinds of every op, sequences that already exist in the table get shared
+    Kinds = []
+    Offsets = []
+    MaxArgs = 0
+    for op in IROps:
+        OpKinds = [get_parser_arg_kind(get_parser_arg_type(arg)) for arg in op.Arguments]
+        Offset = 0
+        if is_parser_table_driven(op) and len(OpKinds) != 0:
+            MaxArgs = max(MaxArgs, len(OpKinds))
+            Offset = next((i for i in range(len(Kinds) - len(OpKinds) + 1) if Kinds[i:i + len(OpKinds)] == OpKinds), None)
+            if Offset == None:
+                Offset = len(Kinds)
+                Kinds.extend(OpKinds)
+        Offsets.append(Offset)
+
+    output_file.write("static constexpr size_t MaxOpArgs = {};\n".format(MaxArgs))
+    output_file.write("// Ops that the parser handles by hand\n")
+    output_file.write("static constexpr uint8_t NotTableDriven = 0xFF;\n\n")
+
+    output_file.write("static constexpr std::array<uint8_t, OP_LAST + 1> OpArgCounts = {\n")
+    for op in IROps:
+        if is_parser_table_driven(op):
+            output_file.write("\t{},\n".format(len(op.Arguments)))
+        else:
+            output_file.write("\tNotTableDriven, // {}\n".format(op.Name))
+    output_file.write("};\n\n")
+
+    output_file.write("static constexpr std::array<uint16_t, OP_LAST + 1> OpArgOffsets = {\n")
+    for Offset in Offsets:
+        output_file.write("\t{},\n".format(Offset))
+    output_file.write("};\n\n")
+
+    output_file.write("static constexpr std::array<ArgKind, {}> OpArgKinds = {{\n".format(max(1, len(Kinds))))
+    for Kind in Kinds:
+        output_file.write("\tArgKind::{},\n".format(Kind))
+    output_file.write("};\n\n")
+
+    Names = [op.Name for op in IROps]
+    Seeds, Slots = build_op_name_hash(Names)
+
+    output_file.write("static constexpr uint32_t OpNameHash(std::string_view Name, uint32_t Seed) {\n")
+    output_file.write("\tuint32_t Hash = 2166136261U ^ Seed;\n")
+    output_file.write("\tfor (char c : Name) {\n")
+    output_file.write("\t\tHash ^= static_cast<uint8_t>(c);\n")
+    output_file.write("\t\tHash *= 16777619U;\n")
+    output_file.write("\t}\n")
+    output_file.write("\treturn Hash;\n")
+    output_file.write("}\n\n")
+
+    output_file.write("static constexpr std::array<uint16_t, {}> OpNameSeeds = {{\n".format(len(Seeds)))
+    for Seed in Seeds:
+        output_file.write("\t{},\n".format(Seed))
+    output_file.write("};\n\n")
+
+    output_file.write("// Unused slots hold OP_DUMMY, the name check rejects anything landing in one\n")
+    output_file.write("static constexpr std::array<IROps, {}> OpNameSlots = {{\n".format(len(Slots)))
+    for Slot in Slots:
+        output_file.write("\tOP_{},\n".format(("Dummy" if Slot == None else Names[Slot]).upper()))
+    output_file.write("};\n\n")
+
+    output_file.write("static std::optional<IROps> FindOp(std::string_view Name) {\n")
+    output_file.write("\tconst auto Seed = OpNameSeeds[OpNameHash(Name, 0) % OpNameSeeds.size()];\n")
+    output_file.write("\tconst auto Op = OpNameSlots[OpNameHash(Name, Seed) & (OpNameSlots.size() - 1)];\n")
+    output_file.write("\tif (GetName(Op) != Name) {\n")
+    output_file.write("\t\treturn std::nullopt;\n")
+    output_file.write("\t}\n")
+    output_file.write("\treturn Op;\n")
+    output_file.write("}\n")
+
+    output_file.write("#undef IROP_PARSER_TABLES\n")
+    output_file.write("#endif\n\n")
+
+# Print out the parser switch, arguments are already decoded through the parser tables
+def print_ir_parser_switch_helper():
+    output_file.write("#ifdef IROP_PARSER_SWITCH_HELPERS\n")
+    for op in IROps:
+        if is_parser_table_driven(op):
+            output_file.write("\tcase FEXCore::IR::IROps::OP_%s: {\n" % (op.Name.upper()))
+
+            output_file.write("\t\tDef.Node = _{}(".format(op.Name))
+            output_file.write(", ".join("DecodedArgs[{}].Get<{}>()".format(i, get_parser_arg_type(arg)) for i, arg in enumerate(op.Arguments)))
+            output_file.write(");\n")
 
             output_file.write("\t\tSSANameMapper[Def.Definition] = Def.Node;\n")
 
@@ -732,36 +1066,208 @@ def print_ir_parser_switch_helper():
     output_file.write("#undef IROP_PARSER_SWITCH_HELPERS\n")
     output_file.write("#endif\n")
 
-if (len(sys.argv) < 3):
-    ExitError()
+# Hash over everything the compact encoding depends on
+# Any change to an op's name, order or stored arguments invalidates previously encoded IR
+def get_ir_schema_hash():
+    Schema = hashlib.sha256()
+    Schema.update("Header:{}:{}\n".format(IROpHeaderSize, SSAArgSize).encode("utf-8"))
+    for op in IROps:
+        Schema.update("{}:{}".format(op.Name, op.SSAArgNum).encode("utf-8"))
+        for arg in get_stored_non_ssa_args(op):
+            Schema.update(":{}:{}:{}".format(arg.Name, IRTypesToCXX[arg.Type].CXXName, arg.DefaultInitializer).encode("utf-8"))
+        Schema.update(b"\n")
+    return int.from_bytes(Schema.digest()[:8], "little")
+
+def get_serializer_default(arg):
+    CType = IRTypesToCXX[arg.Type].CXXName
+    if arg.DefaultInitializer == None:
+        return "{}{{}}".format(CType)
+    # Struct defaults like CondClass:$Cond{{COND_NEQ}} are already a braced list
+    if arg.DefaultInitializer.startswith("{"):
+        return "{}{}".format(CType, arg.DefaultInitializer)
+    return "{}{{{}}}".format(CType, arg.DefaultInitializer)
+
+# Print out the per-op encoder and decoder of the compact IR encoding
+# Field presence mask: bit 0 is Header.Size, bit 1 is Header.ElementSize, then one bit per stored non-SSA argument.
+# Fields matching their default initializer aren't written.
+def print_ir_serializer():
+    output_file.write("#ifdef IROP_SERIALIZER\n")
+
+    output_file.write("// Hash of every op's name, order and stored arguments\n")
+    output_file.write("static constexpr uint64_t IRSchemaHash = 0x{:016X}ULL;\n".format(get_ir_schema_hash()))
+    output_file.write("// Size of the largest op struct, bounds the data size of encoded IR\n")
+    output_file.write("static constexpr size_t MaxOpSize = {};\n\n".format(max(op.OpSize for op in IROps)))
+
+    output_file.write("static bool EncodeOp(const IROp_Header *IROp, uint32_t Base, CompactWriter &Writer) {\n")
+    output_file.write("\tswitch (IROp->Op) {\n")
+    for op in IROps:
+        if op.Name == "Last":
+            continue
 
-output_filename = sys.argv[2]
-json_file = open(sys.argv[1], "r")
-json_text = json_file.read()
-json_file.close()
+        Args = get_stored_non_ssa_args(op)
+        output_file.write("\t\tcase OP_{}: {{\n".format(op.Name.upper()))
+        output_file.write("\t\t\t[[maybe_unused]] auto Op = IROp->C<IROp_{}>();\n".format(op.Name))
+        output_file.write("\t\t\tuint64_t Present = Writer.HeaderMask(IROp);\n")
+        for i, arg in enumerate(Args):
+            output_file.write("\t\t\tif (!IsDefault(Op->{}, {})) Present |= 1ULL << {};\n".format(arg.Name, get_serializer_default(arg), i + 2))
+
+        output_file.write("\t\t\tWriter.Op(IROp, Present);\n")
+        for i in range(op.SSAArgNum):
+            output_file.write("\t\t\tWriter.SSA(IROp->Args[{}], Base);\n".format(i))
+        for i, arg in enumerate(Args):
+            output_file.write("\t\t\tif (Present & (1ULL << {})) Writer.Field(Op->{});\n".format(i + 2, arg.Name))
+        output_file.write("\t\t\treturn true;\n")
+        output_file.write("\t\t}\n")
+    output_file.write("\t\tdefault: return false;\n")
+    output_file.write("\t}\n")
+    output_file.write("}\n\n")
+
+    output_file.write("// Op is already range checked, the op's storage is GetSize(Op) bytes\n")
+    output_file.write("static void DecodeOp(IROps Opcode, IROp_Header *IROp, uint32_t Base, CompactReader &Reader) {\n")
+    output_file.write("\tswitch (Opcode) {\n")
+    for op in IROps:
+        if op.Name == "Last":
+            continue
 
-json_object = json.loads(json_text)
-json_object = {k.upper(): v for k, v in json_object.items()}
+        Args = get_stored_non_ssa_args(op)
+        output_file.write("\t\tcase OP_{}: {{\n".format(op.Name.upper()))
+        output_file.write("\t\t\t[[maybe_unused]] auto Op = IROp->CW<IROp_{}>();\n".format(op.Name))
+        output_file.write("\t\t\t[[maybe_unused]] const uint64_t Present = Reader.Header(Opcode, IROp);\n")
+        for i in range(op.SSAArgNum):
+            output_file.write("\t\t\tIROp->Args[{}] = Reader.SSA(Base);\n".format(i))
+        for i, arg in enumerate(Args):
+            output_file.write("\t\t\tOp->{} = (Present & (1ULL << {})) ? Reader.Field<{}>() : {};\n".format(arg.Name, i + 2, IRTypesToCXX[arg.Type].CXXName, get_serializer_default(arg)))
+        output_file.write("\t\t\tbreak;\n")
+        output_file.write("\t\t}\n")
+    output_file.write("\t\tdefault: Reader.Fail(); break;\n")
+    output_file.write("\t}\n")
+    output_file.write("}\n")
+
+    output_file.write("#undef IROP_SERIALIZER\n")
+    output_file.write("#endif\n\n")
+
+# Only writes the file if the generated contents changed.
+# An unchanged output keeps its mtime so nothing including it gets rebuilt.
+def write_if_changed(filename, text):
+    data = text.encode("utf-8")
+    try:
+        with open(filename, "rb") as existing_file:
+            if hashlib.sha256(existing_file.read()).digest() == hashlib.sha256(data).digest():
+                return False
+    except OSError:
+        pass
+
+    with open(filename, "wb") as new_file:
+        new_file.write(data)
+    return True
+
+# Generates a section in to memory
+def generate_section(section):
+    global output_file
+    output_file = io.StringIO()
+    Sections[section]()
+    text = output_file.getvalue()
+    output_file = None
+    return text
+
+# Parses IR.json in to IRTypesToCXX and IROps. Returns the whole JSON object with upper case keys
+def parse_ir_json(filename):
+    Model = json_ir_model.load_ir_model(filename)
+
+    IRTypesToCXX.update(Model.IRTypesToCXX)
+    CXXTypeToIR.update(Model.CXXTypeToIR)
+    IROps.extend(Model.IROps)
+    IROpNameMap.update(Model.IROpNameMap)
+    calculate_op_sizes()
+    return Model
+
+# Args: [Options] <IR.json> <Output> [<Section>=<Section output>...]
+# Sections given their own output file are left out of the main output.
+# Options:
+#   --layout-report <File>: Writes the size and field alignment of every op
+#   --size-budget <Bytes>: Fails if any op struct is larger
+#   --doc <File>: Writes the IR documentation
+#   --cost-report <File>: Writes the ops missing cost data
+#   --model-cache <Folder>: Caches the parsed IR.json in this folder, private to the user. Nothing is cached without it
+def main():
+    global SizeBudget, Sections
+    Usage = "Usage: {} [--layout-report <File>] [--size-budget <Bytes>] [--doc <File>] [--cost-report <File>] [--model-cache <Folder>] <IR.json> <Output> [<Section>=<Section output>...]".format(sys.argv[0])
+
+    Args = sys.argv[1:]
+    LayoutReport = None
+    Doc = None
+    CostReport = None
+    while len(Args) > 1 and Args[0].startswith("--"):
+        if Args[0] == "--layout-report":
+            LayoutReport = Args[1]
+        elif Args[0] == "--size-budget":
+            SizeBudget = int(Args[1])
+        elif Args[0] == "--doc":
+            Doc = Args[1]
+        elif Args[0] == "--cost-report":
+            CostReport = Args[1]
+        elif Args[0] == "--model-cache":
+            json_ir_model.CacheDir = Args[1]
+        else:
+            ExitError(Usage)
+        Args = Args[2:]
+
+    if (len(Args) < 2):
+        ExitError(Usage)
+
+    output_filename = Args[1]
+    Model = parse_ir_json(Args[0])
+    defines = Model.Defines
+
+    if SizeBudget != None:
+        check_op_size_budget(SizeBudget)
+
+    # Every generated section keyed by the define guarding it, in output order
+    Sections = {
+        "IROP_ENUM": print_enums,
+        "IROP_STRUCTS": lambda: print_ir_structs(defines),
+        "IROP_SIZES": print_ir_sizes,
+        "IROP_DESCRIPTORS": print_ir_descriptors,
+        "IROP_TRAITS": print_ir_traits,
+        "IROP_COSTS": print_ir_costs,
+        "IROP_REG_CLASSES_IMPL": print_ir_reg_classes,
+        "IROP_GETNAME_IMPL": print_ir_getname,
+        "IROP_GETRAARGS_IMPL": print_ir_getraargs,
+        "IROP_HASSIDEEFFECTS_IMPL": print_ir_hassideeffects,
+        "IROP_GETHASDEST_IMPL": print_ir_gethasdest,
+        "IROP_ARGPRINTER_HELPER": print_ir_arg_printer,
+        "IROP_ALLOCATE_HELPERS": print_ir_allocator_helpers,
+        "IROP_PARSER_TABLES": print_ir_parser_tables,
+        "IROP_PARSER_SWITCH_HELPERS": print_ir_parser_switch_helper,
+        "IROP_EMITTER_BENCHMARK": lambda: print_ir_emitter_benchmark(Model.BenchmarkArgs),
+        "IROP_COUNTERS": print_ir_counters,
+        "IROP_SERIALIZER": print_ir_serializer,
+    }
+
+    SectionOutputs = {}
+    for arg in Args[2:]:
+        Split = arg.split("=", 1)
+        if len(Split) != 2 or not Split[0] in Sections:
+            ExitError("Unknown section output {}. Needs to be <Section>=<Output> with one of {}".format(arg, ", ".join(Sections)))
+        SectionOutputs[Split[0]] = Split[1]
+
+    output_text = ""
+    for section in Sections:
+        if section in SectionOutputs:
+            write_if_changed(SectionOutputs[section], generate_section(section))
+        else:
+            output_text += generate_section(section)
 
-ops = json_object["OPS"]
-irtypes = json_object["IRTYPES"]
-defines = json_object["DEFINES"]
+    write_if_changed(output_filename, output_text)
 
-parse_irtypes(irtypes)
-parse_ops(ops)
+    if LayoutReport != None:
+        write_if_changed(LayoutReport, get_layout_report())
 
-output_file = open(output_filename, "w")
+    if CostReport != None:
+        write_if_changed(CostReport, get_cost_report())
 
-print_enums()
-print_ir_structs(defines)
-print_ir_sizes()
-print_ir_reg_classes()
-print_ir_getname()
-print_ir_getraargs()
-print_ir_hassideeffects()
-print_ir_gethasdest()
-print_ir_arg_printer()
-print_ir_allocator_helpers()
-print_ir_parser_switch_helper()
+    if Doc != None:
+        write_if_changed(Doc, json_ir_doc_generator.get_ir_doc(Model))
 
-output_file.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/bin/python3
+import collections
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+from dataclasses import dataclass
+
+# The parsed IR.json model shared by every script generating something from the IR.
+# Parsing can be cached on disk keyed by the hash of the JSON, so a build only pays for it once however many scripts use it.
+
+# The cache is only used when given a folder, with the FEX_IR_MODEL_CACHE environment variable or by setting CacheDir.
+# Cache files are plain JSON, but ops in them end up in generated sources. The folder is created 0700 and the cache
+# is ignored if the folder or a cache file is owned or writable by anyone else.
+CacheDir = os.getenv("FEX_IR_MODEL_CACHE")
+
+def ExitError(msg):
+    print(msg)
+    sys.exit(-1)
+
+@dataclass
+class IRType:
+    IRName: str
+    CXXName: str
+    def __init__(self, IRName, CXXName):
+        self.IRName = IRName
+        self.CXXName = CXXName
+
+@dataclass
+class OpArgument:
+    Type: str
+    IsSSA: bool
+    Temporary: bool
+    Name: str
+    NameWithPrefix: str
+    DefaultInitializer: str
+
+    def __init__(self):
+        self.Type = None
+        self.IsSSA = False
+        self.Temporary = False
+        self.Name = None
+        self.NameWithPrefix = None
+        self.DefaultInitializer = None
+        return
+
+    def print(self):
+        attrs = vars(self)
+        print(", ".join("%s: %s" % item for item in attrs.items()))
+
+@dataclass
+class OpDefinition:
+    Name: str
+    HasDest: bool
+    DestType: str
+    DestSize: str
+    NumElements: str
+    OpClass: str
+    HasSideEffects: bool
+    RAOverride: int
+    SwitchGen: bool
+    ArgPrinter: bool
+    SSAArgNum: int
+    NonSSAArgNum: int
+    Arguments: list
+    EmitValidation: list
+    Desc: list
+
+    def __init__(self):
+        self.Name = None
+        self.HasDest = False
+        self.DestType = None
+        self.DestSize = None
+        self.NumElements = None
+        self.OpClass = None
+        self.OpSize = 0
+        self.HasSideEffects = False
+        self.RAOverride = -1
+        self.SwitchGen = True
+        self.ArgPrinter = True
+        self.SSAArgNum = 0
+        self.NonSSAArgNum = 0
+        self.Arguments = []
+        self.EmitValidation = []
+        self.Traits = []
+        # Backend to {Attribute: Value} for the cost attributes IR.json has for the op
+        self.Costs = {}
+        # Argument name to the C++ value the emitter benchmark passes for it
+        self.BenchmarkArgs = {}
+        self.Desc = []
+        return
+
+    def print(self):
+        attrs = vars(self)
+        print(", ".join("%s: %s" % item for item in attrs.items()))
+
+# Optional semantic traits of ops, each becomes a bitset over every op for the optimization passes
+OpTraits = ["Commutative"]
+
+# Backends ops can have estimated costs for, and the attributes of each estimate
+# Latency: cycles until the result is available
+# Throughput: reciprocal throughput, cycles per op when independent ops are issued back to back
+# CodeSize: bytes of host code the backend emits for the op
+CostBackends = ["Arm64", "X86_64"]
+CostAttributes = ["Latency", "Throughput", "CodeSize"]
+
+def is_ssa_type(type):
+    if (type == "SSA" or
+       type == "GPR" or
+       type == "GPRPair" or
+       type == "FPR"):
+       return True
+    return False
+
+def parse_irtypes(model, irtypes):
+    for op_key, op_val in irtypes.items():
+        model.IRTypesToCXX[op_key] = IRType(op_key, op_val)
+        model.CXXTypeToIR[op_val] = IRType(op_key, op_val)
+
+def parse_ops(model, ops):
+    for op_class, opslist in ops.items():
+        model.OpClasses.setdefault(op_class, [])
+        for op, op_val in opslist.items():
+            model.OpClasses[op_class].append([op, op_val])
+
+            if "Ignore" in op_val:
+                # Skip these
+                continue
+
+            OpDef = OpDefinition()
+
+            # Check if we have a destination
+            # Only happens if the IR name contains `=`
+            EqualSplit = op.split("=", 1)
+
+            RHS = EqualSplit[0].strip()
+            if len(EqualSplit) > 1:
+                OpDef.HasDest = True
+                RHS = EqualSplit[1].strip()
+
+                # Parse the destination, must be one type of SSA, GPR, or FPR
+                ResultType = EqualSplit[0].strip()
+                if ResultType == "SSA":
+                    OpDef.DestType = "SSA" # We don't know this type right now
+                elif ResultType == "GPR":
+                    OpDef.DestType = "GPR"
+                elif ResultType == "GPRPair":
+                    OpDef.DestType = "GPRPair"
+                elif ResultType == "FPR":
+                    OpDef.DestType = "FPR"
+                else:
+                    ExitError("Unknown destination class type {}. Needs to be one of {SSA, GPR, GPRPair, FPR}".format(ResultType))
+
+            # IR Op needs to start with a name
+            RHS = RHS.split(" ", 1)
+
+            if len(RHS) < 1:
+                ExitError("Missing IR op name. Needs to be a string")
+
+            # Set the op name
+            OpDef.Name = RHS[0]
+
+            # Parse the arguments
+            if len(RHS) > 1:
+                Arguments = RHS[1].strip().split(",")
+                for Argument in Arguments:
+                    Argument = Argument.strip()
+                    OpArg = OpArgument()
+
+                    Split = Argument.split(":")
+                    if len(Split) != 2:
+                        ExitError("Error parsing argument. Missing Type and name colon split")
+
+                    # Type is the first argument
+                    OpArg.Type = Split[0]
+
+                    # Validate typing is in our type map
+                    if not OpArg.Type in model.IRTypesToCXX:
+                        ExitError("IR type {} isn't in IR type map. From IR op {}, argument {}".format(OpArg.Type, OpDef.Name, Argument))
+
+                    # Style is the first byte of the name
+                    if Split[1][0] == "#":
+                        OpArg.Temporary = True
+                        OpArg.IsSSA = False
+                    elif Split[1][0] == "$":
+                        OpArg.Temporary = False
+                        OpArg.IsSSA = is_ssa_type(OpArg.Type)
+                        if OpArg.IsSSA:
+                            OpDef.SSAArgNum = OpDef.SSAArgNum + 1
+                        else:
+                            OpDef.NonSSAArgNum = OpDef.NonSSAArgNum + 1
+                    else:
+                        ExitError("IR Op {} missing value argument style specifier. Needs to be one of {{#, $}}".format(OpDef.Name))
+
+                    Prefix = Split[1][0]
+                    ArgName = Split[1][1:]
+                    NameWithPrefix = Prefix + ArgName
+
+                    if len(ArgName) == 0:
+                        ExitError("Argument is missing variable name")
+
+                    DefaultInit = ArgName.split("{", 1)
+                    if len(DefaultInit) > 1:
+                        # We have a default initializer, need to do some more work
+                        # First argument will still be the argument name
+                        ArgName = DefaultInit[0].strip()
+                        NameWithPrefix = Prefix + ArgName
+                        # Second argument will be the default initializer
+                        # Since we stripped the opening curly brace then it'll end with a closing brace
+                        if DefaultInit[1][-1] != "}":
+                            ExitError("IR op {} Argument {} is missing closing curly brace in default initializer?".format(OpDef.Name, ArgName))
+
+                        OpArg.DefaultInitializer = DefaultInit[1][:-1]
+
+                    # If SSA type then we can generate validation for this op
+                    if (OpArg.IsSSA and
+                        (OpArg.Type == "GPR" or
+                        OpArg.Type == "GPRPair" or
+                        OpArg.Type == "FPR")):
+                        OpDef.EmitValidation.append("GetOpRegClass({}) == InvalidClass || WalkFindRegClass({}) == {}Class".format(NameWithPrefix, NameWithPrefix, OpArg.Type))
+
+                    OpArg.Name = ArgName
+                    OpArg.NameWithPrefix = NameWithPrefix
+                    OpDef.Arguments.append(OpArg)
+
+            # Additional metadata
+            if "DestSize" in op_val:
+                OpDef.DestSize = op_val["DestSize"]
+
+            if "NumElements" in op_val:
+                OpDef.NumElements = op_val["NumElements"]
+
+            if len(op_class):
+                OpDef.OpClass = op_class
+
+            if "HasSideEffects" in op_val:
+                OpDef.HasSideEffects = bool(op_val["HasSideEffects"])
+
+            if "ArgPrinter" in op_val:
+                OpDef.ArgPrinter = bool(op_val["ArgPrinter"])
+
+            if "RAOverride" in op_val:
+                OpDef.RAOverride = int(op_val["RAOverride"])
+
+            for Trait in OpTraits:
+                if Trait in op_val and bool(op_val[Trait]):
+                    OpDef.Traits.append(Trait)
+
+            if "Cost" in op_val:
+                OpDef.Costs = parse_op_costs(OpDef, op_val["Cost"])
+
+            if "BenchmarkArgs" in op_val:
+                OpDef.BenchmarkArgs = parse_benchmark_args(OpDef, op_val["BenchmarkArgs"])
+
+            if "SwitchGen" in op_val:
+                OpDef.SwitchGen = op_val["SwitchGen"]
+
+            if "EmitValidation" in op_val:
+                OpDef.EmitValidation.extend(op_val["EmitValidation"])
+
+            if "Desc" in op_val:
+                OpDef.Desc = op_val["Desc"]
+
+            # Do some fixups of the data here
+            if len(OpDef.EmitValidation) != 0:
+                for i in range(len(OpDef.EmitValidation)):
+                    # Patch up all the argument names
+                    for Arg in OpDef.Arguments:
+                        if Arg.Temporary:
+                            # Temporary ops just replace all instances no prefix variant
+                            OpDef.EmitValidation[i] = OpDef.EmitValidation[i].replace(Arg.NameWithPrefix, Arg.Name)
+                        else:
+                            # All other ops replace $ with _ variant for argument passed in
+                            OpDef.EmitValidation[i] = OpDef.EmitValidation[i].replace(Arg.NameWithPrefix, "_{}".format(Arg.Name))
+
+            #OpDef.print()
+
+            check_op_traits(OpDef)
+
+            # Error on duplicate op
+            if OpDef.Name in model.IROpNameMap:
+                ExitError("Duplicate Op defined! {}".format(OpDef.Name))
+
+            model.IROps.append(OpDef)
+            model.IROpNameMap[OpDef.Name] = OpDef
+
+    # Sort the classes after we are done parsing them
+    model.OpClasses = collections.OrderedDict(sorted(model.OpClasses.items()))
+
+def parse_op_costs(op, costs):
+    Costs = {}
+    for Backend, Attributes in costs.items():
+        if not Backend in CostBackends:
+            ExitError("IR op {} has a cost for unknown backend {}. Needs to be one of {}".format(op.Name, Backend, ", ".join(CostBackends)))
+
+        Costs[Backend] = {}
+        for Attribute, Value in Attributes.items():
+            if not Attribute in CostAttributes:
+                ExitError("IR op {} has unknown cost attribute {}. Needs to be one of {}".format(op.Name, Attribute, ", ".join(CostAttributes)))
+            if not isinstance(Value, (int, float)) or isinstance(Value, bool) or Value < 0:
+                ExitError("IR op {} cost attribute {} for {} needs to be a non-negative number".format(op.Name, Attribute, Backend))
+            Costs[Backend][Attribute] = Value
+    return Costs
+
+def parse_benchmark_args(op, args):
+    Names = [arg.Name for arg in op.Arguments if not arg.IsSSA]
+    for Name, Value in args.items():
+        if not Name in Names:
+            ExitError("IR op {} has a benchmark value for {}, which isn't one of its non-SSA arguments".format(op.Name, Name))
+        if not isinstance(Value, str):
+            ExitError("IR op {} benchmark value for {} needs to be a string".format(op.Name, Name))
+    return args
+
+def check_op_traits(op):
+    if "Commutative" in op.Traits and (op.SSAArgNum != 2 or not op.HasDest):
+        ExitError("Commutative ops need a destination and two SSA arguments: {}".format(op.Name))
+
+class IRModel:
+    def __init__(self, json_object):
+        self.IRTypesToCXX = {}
+        self.CXXTypeToIR = {}
+        # Every op that isn't ignored, in IR.json order
+        self.IROps = []
+        self.IROpNameMap = {}
+        # Every op in IR.json as [Name, JSON object] per op class, sorted by class
+        self.OpClasses = collections.OrderedDict()
+        self.Defines = json_object["DEFINES"]
+        # Argument name to the value the emitter benchmark passes for it, ops can override these
+        self.BenchmarkArgs = json_object.get("BENCHMARKARGS", {})
+
+        parse_irtypes(self, json_object["IRTYPES"])
+        parse_ops(self, json_object["OPS"])
+
+# Parsing changes invalidate the cache as well, this file is part of the key
+def get_cache_key(json_text):
+    Key = hashlib.sha256(json_text)
+    with open(__file__, "rb") as mf:
+        Key.update(mf.read())
+    return Key.hexdigest()
+
+def is_private(stat_result):
+    return stat_result.st_uid == os.getuid() and (stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH)) == 0
+
+def make_private_dir(dir):
+    try:
+        os.makedirs(dir, mode = 0o700)
+    except FileExistsError:
+        pass
+
+    return is_private(os.stat(dir))
+
+# The model is plain data, everything is stored as JSON objects and lists
+def model_to_json(model):
+    return {
+        "IRTypes": [[Type.IRName, Type.CXXName] for Type in model.IRTypesToCXX.values()],
+        "IROps": [dict(vars(op), Arguments = [vars(arg) for arg in op.Arguments]) for op in model.IROps],
+        "OpClasses": list(model.OpClasses.items()),
+        "Defines": model.Defines,
+        "BenchmarkArgs": model.BenchmarkArgs,
+    }
+
+def model_from_json(json_object):
+    model = IRModel.__new__(IRModel)
+    model.IRTypesToCXX = {}
+    model.CXXTypeToIR = {}
+    for IRName, CXXName in json_object["IRTypes"]:
+        model.IRTypesToCXX[IRName] = IRType(IRName, CXXName)
+        model.CXXTypeToIR[CXXName] = IRType(IRName, CXXName)
+
+    model.IROps = []
+    model.IROpNameMap = {}
+    for op_object in json_object["IROps"]:
+        OpDef = OpDefinition()
+        vars(OpDef).update(op_object)
+        OpDef.Arguments = []
+        for arg_object in op_object["Arguments"]:
+            OpArg = OpArgument()
+            vars(OpArg).update(arg_object)
+            OpDef.Arguments.append(OpArg)
+        model.IROps.append(OpDef)
+        model.IROpNameMap[OpDef.Name] = OpDef
+
+    model.OpClasses = collections.OrderedDict((op_class, ops) for op_class, ops in json_object["OpClasses"])
+    model.Defines = json_object["Defines"]
+    model.BenchmarkArgs = json_object["BenchmarkArgs"]
+    return model
+
+def load_cached_model(filename):
+    try:
+        if not is_private(os.stat(CacheDir)):
+            return None
+
+        with open(filename, "r") as cf:
+            if not is_private(os.fstat(cf.fileno())):
+                return None
+            return model_from_json(json.load(cf))
+    except (OSError, ValueError, KeyError, TypeError):
+        # Missing or corrupt cache, the model just gets parsed again
+        return None
+
+def store_cached_model(filename, model):
+    TempFilename = None
+    try:
+        if not make_private_dir(CacheDir):
+            print("Not caching the IR model, {} is shared with other users".format(CacheDir), file = sys.stderr)
+            return
+
+        # Write to a temporary first, concurrent builds only ever see complete cache files
+        FD, TempFilename = tempfile.mkstemp(dir = CacheDir)
+        with os.fdopen(FD, "w") as cf:
+            json.dump(model_to_json(model), cf)
+        os.replace(TempFilename, filename)
+        TempFilename = None
+    except OSError as e:
+        # The cache is only an optimization, never fail generation because of it
+        print("Couldn't cache the IR model:", e, file = sys.stderr)
+    finally:
+        if TempFilename != None:
+            try:
+                os.unlink(TempFilename)
+            except OSError:
+                pass
+
+def load_ir_model(filename):
+    with open(filename, "rb") as json_file:
+        json_text = json_file.read()
+
+    CacheFile = None
+    if CacheDir:
+        CacheFile = os.path.join(CacheDir, "IR-{}.json".format(get_cache_key(json_text)))
+        Model = load_cached_model(CacheFile)
+        if Model != None:
+            return Model
+
+    json_object = json.loads(json_text)
+    json_object = {k.upper(): v for k, v in json_object.items()}
+
+    Model = IRModel(json_object)
+    if CacheFile != None:
+        store_cached_model(CacheFile, Model)
+    return Model
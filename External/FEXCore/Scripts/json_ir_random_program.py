@@ -0,0 +1,478 @@
+#!/bin/python3
+import os
+import random
+import re
+import sys
+
+import json_ir_generator
+
+# Synthesizes random valid IR programs in the unittests/IR text format.
+# Ops, register classes, destination sizes and argument types all come from the op model json_ir_generator.py builds from IR.json.
+# The programs are a corpus for timing the register allocator and optimization passes as blocks grow to thousands of ops.
+#
+# Every block loads its live-ins from the guest registers, runs random ops over them and stores every value still live
+# at the end back to the guest registers or to scratch memory, like frontend generated blocks do.
+# SSA values never cross blocks, blocks only branch forward and the last block ends in a Break.
+
+# Args: [--seed <N>] [--blocks <N>] [--pressure <N>] [--mix <Name>=<Weight>,...] <IR.json> <Ops>[,<Ops>...] <Output>
+# --blocks splits the ops over that many blocks.
+# --pressure is the number of values kept live per register class, the guest has 16 of each.
+# --mix weighs op classes or single ops by name, a class weight is shared by all ops of the class.
+# With a single op count Output is the .ir file, otherwise a folder receiving one Random_<Ops>.ir per count.
+
+DefaultMix = {
+    "ALU": 4,
+    "Vector": 2,
+    "Conv": 1,
+    "Memory": 1,
+}
+
+# Ops that fault or depend on runtime state the generated programs can't set up
+ExcludedOps = [
+    "Div", "UDiv", "Rem", "URem", "LDiv", "LUDiv", "LRem", "LURem",
+    "EntrypointOffset", "LoadFlag", "GetHostFlag", "CycleCounter",
+    # Only valid with the control flow the SSA passes build them for
+    "Phi", "PhiValue",
+]
+
+# Op classes that need setup beyond what the generator does
+ExcludedOpClasses = ["Branch", "Misc", "Backend", "StaticRA", "F80", "Atomic"]
+
+# Ops without a destination that only write to their address argument, pointed at scratch memory
+MemoryStoreOps = ["StoreMem", "StoreMemTSO", "CacheLineZero"]
+
+GuestRegisterCount = 16
+# offsetof(CPUState, gregs)
+GPROffset = 0x8
+# offsetof(CPUState, xmm), registers use the AVX layout of 32 bytes each since the config asks for the AVX host feature
+FPROffset = 0xC0
+FPRStride = 0x20
+
+ScratchBase = 0x1000000
+
+IntegerConds = ["EQ", "NEQ", "UGE", "ULT", "MI", "PL", "UGT", "ULE", "SGE", "SLT", "SGT", "SLE"]
+
+# Size arguments are decided first, everything else is constrained by them
+ArgumentOrder = ["Class", "RegisterSize", "Size", "DestSize", "ElementSize", "SrcElementSize", "DstElementSize", "DestElementSize"]
+
+# Attempts at picking arguments that give an op a valid destination before giving up on the op
+MaxAttempts = 16
+
+# Conversions between integer and float elements, both backends only convert 4 and 8 byte elements
+FloatConversionOps = ["Vector_SToF", "Vector_FToS", "Vector_FToZS", "Float_FromGPR_S", "Float_ToGPR_S", "Float_ToGPR_ZS"]
+
+# Float to float conversions, the destination element size has to differ from the source
+FloatResizeOps = ["Float_FToF", "Vector_FToF"]
+
+def is_float_op(op):
+    return re.match(r"(V?F|Float_|Vector_F)", op.Name) != None or op.Name in FloatConversionOps
+
+def element_sizes(op, Values):
+    Sizes = [4, 8] if is_float_op(op) else [1, 2, 4, 8]
+    return [Size for Size in Sizes if Size <= Values.get("RegisterSize", 8)]
+
+def choose_dest_element_size(op, Values):
+    Sizes = [4, 8]
+    if op.Name in FloatResizeOps:
+        Sizes.remove(Values["SrcElementSize"])
+    return random.choice(Sizes)
+
+def choose_size(op, Values):
+    if Values.get("Class") == "FPR":
+        return random.choice([8, 16])
+    return random.choice([4, 8])
+
+def choose_bits(op, Values):
+    return Values.get("DestSize", 8) * 8
+
+def choose_lsb(op, Values):
+    return random.randrange(choose_bits(op, Values))
+
+def choose_width(op, Values):
+    return random.randint(1, choose_bits(op, Values) - Values.get("lsb", 0))
+
+def choose_element_index(op, Values):
+    return random.randrange(Values["RegisterSize"] // Values["ElementSize"])
+
+# Value pickers for non-SSA arguments, by argument name.
+# Ops with an argument missing here aren't generated.
+ArgumentChoosers = {
+    "Class": lambda op, Values: random.choice(["GPR", "FPR"]),
+    "RegisterSize": lambda op, Values: random.choice([8, 16]),
+    "Size": choose_size,
+    "DestSize": lambda op, Values: random.choice([4, 8]),
+    "ElementSize": lambda op, Values: random.choice(element_sizes(op, Values)),
+    "SrcElementSize": lambda op, Values: random.choice([4, 8]),
+    "DstElementSize": choose_dest_element_size,
+    "DestElementSize": choose_dest_element_size,
+    "BitShift": lambda op, Values: random.randrange(Values["ElementSize"] * 8),
+    "lsb": choose_lsb,
+    "Width": choose_width,
+    "LSB": lambda op, Values: random.randrange(32),
+    "Index": choose_element_index,
+    "DestIdx": choose_element_index,
+    "SrcIdx": choose_element_index,
+    "Immediate": lambda op, Values: random.randrange(256),
+    "Constant": lambda op, Values: random.getrandbits(64),
+    "Cond": lambda op, Values: random.choice(IntegerConds),
+    "CompareSize": lambda op, Values: random.choice([4, 8]),
+    "Align": lambda op, Values: Values["Size"],
+    "OffsetType": lambda op, Values: "SXTX",
+    "OffsetScale": lambda op, Values: 1,
+}
+
+class LiveValue:
+    __slots__ = "Name", "Class", "Size", "Type"
+
+    def __init__(self, Name, Class, Size, Type):
+        self.Name = Name
+        self.Class = Class
+        self.Size = Size
+        self.Type = Type
+
+    def __str__(self):
+        return "%{} {}".format(self.Name, self.Type)
+
+def get_ssa_arg_class(arg, Values):
+    if arg.Type == "SSA":
+        return Values.get("Class")
+    return arg.Type
+
+def get_dest_class(op, Values):
+    if not op.HasDest:
+        return None
+    if op.DestType == "SSA":
+        return Values.get("Class")
+    return op.DestType
+
+# Evaluates one of the C++ size expressions from IR.json with the picked arguments.
+# SSA arguments stand in with the size of the value picked for them.
+def evaluate_size(expr, Values):
+    Expr = re.sub(r"GetOpSize\(_(\w+)\)", r"\1", str(expr))
+    Expr = re.sub(r"std::max(<\w+>)?", "max", Expr).replace("/", "//")
+    Ternary = re.match(r"(.+)\?(.+):(.+)", Expr)
+    if Ternary:
+        Expr = "({1}) if ({0}) else ({2})".format(*Ternary.groups())
+
+    try:
+        return int(eval(Expr, {"max": max}, Values))
+    except (NameError, SyntaxError, TypeError, ZeroDivisionError):
+        return None
+
+def format_argument(arg, Value):
+    if arg.IsSSA:
+        return str(Value) if Value != None else "%Invalid"
+    if isinstance(Value, str):
+        return Value
+    if arg.Type == "i64":
+        return "#0x{:x}".format(Value)
+    return "#{}".format(Value)
+
+def is_generatable(op):
+    if op.Name in ExcludedOps or op.OpClass in ExcludedOpClasses:
+        return False
+
+    # Only stores are allowed to have side effects, everything else has to produce a value
+    if op.HasSideEffects:
+        if op.HasDest or not op.Name in MemoryStoreOps:
+            return False
+    elif not op.HasDest:
+        return False
+
+    if op.HasDest and not op.DestType in ["GPR", "FPR", "SSA"]:
+        return False
+
+    for arg in op.Arguments:
+        if arg.IsSSA:
+            if not arg.Type in ["GPR", "FPR", "SSA"]:
+                return False
+            if arg.Type == "SSA" and not any(Other.Name == "Class" for Other in op.Arguments):
+                return False
+        elif not arg.Name in ArgumentChoosers:
+            return False
+
+    if op.HasDest and op.DestType == "SSA" and not any(arg.Name == "Class" for arg in op.Arguments):
+        return False
+
+    return True
+
+def get_weighted_ops(Mix):
+    Ops = [op for op in json_ir_generator.IROps if op.Name != "Last" and is_generatable(op)]
+
+    ClassCounts = {}
+    for op in Ops:
+        ClassCounts[op.OpClass] = ClassCounts.get(op.OpClass, 0) + 1
+
+    Weighted = []
+    for op in Ops:
+        if op.Name in Mix:
+            Weight = Mix[op.Name]
+        elif op.OpClass in Mix:
+            Weight = Mix[op.OpClass] / ClassCounts[op.OpClass]
+        else:
+            continue
+
+        if Weight > 0:
+            Weighted.append([op, Weight])
+
+    for Name in Mix:
+        if not Name in ClassCounts and not any(op.Name == Name for op in Ops):
+            json_ir_generator.ExitError("'{}' in the op mix isn't an op class or op that can be generated".format(Name))
+
+    if len(Weighted) == 0:
+        json_ir_generator.ExitError("Op mix doesn't select any ops")
+
+    return Weighted
+
+class ProgramWriter:
+    def __init__(self, Pressure):
+        self.Pressure = Pressure
+        self.Lines = []
+        self.NextName = 0
+        self.Live = {}
+        self.Base = None
+        self.ScratchOffset = 0
+        self.ScratchSize = 0
+
+    def new_name(self):
+        self.NextName += 1
+        return "v{}".format(self.NextName)
+
+    def emit(self, Line):
+        self.Lines.append("    " + Line)
+
+    def define(self, Class, Size, Type, Text):
+        Value = LiveValue(self.new_name(), Class, Size, Type)
+        self.emit("%{} {} = {}".format(Value.Name, Type, Text))
+        return Value
+
+    def emit_no_dest(self, Text):
+        self.emit("(%{} i0) {}".format(self.new_name(), Text))
+
+    def constant(self, Constant):
+        return self.define("GPR", 8, "i64", "Constant #0x{:x}".format(Constant))
+
+    # Guest register the n'th live value of a class lives in at block boundaries
+    def register_offset(self, Class, Index):
+        if Class == "GPR":
+            return GPROffset + 8 * Index
+        return FPROffset + FPRStride * Index
+
+    def load_live_in(self, Class):
+        Index = random.randrange(GuestRegisterCount)
+        if Class == "GPR":
+            Value = self.define(Class, 8, "i64", "LoadRegister #0, #0x{:x}, GPR, GPRFixed, #8".format(self.register_offset(Class, Index)))
+        else:
+            Value = self.define(Class, 16, "i128", "LoadRegister #0, #0x{:x}, FPR, FPRFixed, #0x10".format(self.register_offset(Class, Index)))
+        self.Live[Class].append(Value)
+        return Value
+
+    def store_live_outs(self):
+        for Class in ["GPR", "FPR"]:
+            for Index, Value in enumerate(self.Live[Class]):
+                if Index < GuestRegisterCount:
+                    if Class == "GPR":
+                        self.emit_no_dest("StoreRegister {}, #0, #0x{:x}, GPR, GPRFixed, #8".format(Value, self.register_offset(Class, Index)))
+                    else:
+                        self.emit_no_dest("StoreRegister {}, #0, #0x{:x}, FPR, FPRFixed, #0x10".format(Value, self.register_offset(Class, Index)))
+                else:
+                    # Out of guest registers, spill the rest to scratch memory
+                    Addr = self.scratch_address(16)
+                    self.emit_no_dest("StoreMem {}, #{}, {}, {}, %Invalid, #{}, SXTX, #1".format(Class, Value.Size, Value, Addr, Value.Size))
+
+    # Returns a fresh 16 byte aligned scratch memory address
+    def scratch_address(self, Size):
+        Addr = self.constant(ScratchBase + self.ScratchOffset)
+        self.ScratchOffset += Size
+        self.ScratchSize = max(self.ScratchSize, self.ScratchOffset)
+        return Addr
+
+    # Picks a value to use of the class.
+    # Once the class is at the pressure limit the oldest value gets its final use, so every value is used and
+    # the number of live values stays around the limit.
+    def use_value(self, Class, Final = True):
+        Live = self.Live[Class]
+        if len(Live) == 0:
+            self.load_live_in(Class)
+
+        if Final and len(Live) >= self.Pressure:
+            return Live.pop(0)
+        return random.choice(Live)
+
+    def pick_arguments(self, op):
+        Values = {}
+        NonSSA = [arg for arg in op.Arguments if not arg.IsSSA]
+        NonSSA.sort(key = lambda arg: ArgumentOrder.index(arg.Name) if arg.Name in ArgumentOrder else len(ArgumentOrder))
+        for arg in NonSSA:
+            Values[arg.Name] = ArgumentChoosers[arg.Name](op, Values)
+        return Values
+
+    # Returns false if the picked arguments don't give the op a valid destination
+    def emit_op(self, op, Values):
+        DestClass = get_dest_class(op, Values)
+        Args = {}
+        for arg in op.Arguments:
+            if not arg.IsSSA:
+                Args[arg.Name] = Values[arg.Name]
+            elif arg.Name == "Addr":
+                Args[arg.Name] = self.Base
+            elif arg.Name == "Offset":
+                Args[arg.Name] = None
+            else:
+                Value = self.use_value(get_ssa_arg_class(arg, Values))
+                Args[arg.Name] = Value
+                Values[arg.Name] = Value.Size
+
+        Text = "{} {}".format(op.Name, ", ".join(format_argument(arg, Args[arg.Name]) for arg in op.Arguments)).strip()
+        if not op.HasDest:
+            self.emit_no_dest(Text)
+            return True
+
+        if op.DestSize == None:
+            SSAArgs = [Args[arg.Name] for arg in op.Arguments if arg.IsSSA and Args[arg.Name] != None]
+            Size = SSAArgs[0].Size if len(SSAArgs) else 8
+        else:
+            Size = evaluate_size(op.DestSize, Values)
+
+        Elements = 1
+        if op.NumElements != None:
+            # The emitter divides the size by the element count, sizes giving no elements divide by zero
+            Elements = evaluate_size(op.NumElements, Values)
+            if Elements == None or Elements <= 0:
+                return False
+
+        MaxSize = 8 if DestClass == "GPR" else 16
+        if Size == None or Size <= 0 or Size > MaxSize or Size % Elements != 0:
+            return False
+
+        if Elements > 1:
+            Type = "i{}v{}".format(Size // Elements * 8, Elements)
+        else:
+            Type = "i{}".format(Size * 8)
+
+        self.Live[DestClass].append(self.define(DestClass, Size, Type, Text))
+        return True
+
+    def emit_random_op(self, Ops, Weights):
+        for _ in range(MaxAttempts):
+            op = random.choices(Ops, Weights)[0]
+            Values = self.pick_arguments(op)
+
+            # Emitting consumes values, check the destination on a copy of the live state first
+            Saved = [self.NextName, len(self.Lines), {Class: list(Live) for Class, Live in self.Live.items()}]
+            if self.emit_op(op, Values):
+                return
+
+            self.NextName, Lines, self.Live = Saved
+            del self.Lines[Lines:]
+
+        json_ir_generator.ExitError("Couldn't generate a valid op from the op mix")
+
+    def emit_block(self, Index, Count, OpCount, Ops, Weights):
+        Name = "Block{}".format(Index)
+        self.Lines.append("  (%{}) CodeBlock %Begin{}, %End{}, %Header".format(Name, Index, Index))
+        self.Lines.append("    (%Begin{} i0) BeginBlock %{}".format(Index, Name))
+
+        self.Live = {"GPR": [], "FPR": []}
+        self.Base = self.scratch_address(0)
+        for Class in ["GPR", "FPR"]:
+            for _ in range(min(self.Pressure, GuestRegisterCount)):
+                self.load_live_in(Class)
+
+        for _ in range(OpCount):
+            self.emit_random_op(Ops, Weights)
+
+        self.store_live_outs()
+
+        if Index + 1 == Count:
+            self.emit_no_dest("Break {0.11.0.128}")
+        elif Index + 2 < Count and random.random() < 0.5:
+            Cmp1 = self.use_value("GPR", Final = False)
+            Cmp2 = self.use_value("GPR", Final = False)
+            Target = random.randrange(Index + 2, Count)
+            self.emit_no_dest("CondJump {}, {}, %Block{}, %Block{}, {}, #8".format(Cmp1, Cmp2, Index + 1, Target, random.choice(IntegerConds)))
+        else:
+            self.emit_no_dest("Jump %Block{}".format(Index + 1))
+
+        self.Lines.append("    (%End{} i0) EndBlock %{}".format(Index, Name))
+
+def generate_program(Mix, Blocks, OpCount, Pressure):
+    Ops, Weights = zip(*get_weighted_ops(Mix))
+    Writer = ProgramWriter(Pressure)
+
+    Body = []
+    for Block in range(Blocks):
+        Writer.Lines = []
+        Writer.emit_block(Block, Blocks, OpCount // Blocks + (1 if Block < OpCount % Blocks else 0), Ops, Weights)
+        Body.extend(Writer.Lines)
+
+    RegionSize = max(4096, (Writer.ScratchSize + 4095) & ~4095)
+    Lines = [
+        ";%ifdef CONFIG",
+        ";{",
+        ";  \"HostFeatures\": [\"AVX\"],",
+        ";  \"MemoryRegions\": {",
+        ";    \"0x{:x}\": \"{}\"".format(ScratchBase, RegionSize),
+        ";  }",
+        ";}",
+        ";%endif",
+        "",
+        "(%Header) IRHeader %Block0, #{}".format(Blocks),
+    ]
+    return "\n".join(Lines + Body) + "\n"
+
+def parse_mix(Text):
+    Mix = {}
+    for Entry in Text.split(","):
+        Parts = Entry.split("=")
+        if len(Parts) != 2:
+            json_ir_generator.ExitError("Op mix entry '{}' needs to be <Name>=<Weight>".format(Entry))
+        Mix[Parts[0].strip()] = float(Parts[1])
+    return Mix
+
+def main():
+    Args = sys.argv[1:]
+    Seed = 0
+    Blocks = 1
+    Pressure = 8
+    Mix = DefaultMix
+    while len(Args) > 1 and Args[0].startswith("--"):
+        if Args[0] == "--seed":
+            Seed = int(Args[1], 0)
+        elif Args[0] == "--blocks":
+            Blocks = int(Args[1], 0)
+        elif Args[0] == "--pressure":
+            Pressure = int(Args[1], 0)
+        elif Args[0] == "--mix":
+            Mix = parse_mix(Args[1])
+        else:
+            json_ir_generator.ExitError("Unknown option {}".format(Args[0]))
+        Args = Args[2:]
+
+    if (len(Args) < 3):
+        json_ir_generator.ExitError("Usage: {} [--seed <N>] [--blocks <N>] [--pressure <N>] [--mix <Name>=<Weight>,...] <IR.json> <Ops>[,<Ops>...] <Output>".format(sys.argv[0]))
+
+    if Blocks < 1 or Pressure < 1:
+        json_ir_generator.ExitError("Need at least one block and a register pressure of one")
+
+    json_ir_generator.parse_ir_json(Args[0])
+
+    Counts = [int(Count, 0) for Count in Args[1].split(",")]
+    for OpCount in Counts:
+        # Every size gets the same sequence, a bigger program starts like the smaller ones
+        random.seed(Seed)
+        Program = generate_program(Mix, Blocks, OpCount, Pressure)
+
+        Output = Args[2]
+        if len(Counts) > 1:
+            os.makedirs(Output, exist_ok = True)
+            Output = os.path.join(Output, "Random_{}.ir".format(OpCount))
+
+        with open(Output, "w") as of:
+            of.write(Program)
+        print("Wrote {} random ops in {} blocks to {}".format(OpCount, Blocks, Output))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
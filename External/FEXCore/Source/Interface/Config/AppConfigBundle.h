@@ -0,0 +1,153 @@
+#pragma once
+#include <FEXCore/Utils/LogManager.h>
+
+#include <cstdint>
+#include <cstring>
+#include <fcntl.h>
+#include <string_view>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+namespace FEXCore::Config::AppConfigBundle {
+  // Installed application configs compiled by Scripts/app_config_generator.py, see there for the layout
+  constexpr uint32_t BundleMagic = 0x43415846; // 'FXAC'
+  constexpr uint32_t BundleVersion = 1;
+
+  struct BundleHeader {
+    uint32_t Magic;
+    uint32_t Version;
+    uint32_t EntryCount;
+    uint32_t Size;
+  };
+
+  struct BundleEntry {
+    uint32_t NameHash;
+    uint32_t NameOffset;
+    uint32_t OptionsOffset;
+    uint32_t OptionCount;
+  };
+
+  struct BundleOption {
+    uint32_t NameOffset;
+    uint32_t ValueOffset;
+  };
+
+  inline uint32_t HashAppName(std::string_view Name) {
+    uint32_t Hash = 0x811c9dc5U;
+    for (char c : Name) {
+      Hash ^= static_cast<uint8_t>(c);
+      Hash *= 0x01000193U;
+    }
+    return Hash;
+  }
+
+  class Bundle final {
+  public:
+    explicit Bundle(const char *Path) {
+      int FD = open(Path, O_RDONLY | O_CLOEXEC);
+      if (FD == -1) {
+        return;
+      }
+
+      struct stat Stat{};
+      if (fstat(FD, &Stat) == 0 && Stat.st_size >= static_cast<off_t>(sizeof(BundleHeader))) {
+        void *Ptr = mmap(nullptr, Stat.st_size, PROT_READ, MAP_PRIVATE, FD, 0);
+        if (Ptr != MAP_FAILED) {
+          Data = static_cast<const uint8_t*>(Ptr);
+          Size = Stat.st_size;
+        }
+      }
+      close(FD);
+
+      if (Data && !IsHeaderValid()) {
+        LogMan::Msg::EFmt("Ignoring invalid application config bundle");
+        munmap(const_cast<uint8_t*>(Data), Size);
+        Data = nullptr;
+      }
+    }
+
+    ~Bundle() {
+      if (Data) {
+        munmap(const_cast<uint8_t*>(Data), Size);
+      }
+    }
+
+    bool IsValid() const {
+      return Data != nullptr;
+    }
+
+    /**
+     * @brief Calls Func with every option name and value of the application
+     *
+     * @return false if the application isn't in the bundle
+     */
+    template<typename F>
+    bool Lookup(std::string_view App, F Func) const {
+      if (!Data) {
+        return false;
+      }
+
+      const auto Header = reinterpret_cast<const BundleHeader*>(Data);
+      const auto Entries = reinterpret_cast<const BundleEntry*>(Data + sizeof(BundleHeader));
+      const uint32_t Hash = HashAppName(App);
+      const uint32_t Mask = Header->EntryCount - 1;
+
+      for (uint32_t i = 0; i < Header->EntryCount; ++i) {
+        const auto &Entry = Entries[(Hash + i) & Mask];
+        if (Entry.NameOffset == 0) {
+          // Empty slot ends the probe
+          return false;
+        }
+
+        const char *Name = GetString(Entry.NameOffset);
+        if (Entry.NameHash != Hash || !Name || App != Name) {
+          continue;
+        }
+
+        if (Entry.OptionsOffset > Size ||
+            Entry.OptionCount > (Size - Entry.OptionsOffset) / sizeof(BundleOption)) {
+          return false;
+        }
+
+        const auto Options = reinterpret_cast<const BundleOption*>(Data + Entry.OptionsOffset);
+        for (uint32_t Option = 0; Option < Entry.OptionCount; ++Option) {
+          const char *OptionName = GetString(Options[Option].NameOffset);
+          const char *OptionValue = GetString(Options[Option].ValueOffset);
+          if (OptionName && OptionValue) {
+            Func(OptionName, OptionValue);
+          }
+        }
+        return true;
+      }
+
+      return false;
+    }
+
+  private:
+    const uint8_t *Data{};
+    size_t Size{};
+
+    bool IsHeaderValid() const {
+      const auto Header = reinterpret_cast<const BundleHeader*>(Data);
+      if (Header->Magic != BundleMagic ||
+          Header->Version != BundleVersion ||
+          Header->Size != Size) {
+        return false;
+      }
+
+      // Entry count needs to be a power of two and the entries need to fit
+      return Header->EntryCount != 0 &&
+        (Header->EntryCount & (Header->EntryCount - 1)) == 0 &&
+        Header->EntryCount <= (Size - sizeof(BundleHeader)) / sizeof(BundleEntry);
+    }
+
+    // Strings are NUL terminated, nullptr if one would run past the end of the bundle
+    const char *GetString(uint32_t Offset) const {
+      if (Offset >= Size || !memchr(Data + Offset, 0, Size - Offset)) {
+        return nullptr;
+      }
+      return reinterpret_cast<const char*>(Data + Offset);
+    }
+  };
+}
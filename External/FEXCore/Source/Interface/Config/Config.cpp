@@ -1,6 +1,7 @@
 #include "Common/StringConv.h"
 #include "Common/StringUtils.h"
 #include "Common/Paths.h"
+#include "Interface/Config/AppConfigBundle.h"
 #include "Utils/FileLoading.h"
 
 #include <FEXCore/Config/Config.h>
@@ -23,6 +24,7 @@
 #include <sys/sysinfo.h>
 #include <system_error>
 #include <type_traits>
+#include <unistd.h>
 #include <unordered_map>
 #include <utility>
 #include <vector>
@@ -42,6 +44,9 @@ namespace DefaultValues {
 #include <FEXCore/Config/ConfigValues.inl>
 }
 
+#define TYPED_VALUES_IMPL
+#include <FEXCore/Config/ConfigTypedValues.inl>
+
 namespace JSON {
   struct JsonAllocator {
     jsonPool_t PoolObject;
@@ -198,6 +203,14 @@ namespace JSON {
     return ConfigFile;
   }
 
+namespace AppConfigBundle {
+  // Mapped on first use, shared by the application layers for the lifetime of the process
+  static const Bundle &GetBundle() {
+    static const Bundle Instance{GLOBAL_DATA_DIRECTORY "AppConfig.bin"};
+    return Instance;
+  }
+}
+
   void SetConfig(FEXCore::Context::Context *CTX, ConfigOption Option, uint64_t Config) {
   }
 
@@ -210,6 +223,7 @@ namespace JSON {
 
   static std::map<FEXCore::Config::LayerType, std::unique_ptr<FEXCore::Config::Layer>> ConfigLayers;
   static FEXCore::Config::Layer *Meta{};
+  static TypedValues Typed{};
 
   constexpr std::array<FEXCore::Config::LayerType, 9> LoadOrder = {
     FEXCore::Config::LayerType::LAYER_GLOBAL_MAIN,
@@ -318,6 +332,7 @@ namespace JSON {
   void Shutdown() {
     ConfigLayers.clear();
     Meta = nullptr;
+    Typed = {};
   }
 
   void Load() {
@@ -417,6 +432,14 @@ namespace JSON {
   void ReloadMetaLayer() {
     Meta->Load();
 
+    // Convert every option once, reads of the typed values don't touch the strings again
+    Typed = {};
+    for (auto &[Option, Value] : Meta->GetOptionMap()) {
+      if (!Value.empty()) {
+        Typed.Parse(Option, Value.front());
+      }
+    }
+
     // Do configuration option fix ups after everything is reloaded
     {
       // Always fix up the number of threads and create the configuration
@@ -534,16 +557,27 @@ namespace JSON {
     return Meta->Get(Option);
   }
 
+  TypedValues const &GetTypedValues() {
+    return Typed;
+  }
+
   void Set(ConfigOption Option, std::string_view Data) {
+    // Only the first value is read back, appended values don't change it
+    if (!Meta->OptionExists(Option)) {
+      Typed.Parse(Option, Data);
+    }
     Meta->Set(Option, Data);
   }
 
   void Erase(ConfigOption Option) {
     Meta->Erase(Option);
+    Typed.Reset(Option);
   }
 
   void EraseSet(ConfigOption Option, std::string_view Data) {
     Meta->EraseSet(Option, Data);
+    Typed.Reset(Option);
+    Typed.Parse(Option, Data);
   }
 
   template<typename T>
@@ -636,6 +670,8 @@ namespace JSON {
 
   private:
     std::string Config;
+    std::string AppName;
+    bool FromBundle{};
   };
 
   class EnvLoader final : public FEXCore::Config::Layer {
@@ -651,10 +687,8 @@ namespace JSON {
 #define OPT_BASE(type, group, enum, json, default) {#json, FEXCore::Config::ConfigOption::CONFIG_##enum},
 #include <FEXCore/Config/ConfigValues.inl>
   }};
-  static const std::vector<std::pair<const char*, FEXCore::Config::ConfigOption>> EnvConfigLookup = {{
-#define OPT_BASE(type, group, enum, json, default) {"FEX_" #enum, FEXCore::Config::ConfigOption::CONFIG_##enum},
-#include <FEXCore/Config/ConfigValues.inl>
-  }};
+#define ENVLOADER_TABLE
+#include <FEXCore/Config/ConfigOptions.inl>
 
   OptionMapper::OptionMapper(FEXCore::Config::LayerType Layer)
     : FEXCore::Config::Layer(Layer) {
@@ -687,13 +721,30 @@ namespace JSON {
     : FEXCore::Config::OptionMapper(Type) {
     const bool Global = Type == FEXCore::Config::LayerType::LAYER_GLOBAL_STEAM_APP ||
                         Type == FEXCore::Config::LayerType::LAYER_GLOBAL_APP;
-    Config = FEXCore::Config::GetApplicationConfig(Filename, Global);
+
+    // The bundle is built from and installed with exactly the json files in the global AppConfig folder.
+    // Applications it doesn't have don't have an installed config, those don't touch the filesystem at all.
+    // The json file is only read if the bundle is missing or invalid.
+    if (Global && AppConfigBundle::GetBundle().IsValid()) {
+      FromBundle = true;
+      AppName = Filename;
+    }
+    else {
+      Config = FEXCore::Config::GetApplicationConfig(Filename, Global);
+    }
 
     // Immediately load so we can reload the meta layer
     Load();
   }
 
   void AppLoader::Load() {
+    if (FromBundle) {
+      AppConfigBundle::GetBundle().Lookup(AppName, [this](const char *Name, const char *ConfigString) {
+        MapNameToOption(Name, ConfigString);
+      });
+      return;
+    }
+
     JSON::LoadJSonConfig(Config, [this](const char *Name, const char *ConfigString) {
       MapNameToOption(Name, ConfigString);
     });
@@ -705,43 +756,33 @@ namespace JSON {
   }
 
   void EnvLoader::Load() {
-    std::unordered_map<std::string_view, std::string_view> EnvMap;
+    auto LoadVars = [this](const char *const *Vars, bool OnlyMissing) {
+      for(const char *const *pvar=Vars; pvar && *pvar; pvar++) {
+        std::string_view Var(*pvar);
+        size_t pos = Var.rfind('=');
+        if (std::string::npos == pos)
+          continue;
 
-    for(const char *const *pvar=envp; pvar && *pvar; pvar++) {
-      std::string_view Var(*pvar);
-      size_t pos = Var.rfind('=');
-      if (std::string::npos == pos)
-        continue;
+        std::string_view Key = Var.substr(0,pos);
+        std::string_view Value {Var.substr(pos+1)};
 
-      std::string_view Key = Var.substr(0,pos);
-      std::string_view Value {Var.substr(pos+1)};
+        if (OnlyMissing) {
+          const auto *Option = LookupEnvOption(Key);
+          if (!Option || OptionExists(Option->Option)) {
+            continue;
+          }
+        }
 
 #define ENVLOADER
 #include <FEXCore/Config/ConfigOptions.inl>
-
-      EnvMap[Key]=Value;
-    }
-
-    std::function GetVar = [=](const std::string_view id)  -> std::optional<std::string_view> {
-      if (EnvMap.find(id) != EnvMap.end())
-        return EnvMap.at(id);
-
-      // If envp[] was empty, search using std::getenv()
-      const char* vs = std::getenv(id.data());
-      if (vs) {
-        return vs;
-      }
-      else {
-        return std::nullopt;
       }
     };
 
-    std::optional<std::string_view> Value;
+    LoadVars(envp, false);
 
-    for (auto &it : EnvConfigLookup) {
-      if ((Value = GetVar(it.first)).has_value()) {
-        Set(it.second, std::string(*Value));
-      }
+    // Options missing from envp[] are picked up from the process environment
+    if (envp != environ) {
+      LoadVars(environ, true);
     }
   }
 
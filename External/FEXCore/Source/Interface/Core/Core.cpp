@@ -56,6 +56,7 @@ $end_info$
 #include <filesystem>
 #include <functional>
 #include <fstream>
+#include <iterator>
 #include <map>
 #include <memory>
 #include <mutex>
@@ -713,10 +714,16 @@ namespace FEXCore::Context {
     }
 
     if (f) {
-      std::stringstream out;
+      // Reused between dumps so the buffer only grows to the largest block once per thread
+      thread_local std::string out;
+      out.clear();
+
+      const auto Format = Thread->CTX->Config.DumpIRFormat() == "compact" ? IR::DumpFormat::Compact : IR::DumpFormat::Text;
       auto NewIR = IREmitter->ViewIR();
-      FEXCore::IR::Dump(&out, &NewIR, RA);
-      fmt::print(f,"IR-{} 0x{:x}:\n{}\n@@@@@\n", RA ? "post" : "pre", GuestRIP, out.str());
+      fmt::format_to(std::back_inserter(out), "IR-{} 0x{:x}:\n", RA ? "post" : "pre", GuestRIP);
+      FEXCore::IR::Dump(&out, &NewIR, RA, Format);
+      out.append("\n@@@@@\n");
+      fwrite(out.data(), 1, out.size(), f);
 
       if (CloseAfter) {
         fclose(f);
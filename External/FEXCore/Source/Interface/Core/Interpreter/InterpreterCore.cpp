@@ -4,6 +4,7 @@
 #include "Interface/Core/ArchHelpers/MContext.h"
 #include "Interface/Core/Dispatcher/Dispatcher.h"
 #include "Interface/Core/Interpreter/InterpreterClass.h"
+#include "Interface/IR/OpCounters.h"
 #include <FEXCore/Config/Config.h>
 #include <FEXCore/Core/CoreState.h>
 #include <FEXCore/Core/SignalDelegator.h>
@@ -46,6 +47,10 @@ InterpreterCore::InterpreterCore(Dispatcher *Dispatcher, FEXCore::Core::Internal
 
   Interpreter.FragmentExecuter = reinterpret_cast<uint64_t>(&InterpreterOps::InterpretIR);
 
+#if defined(ENABLE_IR_OP_COUNTERS) && ENABLE_IR_OP_COUNTERS
+  IR::RegisterOpCountersDump();
+#endif
+
   ClearCache();
 }
 
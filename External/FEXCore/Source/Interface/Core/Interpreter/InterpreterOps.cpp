@@ -19,6 +19,7 @@
 #include <FEXCore/Utils/LogManager.h>
 
 #include "Interface/HLE/Thunks/Thunks.h"
+#include "Interface/IR/OpCounters.h"
 
 #include <alloca.h>
 #include <algorithm>
@@ -365,6 +366,7 @@ void InterpreterOps::InterpretIR(FEXCore::Core::CpuStateFrame *Frame, FEXCore::I
     for (auto [CodeNode, IROp] : CurrentIR->GetCode(BlockNode)) {
       const auto ID = CurrentIR->GetID(CodeNode);
       const uint32_t Op = IROp->Op;
+      FEXCORE_IR_COUNT_OP(IROp->Op);
 
       // Execute handler
       OpHandler Handler = InterpreterOpHandlers[Op];
@@ -20,6 +20,7 @@ $end_info$
 #include "Interface/Core/JIT/Arm64/JITClass.h"
 #include "Interface/Core/InternalThreadState.h"
 
+#include "Interface/IR/OpCounters.h"
 #include "Interface/IR/Passes/RegisterAllocationPass.h"
 
 #include "Utils/MemberFunctionToPointer.h"
@@ -568,6 +569,10 @@ Arm64JITCore::Arm64JITCore(FEXCore::Context::Context *ctx, FEXCore::Core::Intern
     AArch64.LREM = reinterpret_cast<uint64_t>(LREM);
   }
 
+#if defined(ENABLE_IR_OP_COUNTERS) && ENABLE_IR_OP_COUNTERS
+  IR::RegisterOpCountersDump();
+#endif
+
   // Must be done after Dispatcher init
   ClearCache();
 }
@@ -595,6 +600,25 @@ void Arm64JITCore::EmitDetectionString() {
   Align();
 }
 
+#if defined(ENABLE_IR_OP_COUNTERS) && ENABLE_IR_OP_COUNTERS
+void Arm64JITCore::EmitOpCounter(IR::IROps Op) {
+  // Atomics don't touch the flags, which might be live across ops
+  LoadConstant(ARMEmitter::Size::i64Bit, TMP1, reinterpret_cast<uint64_t>(IR::GetOpCounter(Op)));
+  if (CTX->HostFeatures.SupportsAtomics) {
+    movz(ARMEmitter::Size::i64Bit, TMP2, 1);
+    staddl(ARMEmitter::SubRegSize::i64Bit, TMP2, TMP1);
+  }
+  else {
+    ARMEmitter::BackwardLabel LoopTop;
+    Bind(&LoopTop);
+    ldaxr(ARMEmitter::SubRegSize::i64Bit, TMP2, TMP1);
+    add(ARMEmitter::Size::i64Bit, TMP2, TMP2, 1);
+    stlxr(ARMEmitter::SubRegSize::i64Bit, TMP3, TMP2, TMP1);
+    cbnz(ARMEmitter::Size::i64Bit, TMP3, &LoopTop);
+  }
+}
+#endif
+
 void Arm64JITCore::ClearCache() {
   // Get the backing code buffer
 
@@ -754,6 +778,9 @@ void *Arm64JITCore::CompileCode(uint64_t Entry,
 
     for (auto [CodeNode, IROp] : IR->GetCode(BlockNode)) {
       const auto ID = IR->GetID(CodeNode);
+#if defined(ENABLE_IR_OP_COUNTERS) && ENABLE_IR_OP_COUNTERS
+      EmitOpCounter(IROp->Op);
+#endif
       switch (IROp->Op) {
 #define REGISTER_OP(op, x) case FEXCore::IR::IROps::OP_##op: Op_##x(IROp, ID); break
         // ALU ops
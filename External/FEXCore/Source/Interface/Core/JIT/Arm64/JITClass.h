@@ -168,6 +168,11 @@ private:
 
   // This is purely a debugging aid for developers to see if they are in JIT code space when inspecting raw memory
   void EmitDetectionString();
+
+#if defined(ENABLE_IR_OP_COUNTERS) && ENABLE_IR_OP_COUNTERS
+  // Increments the execution counter of the op from the generated code
+  void EmitOpCounter(IR::IROps Op);
+#endif
   IR::RegisterAllocationPass *RAPass;
   IR::RegisterAllocationData *RAData;
   FEXCore::Core::DebugData *DebugData;
@@ -1,5 +1,6 @@
 #include "Interface/Context/Context.h"
 #include "Interface/IR/AOTIR.h"
+#include "Interface/IR/IRSerializer.h"
 
 #include <FEXCore/IR/IntrusiveIRList.h>
 #include <FEXCore/IR/RegisterAllocationData.h>
@@ -16,6 +17,7 @@
 #include <sys/mman.h>
 #include <sys/stat.h>
 #include <unistd.h>
+#include <vector>
 #include <xxhash.h>
 
 
@@ -48,28 +50,41 @@ namespace FEXCore::IR {
     return (IR::RegisterAllocationData *)InlineData;
   }
 
-  IR::IRListView *AOTIRInlineEntry::GetIRData() {
+  IR::IRListView *AOTIRInlineEntry::DecodeIRData(const uint8_t *End) {
     auto RAData = GetRAData();
     auto Offset = RAData->Size(RAData->MapCount);
+    auto Data = &InlineData[Offset];
 
-    return (IR::IRListView *)&InlineData[Offset];
+    if (Data >= End) {
+      return nullptr;
+    }
+
+    return IR::DecodeCompactIR(Data, End - Data);
   }
 
   void AOTIRCaptureCacheEntry::AppendAOTIRCaptureCache(uint64_t GuestRIP, uint64_t Start, uint64_t Length, uint64_t Hash, FEXCore::IR::IRListView *IRList, FEXCore::IR::RegisterAllocationData *RAData) {
-    auto Inserted = Index.emplace(GuestRIP, Stream->tellp());
+    if (Index.contains(GuestRIP)) {
+      return;
+    }
 
-    if (Inserted.second) {
-      //GuestHash
-      Stream->write((const char*)&Hash, sizeof(Hash));
+    // IR that the compact encoding can't represent isn't cached
+    std::vector<uint8_t> IRData;
+    if (!IR::EncodeCompactIR(IRList, IRData)) {
+      return;
+    }
 
-      //GuestLength
-      Stream->write((const char*)&Length, sizeof(Length));
+    Index.emplace(GuestRIP, Stream->tellp());
 
-      RAData->Serialize(*Stream);
+    //GuestHash
+    Stream->write((const char*)&Hash, sizeof(Hash));
 
-      // IRData (inline)
-      IRList->Serialize(*Stream);
-    }
+    //GuestLength
+    Stream->write((const char*)&Length, sizeof(Length));
+
+    RAData->Serialize(*Stream);
+
+    // IRData (compact)
+    Stream->write((const char*)IRData.data(), IRData.size());
   }
 
   static bool readAll(int fd, void *data, size_t size) {
@@ -262,14 +277,21 @@ namespace FEXCore::IR {
             auto MappedStart = GuestRIP;
             auto hash = XXH3_64bits((void*)MappedStart, AOTEntry->GuestLength);
             if (hash == AOTEntry->GuestHash) {
-              Result.IRList = AOTEntry->GetIRData();
-              //LogMan::Msg::DFmt("using {} + {:x} -> {:x}\n", file->second.fileid, AOTEntry->first, GuestRIP);
-
-              Result.RAData = AOTEntry->GetRAData()->CreateCopy();
-              Result.DebugData = new FEXCore::Core::DebugData();
-              Result.StartAddr = MappedStart;
-              Result.Length = AOTEntry->GuestLength;
-              Result.GeneratedIR = true;
+              auto FileEnd = (const uint8_t*)AOTIRCacheEntry.Entry->FilePtr + AOTIRCacheEntry.Entry->Size;
+              auto DecodedIR = AOTEntry->DecodeIRData(FileEnd);
+
+              if (DecodedIR) {
+                Result.IRList = DecodedIR;
+                //LogMan::Msg::DFmt("using {} + {:x} -> {:x}\n", file->second.fileid, AOTEntry->first, GuestRIP);
+
+                Result.RAData = AOTEntry->GetRAData()->CreateCopy();
+                Result.DebugData = new FEXCore::Core::DebugData();
+                Result.StartAddr = MappedStart;
+                Result.Length = AOTEntry->GuestLength;
+                Result.GeneratedIR = true;
+              } else {
+                LogMan::Msg::IFmt("AOTIR: IR decoding failed {:x}\n", MappedStart);
+              }
             } else {
               LogMan::Msg::IFmt("AOTIR: hash check failed {:x}\n", MappedStart);
             }
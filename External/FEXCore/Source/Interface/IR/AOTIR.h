@@ -37,18 +37,19 @@ namespace FEXCore::IR {
 
     return Cookie;
   };
-  constexpr static uint32_t AOTIR_VERSION = 0x0000'00004;
+  constexpr static uint32_t AOTIR_VERSION = 0x0000'00005;
   constexpr static uint64_t AOTIR_COOKIE = COOKIE_VERSION("FEXI", AOTIR_VERSION);
 
   struct AOTIRInlineEntry {
     uint64_t GuestHash;
     uint64_t GuestLength;
 
-    /* RAData followed by IRData */
+    /* RAData followed by compact IRData */
     uint8_t InlineData[0];
 
     IR::RegisterAllocationData *GetRAData();
-    IR::IRListView *GetIRData();
+    // Returns a decoded copy of the IR, nullptr if it fails to decode. End bounds the mapped cache file
+    IR::IRListView *DecodeIRData(const uint8_t *End);
   };
 
   struct AOTIRInlineIndexEntry {
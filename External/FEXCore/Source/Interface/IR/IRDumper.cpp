@@ -8,14 +8,17 @@ $end_info$
 #include <FEXCore/IR/IR.h>
 #include <FEXCore/IR/IntrusiveIRList.h>
 #include <FEXCore/IR/RegisterAllocationData.h>
+#include <FEXCore/Utils/EnumUtils.h>
 
 #include <algorithm>
 #include <array>
-#include <ostream>
+#include <iterator>
+#include <sstream>
 #include <stdint.h>
 #include <string>
 #include <string_view>
-#include  <iomanip>
+
+#include <fmt/format.h>
 
 namespace FEXCore::IR {
 #define IROP_GETNAME_IMPL
@@ -27,22 +30,20 @@ namespace FEXCore::IR {
 
 #include <FEXCore/IR/IRDefines.inc>
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, const SHA256Sum &Arg) {
-  *out << "sha256:";
-  for(auto byte: Arg.data)
-    *out << std::hex << std::setfill('0') << std::setw(2) << (unsigned int)byte;
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, const SHA256Sum &Arg) {
+  fmt::format_to(std::back_inserter(*out), "sha256:{:02x}", fmt::join(Arg.data, ""));
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, uint64_t Arg) {
-  *out << "#0x" << std::hex << Arg;
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, uint64_t Arg) {
+  fmt::format_to(std::back_inserter(*out), "#0x{:x}", Arg);
 }
 
 [[maybe_unused]]
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, const char* Arg) {
-  *out <<  Arg;
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, const char* Arg) {
+  out->append(Arg);
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, CondClassType Arg) {
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, CondClassType Arg) {
   static constexpr std::array<std::string_view, 22> CondNames = {
     "EQ",
     "NEQ",
@@ -68,153 +69,201 @@ static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const*
     "FNU"
   };
 
-  *out << CondNames[Arg];
+  out->append(CondNames[Arg]);
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, MemOffsetType Arg) {
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, MemOffsetType Arg) {
   static constexpr std::array<std::string_view, 3> Names = {
     "SXTX",
     "UXTW",
     "SXTW",
   };
 
-  *out << Names[Arg];
+  out->append(Names[Arg]);
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, RegisterClassType Arg) {
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, RegisterClassType Arg) {
   if (Arg == GPRClass.Val)
-    *out << "GPR";
+    out->append("GPR");
   else if (Arg == GPRFixedClass.Val)
-    *out << "GPRFixed";
+    out->append("GPRFixed");
   else if (Arg == FPRClass.Val)
-    *out << "FPR";
+    out->append("FPR");
   else if (Arg == FPRFixedClass.Val)
-    *out << "FPRFixed";
+    out->append("FPRFixed");
   else if (Arg == GPRPairClass.Val)
-    *out << "GPRPair";
+    out->append("GPRPair");
   else
-    *out << "Unknown Registerclass " << Arg;
+    fmt::format_to(std::back_inserter(*out), "Unknown Registerclass {}", Arg.Val);
 }
 
-static void PrintArg(std::stringstream *out, IRListView const* IR, OrderedNodeWrapper Arg, IR::RegisterAllocationData *RAData) {
-  auto [CodeNode, IROp] = IR->at(Arg)();
-  const auto ArgID = Arg.ID();
+static void PrintRegister(std::string *out, IR::RegisterAllocationData *RAData, NodeID ID) {
+  auto PhyReg = RAData->GetNodeRegister(ID);
+
+  switch (PhyReg.Class) {
+    case FEXCore::IR::GPRClass.Val: out->append("(GPR"); break;
+    case FEXCore::IR::GPRFixedClass.Val: out->append("(GPRFixed"); break;
+    case FEXCore::IR::FPRClass.Val: out->append("(FPR"); break;
+    case FEXCore::IR::FPRFixedClass.Val: out->append("(FPRFixed"); break;
+    case FEXCore::IR::GPRPairClass.Val: out->append("(GPRPair"); break;
+    case FEXCore::IR::ComplexClass.Val: out->append("(Complex"); break;
+    case FEXCore::IR::InvalidClass.Val: out->append("(Invalid"); break;
+    default: out->append("(Unknown"); break;
+  }
 
-  if (ArgID.IsInvalid()) {
-    *out << "%Invalid";
+  if (PhyReg.Class != FEXCore::IR::InvalidClass.Val) {
+    fmt::format_to(std::back_inserter(*out), "{})", static_cast<uint32_t>(PhyReg.Reg));
   } else {
-    *out << "%ssa" << ArgID;
-    if (RAData) {
-      auto PhyReg = RAData->GetNodeRegister(ArgID);
-
-      switch (PhyReg.Class) {
-        case FEXCore::IR::GPRClass.Val: *out << "(GPR"; break;
-        case FEXCore::IR::GPRFixedClass.Val: *out << "(GPRFixed"; break;
-        case FEXCore::IR::FPRClass.Val: *out << "(FPR"; break;
-        case FEXCore::IR::FPRFixedClass.Val: *out << "(FPRFixed"; break;
-        case FEXCore::IR::GPRPairClass.Val: *out << "(GPRPair"; break;
-        case FEXCore::IR::ComplexClass.Val: *out << "(Complex"; break;
-        case FEXCore::IR::InvalidClass.Val: *out << "(Invalid"; break;
-        default: *out << "(Unknown"; break;
-      }
+    out->push_back(')');
+  }
+}
 
-      if (PhyReg.Class != FEXCore::IR::InvalidClass.Val) {
-        *out << std::dec << (uint32_t)PhyReg.Reg << ")";
-      } else {
-        *out << ")";
-      }
-    }
+static void PrintType(std::string *out, const IROp_Header *IROp) {
+  uint32_t ElementSize = IROp->ElementSize;
+  if (!IROp->ElementSize) {
+    ElementSize = IROp->Size;
   }
 
-  if (GetHasDest(IROp->Op)) {
-    uint32_t ElementSize = IROp->ElementSize;
-    uint32_t NumElements = IROp->Size;
-    if (!IROp->ElementSize) {
-      ElementSize = IROp->Size;
-    }
+  uint32_t NumElements = 0;
+  if (ElementSize) {
+    NumElements = IROp->Size / ElementSize;
+  }
 
-    if (ElementSize) {
-      NumElements /= ElementSize;
-    }
+  if (NumElements > 1) {
+    fmt::format_to(std::back_inserter(*out), "i{}v{}", ElementSize * 8, NumElements);
+  } else {
+    fmt::format_to(std::back_inserter(*out), "i{}", ElementSize * 8);
+  }
+}
 
-    *out << " i" << std::dec << (ElementSize * 8);
+static void PrintArg(std::string *out, IRListView const* IR, OrderedNodeWrapper Arg, IR::RegisterAllocationData *RAData) {
+  auto [CodeNode, IROp] = IR->at(Arg)();
+  const auto ArgID = Arg.ID();
 
-    if (NumElements > 1) {
-      *out << "v" << std::dec << NumElements;
+  if (ArgID.IsInvalid()) {
+    out->append("%Invalid");
+  } else {
+    fmt::format_to(std::back_inserter(*out), "%ssa{}", ArgID);
+    if (RAData) {
+      PrintRegister(out, RAData, ArgID);
     }
+  }
 
+  if (GetHasDest(IROp->Op)) {
+    out->push_back(' ');
+    PrintType(out, IROp);
   }
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::FenceType Arg) {
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::FenceType Arg) {
   if (Arg == IR::Fence_Load) {
-    *out << "Loads";
+    out->append("Loads");
   }
   else if (Arg == IR::Fence_Store) {
-    *out << "Stores";
+    out->append("Stores");
   }
   else if (Arg == IR::Fence_LoadStore) {
-    *out << "LoadStores";
+    out->append("LoadStores");
   }
   else {
-    *out << "<Unknown Fence Type>";
+    out->append("<Unknown Fence Type>");
   }
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::RoundType Arg) {
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::RoundType Arg) {
   switch (Arg) {
-    case FEXCore::IR::Round_Nearest: *out << "Nearest"; break;
-    case FEXCore::IR::Round_Negative_Infinity: *out << "-Inf"; break;
-    case FEXCore::IR::Round_Positive_Infinity: *out << "+Inf"; break;
-    case FEXCore::IR::Round_Towards_Zero: *out << "Towards Zero"; break;
-    case FEXCore::IR::Round_Host: *out << "Host"; break;
-    default: *out << "<Unknown Round Type>"; break;
+    case FEXCore::IR::Round_Nearest: out->append("Nearest"); break;
+    case FEXCore::IR::Round_Negative_Infinity: out->append("-Inf"); break;
+    case FEXCore::IR::Round_Positive_Infinity: out->append("+Inf"); break;
+    case FEXCore::IR::Round_Towards_Zero: out->append("Towards Zero"); break;
+    case FEXCore::IR::Round_Host: out->append("Host"); break;
+    default: out->append("<Unknown Round Type>"); break;
   }
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::SyscallFlags Arg) {
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::SyscallFlags Arg) {
   switch (Arg) {
-    case FEXCore::IR::SyscallFlags::DEFAULT: *out << "Default"; break;
-    case FEXCore::IR::SyscallFlags::OPTIMIZETHROUGH: *out << "Optimize Through"; break;
-    case FEXCore::IR::SyscallFlags::NOSYNCSTATEONENTRY: *out << "No Sync State on Entry"; break;
-    case FEXCore::IR::SyscallFlags::NORETURN: *out << "No Return"; break;
-    case FEXCore::IR::SyscallFlags::NOSIDEEFFECTS: *out << "No Side Effects"; break;
-    default: *out << "<Unknown Round Type>"; break;
+    case FEXCore::IR::SyscallFlags::DEFAULT: out->append("Default"); break;
+    case FEXCore::IR::SyscallFlags::OPTIMIZETHROUGH: out->append("Optimize Through"); break;
+    case FEXCore::IR::SyscallFlags::NOSYNCSTATEONENTRY: out->append("No Sync State on Entry"); break;
+    case FEXCore::IR::SyscallFlags::NORETURN: out->append("No Return"); break;
+    case FEXCore::IR::SyscallFlags::NOSIDEEFFECTS: out->append("No Side Effects"); break;
+    default: out->append("<Unknown Round Type>"); break;
   }
 }
 
-static void PrintArg(std::stringstream *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::BreakDefinition Arg) {
-  *out << "{" << Arg.ErrorRegister << ".";
-  *out << static_cast<uint32_t>(Arg.Signal) << ".";
-  *out << static_cast<uint32_t>(Arg.TrapNumber) << ".";
-  *out << static_cast<uint32_t>(Arg.si_code) << "}";
+static void PrintArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::BreakDefinition Arg) {
+  fmt::format_to(std::back_inserter(*out), "{{{}.{}.{}.{}}}",
+    Arg.ErrorRegister,
+    static_cast<uint32_t>(Arg.Signal),
+    static_cast<uint32_t>(Arg.TrapNumber),
+    static_cast<uint32_t>(Arg.si_code));
 }
 
-void Dump(std::stringstream *out, IRListView const* IR, IR::RegisterAllocationData *RAData) {
+// Compact format arguments, raw values only so post-processing doesn't need to know any of the names above
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, const SHA256Sum &Arg) {
+  fmt::format_to(std::back_inserter(*out), "{:02x}", fmt::join(Arg.data, ""));
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, uint64_t Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", Arg);
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, CondClassType Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", Arg.Val);
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, MemOffsetType Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", Arg.Val);
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, RegisterClassType Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", Arg.Val);
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, OrderedNodeWrapper Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", Arg.ID());
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::FenceType Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", Arg.Val);
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::RoundType Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", Arg.Val);
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::SyscallFlags Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}", FEXCore::ToUnderlying(Arg));
+}
+
+static void PrintCompactArg(std::string *out, [[maybe_unused]] IRListView const* IR, FEXCore::IR::BreakDefinition Arg) {
+  fmt::format_to(std::back_inserter(*out), "{}.{}.{}.{}",
+    Arg.ErrorRegister,
+    static_cast<uint32_t>(Arg.Signal),
+    static_cast<uint32_t>(Arg.TrapNumber),
+    static_cast<uint32_t>(Arg.si_code));
+}
+
+static void DumpText(std::string *out, IRListView const* IR, IR::RegisterAllocationData *RAData) {
   auto HeaderOp = IR->GetHeader();
 
   int8_t CurrentIndent = 0;
   auto AddIndent = [&out, &CurrentIndent]() {
-    for (uint8_t i = 0; i < CurrentIndent; ++i) {
-      *out << "\t";
-    }
+    out->append(CurrentIndent, '\t');
   };
 
   ++CurrentIndent;
   AddIndent();
-  *out << "(%ssa0) " << "IRHeader ";
-  *out << "%ssa" << HeaderOp->Blocks.ID() << ", ";
-  *out << "#" << std::dec << HeaderOp->BlockCount << std::endl;
+  fmt::format_to(std::back_inserter(*out), "(%ssa0) IRHeader %ssa{}, #{}\n", HeaderOp->Blocks.ID(), static_cast<uint32_t>(HeaderOp->BlockCount));
 
   for (auto [BlockNode, BlockHeader] : IR->GetBlocks()) {
     {
       auto BlockIROp = BlockHeader->C<FEXCore::IR::IROp_CodeBlock>();
 
       AddIndent();
-      *out << "(%ssa" << IR->GetID(BlockNode) << ") " << "CodeBlock ";
-
-      *out << "%ssa" << BlockIROp->Begin.ID() << ", ";
-      *out << "%ssa" << BlockIROp->Last.ID() << std::endl;
+      fmt::format_to(std::back_inserter(*out), "(%ssa{}) CodeBlock %ssa{}, %ssa{}\n",
+        IR->GetID(BlockNode), BlockIROp->Begin.ID(), BlockIROp->Last.ID());
     }
 
     ++CurrentIndent;
@@ -233,96 +282,51 @@ void Dump(std::stringstream *out, IRListView const* IR, IR::RegisterAllocationDa
       if (!Skip) {
         AddIndent();
         if (GetHasDest(IROp->Op)) {
-
-          uint32_t ElementSize = IROp->ElementSize;
-          uint32_t NumElements = IROp->Size;
-          if (!IROp->ElementSize) {
-            ElementSize = IROp->Size;
-          }
-
-          if (ElementSize) {
-            NumElements /= ElementSize;
-          }
-
-          *out << "%ssa" << std::dec << ID;
+          fmt::format_to(std::back_inserter(*out), "%ssa{}", ID);
 
           if (RAData) {
-            auto PhyReg = RAData->GetNodeRegister(ID);
-            switch (PhyReg.Class) {
-              case FEXCore::IR::GPRClass.Val: *out << "(GPR"; break;
-              case FEXCore::IR::GPRFixedClass.Val: *out << "(GPRFixed"; break;
-              case FEXCore::IR::FPRClass.Val: *out << "(FPR"; break;
-              case FEXCore::IR::FPRFixedClass.Val: *out << "(FPRFixed"; break;
-              case FEXCore::IR::GPRPairClass.Val: *out << "(GPRPair"; break;
-              case FEXCore::IR::ComplexClass.Val: *out << "(Complex"; break;
-              case FEXCore::IR::InvalidClass.Val: *out << "(Invalid"; break;
-              default: *out << "(Unknown"; break;
-            }
-            if (PhyReg.Class != FEXCore::IR::InvalidClass.Val) {
-              *out << std::dec << (uint32_t)PhyReg.Reg << ")";
-            } else {
-              *out << ")";
-            }
-          }
-
-          *out << " i" << std::dec << (ElementSize * 8);
-
-          if (NumElements > 1) {
-            *out << "v" << std::dec << NumElements;
+            PrintRegister(out, RAData, ID);
           }
 
-          *out << " = ";
+          out->push_back(' ');
+          PrintType(out, IROp);
+          out->append(" = ");
         }
         else {
-
-          uint32_t ElementSize = IROp->ElementSize;
-          if (!IROp->ElementSize) {
-            ElementSize = IROp->Size;
-          }
-          uint32_t NumElements = 0;
-          if (ElementSize) {
-            NumElements = IROp->Size / ElementSize;
-          }
-
-          *out << "(%ssa" << std::dec << ID << ' ';
-          *out << 'i' << std::dec << (ElementSize * 8);
-          if (NumElements > 1) {
-            *out << 'v' << std::dec << NumElements;
-          }
-          *out << ") ";
+          fmt::format_to(std::back_inserter(*out), "(%ssa{} ", ID);
+          PrintType(out, IROp);
+          out->append(") ");
         }
-        *out << Name;
+        out->append(Name);
 
         #define IROP_ARGPRINTER_HELPER
-        #include <FEXCore/IR/IRDefines.inc>
+        #include <FEXCore/IR/IRDefines_ArgPrinter.inc>
         case IR::OP_PHI: {
           auto Op = IROp->C<IR::IROp_Phi>();
           auto NodeBegin = IR->at(Op->PhiBegin);
-          *out << " ";
+          out->push_back(' ');
 
           while (NodeBegin != NodeBegin.Invalid()) {
             auto [NodeNode, IROp] = NodeBegin();
             auto PhiOp  = IROp->C<IR::IROp_PhiValue>();
-            *out << "[ ";
+            out->append("[ ");
             PrintArg(out, IR, PhiOp->Value, RAData);
-            *out << ", ";
+            out->append(", ");
             PrintArg(out, IR, PhiOp->Block, RAData);
-            *out << " ]";
+            out->append(" ]");
 
             if (PhiOp->Next.ID().IsValid()) {
-              *out << ", ";
+              out->append(", ");
             }
 
             NodeBegin = IR->at(PhiOp->Next);
           }
           break;
         }
-        default: *out << "<Unknown Args>"; break;
+        default: out->append("<Unknown Args>"); break;
         }
 
-        //*out << " (" <<  std::dec << CodeNode->GetUses() << ")";
-
-        *out << "\n";
+        out->push_back('\n');
       }
     }
 
@@ -330,4 +334,73 @@ void Dump(std::stringstream *out, IRListView const* IR, IR::RegisterAllocationDa
   }
 }
 
+// One line per node with tab separated fields, nodes are referenced by ID:
+//   H  <Blocks> <BlockCount>
+//   B  <ID> <Begin> <Last>
+//   <ID> <Name> <Size> <ElementSize> <RA Class> <RA Reg> <Args>...
+// The RA fields are - without RA data or a destination, as are temporary arguments.
+// Phi arguments are listed as value and block pairs.
+static void DumpCompact(std::string *out, IRListView const* IR, IR::RegisterAllocationData *RAData) {
+  auto HeaderOp = IR->GetHeader();
+  fmt::format_to(std::back_inserter(*out), "H\t{}\t{}\n", HeaderOp->Blocks.ID(), static_cast<uint32_t>(HeaderOp->BlockCount));
+
+  for (auto [BlockNode, BlockHeader] : IR->GetBlocks()) {
+    auto BlockIROp = BlockHeader->C<FEXCore::IR::IROp_CodeBlock>();
+    fmt::format_to(std::back_inserter(*out), "B\t{}\t{}\t{}\n",
+      IR->GetID(BlockNode), BlockIROp->Begin.ID(), BlockIROp->Last.ID());
+
+    for (auto [CodeNode, IROp] : IR->GetCode(BlockNode)) {
+      if (IROp->Op == IR::OP_PHIVALUE) {
+        continue;
+      }
+
+      const auto ID = IR->GetID(CodeNode);
+      fmt::format_to(std::back_inserter(*out), "{}\t{}\t{}\t{}",
+        ID, FEXCore::IR::GetName(IROp->Op), static_cast<uint32_t>(IROp->Size), static_cast<uint32_t>(IROp->ElementSize));
+
+      if (RAData && GetHasDest(IROp->Op)) {
+        auto PhyReg = RAData->GetNodeRegister(ID);
+        fmt::format_to(std::back_inserter(*out), "\t{}\t{}",
+          static_cast<uint32_t>(PhyReg.Class), static_cast<uint32_t>(PhyReg.Reg));
+      } else {
+        out->append("\t-\t-");
+      }
+
+      #define IROP_ARGPRINTER_COMPACT_HELPER
+      #include <FEXCore/IR/IRDefines_ArgPrinter.inc>
+      case IR::OP_PHI: {
+        auto Op = IROp->C<IR::IROp_Phi>();
+        auto NodeBegin = IR->at(Op->PhiBegin);
+
+        while (NodeBegin != NodeBegin.Invalid()) {
+          auto [NodeNode, IROp] = NodeBegin();
+          auto PhiOp  = IROp->C<IR::IROp_PhiValue>();
+          fmt::format_to(std::back_inserter(*out), "\t{}\t{}", PhiOp->Value.ID(), PhiOp->Block.ID());
+
+          NodeBegin = IR->at(PhiOp->Next);
+        }
+        break;
+      }
+      default: break;
+      }
+
+      out->push_back('\n');
+    }
+  }
+}
+
+void Dump(std::string *out, IRListView const* IR, IR::RegisterAllocationData *RAData, DumpFormat Format) {
+  if (Format == DumpFormat::Compact) {
+    DumpCompact(out, IR, RAData);
+  } else {
+    DumpText(out, IR, RAData);
+  }
+}
+
+void Dump(std::stringstream *out, IRListView const* IR, IR::RegisterAllocationData *RAData) {
+  std::string Text;
+  Dump(&Text, IR, RAData, DumpFormat::Text);
+  *out << Text;
+}
+
 }
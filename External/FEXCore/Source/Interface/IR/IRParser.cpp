@@ -15,8 +15,10 @@ $end_info$
 #include <algorithm>
 #include <array>
 #include <cstdint>
+#include <cstring>
 #include <errno.h>
 #include <memory>
+#include <optional>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string>
@@ -24,6 +26,7 @@ $end_info$
 #include <utility>
 #include <vector>
 #include <istream>
+#include <type_traits>
 #include <unordered_map>
 
 namespace FEXCore::IR {
@@ -323,16 +326,35 @@ class IRParser: public FEXCore::IR::IREmitter {
     OrderedNode *Node{};
   };
 
+  // Storage for one decoded argument, big enough for any argument type
+  struct ParsedArg {
+    alignas(uint64_t) std::array<uint8_t, sizeof(SHA256Sum)> Data;
+
+    template<typename Type>
+    DecodeFailure Set(const std::pair<DecodeFailure, Type> &Result) {
+      static_assert(std::is_trivially_copyable_v<Type> && sizeof(Type) <= sizeof(Data));
+      memcpy(Data.data(), &Result.second, sizeof(Type));
+      return Result.first;
+    }
+
+    template<typename Type>
+    Type Get() const {
+      Type Value;
+      memcpy(&Value, Data.data(), sizeof(Type));
+      return Value;
+    }
+  };
+
+#define IROP_PARSER_TABLES
+#include <FEXCore/IR/IRDefines_ParserTables.inc>
+
   std::vector<std::string> Lines;
   std::unordered_map<std::string, OrderedNode*> SSANameMapper;
   std::vector<LineDefinition> Defs;
   LineDefinition *CurrentDef{};
-  std::unordered_map<std::string_view, FEXCore::IR::IROps> NameToOpMap;
 
   IRParser(FEXCore::Utils::IntrusivePooledAllocator &ThreadAllocator, std::istream *text)
     : IREmitter {ThreadAllocator} {
-    InitializeNameMap();
-
     std::string TmpLine;
     while (!text->eof()) {
       std::getline(*text, TmpLine);
@@ -513,14 +535,14 @@ class IRParser: public FEXCore::IR::IREmitter {
     // Ensure all of the ops are real ops
     for(size_t i = 0; i < Defs.size(); ++i) {
       auto &Def = Defs[i];
-      auto Op = NameToOpMap.find(Def.IROp);
-      if (Op == NameToOpMap.end()) {
+      auto Op = FindOp(Def.IROp);
+      if (!Op) {
         LogMan::Msg::EFmt("Error on Line: {}", Def.LineNumber);
         LogMan::Msg::EFmt("{}", Lines[Def.LineNumber]);
         LogMan::Msg::EFmt("IROp '{}' doesn't exist", Def.IROp);
         return false;
       }
-      Def.OpEnum = Op->second;
+      Def.OpEnum = *Op;
     }
 
     // Emit the header op
@@ -568,10 +590,27 @@ class IRParser: public FEXCore::IR::IREmitter {
     // Spin through all the definitions and add the ops to the basic blocks
     OrderedNode *CurrentBlock{};
     FEXCore::IR::IROp_CodeBlock *CurrentBlockOp{};
+    std::array<ParsedArg, MaxOpArgs> DecodedArgs;
     for(size_t i = 1; i < Defs.size(); ++i) {
       auto &Def = Defs[i];
       CurrentDef = &Def;
 
+      // Decode the arguments of generated ops up front from their argument kinds
+      const auto ArgCount = OpArgCounts[Def.OpEnum];
+      if (ArgCount != NotTableDriven) {
+        if (Def.Args.size() < ArgCount) {
+          LogMan::Msg::EFmt("Error on Line: {}", Def.LineNumber);
+          LogMan::Msg::EFmt("{}", Lines[Def.LineNumber]);
+          LogMan::Msg::EFmt("IROp '{}' needs {} arguments, got {}", Def.IROp, ArgCount, Def.Args.size());
+          return false;
+        }
+
+        const auto Kinds = &OpArgKinds[OpArgOffsets[Def.OpEnum]];
+        for (size_t Arg = 0; Arg < ArgCount; ++Arg) {
+          if (!CheckPrintErrorArg(Def, DecodeArg(Kinds[Arg], Def.Args[Arg], &DecodedArgs[Arg]), Arg)) return false;
+        }
+      }
+
       switch (Def.OpEnum) {
         // Special handled
         case FEXCore::IR::IROps::OP_IRHEADER:
@@ -642,7 +681,7 @@ class IRParser: public FEXCore::IR::IREmitter {
           break;
         }
 #define IROP_PARSER_SWITCH_HELPERS
-#include <FEXCore/IR/IRDefines.inc>
+#include <FEXCore/IR/IRDefines_Parser.inc>
         default: {
           LogMan::Msg::EFmt("Error on Line: {}", Def.LineNumber);
           LogMan::Msg::EFmt("{}", Lines[Def.LineNumber]);
@@ -667,16 +706,6 @@ class IRParser: public FEXCore::IR::IREmitter {
 
 		return true;
 	}
-
-  void InitializeNameMap() {
-    if (NameToOpMap.empty()) {
-      for (FEXCore::IR::IROps Op = FEXCore::IR::IROps::OP_DUMMY;
-         Op <= FEXCore::IR::IROps::OP_LAST;
-         Op = static_cast<FEXCore::IR::IROps>(static_cast<uint32_t>(Op) + 1)) {
-        NameToOpMap.insert_or_assign(FEXCore::IR::GetName(Op), Op);
-      }
-    }
-  }
 };
 
 } // anon namespace
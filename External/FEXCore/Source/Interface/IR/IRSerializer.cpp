@@ -0,0 +1,419 @@
+/*
+$info$
+meta: ir|serializer ~ Compact IR encoding for the AOT IR cache
+tags: ir|serializer
+$end_info$
+*/
+
+#include "Interface/IR/IRSerializer.h"
+
+#include <FEXCore/IR/IR.h>
+#include <FEXCore/IR/IntrusiveIRList.h>
+
+#include <algorithm>
+#include <cstring>
+#include <type_traits>
+#include <vector>
+
+namespace FEXCore::IR {
+namespace {
+  // Node flags, the bits above them hold the use count
+  constexpr uint8_t NODE_PREDICTED_VALUE = 1U << 0;
+  constexpr uint8_t NODE_PREDICTED_NEXT = 1U << 1;
+  constexpr uint8_t NODE_PREDICTED_PREVIOUS = 1U << 2;
+  constexpr uint32_t NODE_USES_SHIFT = 3;
+  // Use counts that don't fit in the flags byte follow it as a varint
+  constexpr uint32_t NODE_USES_ESCAPE = 0xFF >> NODE_USES_SHIFT;
+
+  constexpr uint64_t ZigZag(int64_t Value) {
+    return (static_cast<uint64_t>(Value) << 1) ^ static_cast<uint64_t>(Value >> 63);
+  }
+
+  constexpr int64_t UnZigZag(uint64_t Value) {
+    return static_cast<int64_t>(Value >> 1) ^ -static_cast<int64_t>(Value & 1);
+  }
+
+  // Compaction allocates node N for op N - 1, the invalid node points at the first op
+  constexpr uint32_t PredictedOpIndex(uint32_t ID) {
+    return std::max(ID, 1U) - 1;
+  }
+
+  // Fields are passed by value, references to members of the packed op structs aren't allowed
+  template<typename T>
+  bool IsDefault(T Value, T Default) {
+    return memcmp(&Value, &Default, sizeof(T)) == 0;
+  }
+
+  class CompactWriter final {
+  public:
+    CompactWriter(std::vector<uint8_t> &_Out, uint32_t _NodeCount)
+      : Out {_Out}
+      , NodeCount {_NodeCount} {}
+
+    void Byte(uint8_t Value) {
+      Out.push_back(Value);
+    }
+
+    void Varint(uint64_t Value) {
+      while (Value >= 0x80) {
+        Out.push_back(static_cast<uint8_t>(Value) | 0x80);
+        Value >>= 7;
+      }
+      Out.push_back(static_cast<uint8_t>(Value));
+    }
+
+    void Raw(const void *Data, size_t Size) {
+      auto Bytes = static_cast<const uint8_t*>(Data);
+      Out.insert(Out.end(), Bytes, Bytes + Size);
+    }
+
+    // Returns false if the wrapper doesn't point at a node of the list
+    bool NodeIDFromOffset(uint32_t Offset, uint32_t *ID) {
+      *ID = Offset / sizeof(OrderedNode);
+      if (Offset % sizeof(OrderedNode) != 0 || *ID >= NodeCount) {
+        Failed = true;
+        return false;
+      }
+      return true;
+    }
+
+    uint64_t HeaderMask(const IROp_Header *IROp) const {
+      return (IROp->Size != 0 ? 1U : 0U) | (IROp->ElementSize != 0 ? 2U : 0U);
+    }
+
+    void Op(const IROp_Header *IROp, uint64_t Present) {
+      Varint(IROp->Op);
+      Varint(Present);
+      if (Present & 1) {
+        Byte(IROp->Size);
+      }
+      if (Present & 2) {
+        Byte(IROp->ElementSize);
+      }
+    }
+
+    void SSA(OrderedNodeWrapper Arg, uint32_t Base) {
+      uint32_t ID{};
+      if (!NodeIDFromOffset(Arg.NodeOffset, &ID)) {
+        return;
+      }
+
+      Varint(ID == 0 ? 0 : ZigZag(static_cast<int64_t>(Base) - ID) + 1);
+    }
+
+    template<typename T>
+    void Field(T Value) {
+      if constexpr (std::is_integral_v<T> && sizeof(T) > 1) {
+        if constexpr (std::is_signed_v<T>) {
+          Varint(ZigZag(Value));
+        }
+        else {
+          Varint(Value);
+        }
+      }
+      else {
+        Raw(&Value, sizeof(T));
+      }
+    }
+
+    bool Failed{};
+
+  private:
+    std::vector<uint8_t> &Out;
+    uint32_t NodeCount;
+  };
+
+  // Every read is bounds checked. Once a read fails every following read returns zeroes.
+  class CompactReader final {
+  public:
+    CompactReader(const uint8_t *Data, size_t Size)
+      : Cursor {Data}
+      , End {Data + Size} {}
+
+    size_t Remaining() const {
+      return End - Cursor;
+    }
+
+    void Limit(size_t Size) {
+      End = Cursor + std::min(Size, Remaining());
+    }
+
+    bool AtEnd() const {
+      return Cursor == End;
+    }
+
+    void Fail() {
+      Failed = true;
+      Cursor = End;
+    }
+
+    uint8_t Byte() {
+      if (Cursor == End) {
+        Fail();
+        return 0;
+      }
+      return *Cursor++;
+    }
+
+    uint64_t Varint() {
+      uint64_t Value{};
+      for (uint32_t Shift = 0; Shift < 64; Shift += 7) {
+        const uint8_t Byte = this->Byte();
+        Value |= static_cast<uint64_t>(Byte & 0x7F) << Shift;
+        if (!(Byte & 0x80)) {
+          return Value;
+        }
+      }
+
+      Fail();
+      return 0;
+    }
+
+    void Raw(void *Data, size_t Size) {
+      if (Remaining() < Size) {
+        Fail();
+        memset(Data, 0, Size);
+        return;
+      }
+
+      memcpy(Data, Cursor, Size);
+      Cursor += Size;
+    }
+
+    uint64_t Header(IROps Opcode, IROp_Header *IROp) {
+      const uint64_t Present = Varint();
+      IROp->Op = Opcode;
+      IROp->Size = (Present & 1) ? Byte() : 0;
+      IROp->ElementSize = (Present & 2) ? Byte() : 0;
+      return Present;
+    }
+
+    uint32_t NodeID() {
+      const uint64_t ID = Varint();
+      if (ID >= NodeCount) {
+        Fail();
+        return 0;
+      }
+      return ID;
+    }
+
+    OrderedNodeWrapper SSA(uint32_t Base) {
+      const uint64_t Value = Varint();
+      int64_t ID{};
+      if (Value != 0) {
+        ID = static_cast<int64_t>(Base) - UnZigZag(Value - 1);
+      }
+
+      if (ID < 0 || ID >= NodeCount) {
+        Fail();
+        ID = 0;
+      }
+
+      return OrderedNodeWrapper::WrapOffset(ID * sizeof(OrderedNode));
+    }
+
+    template<typename T>
+    T Field() {
+      if constexpr (std::is_same_v<T, bool>) {
+        // Any other byte value would be an invalid bool
+        const uint8_t Value = Byte();
+        if (Value > 1) {
+          Fail();
+        }
+        return Value == 1;
+      }
+      else if constexpr (std::is_integral_v<T> && sizeof(T) > 1) {
+        if constexpr (std::is_signed_v<T>) {
+          return static_cast<T>(UnZigZag(Varint()));
+        }
+        else {
+          return static_cast<T>(Varint());
+        }
+      }
+      else {
+        T Value;
+        Raw(&Value, sizeof(T));
+        return Value;
+      }
+    }
+
+    bool Failed{};
+    uint32_t NodeCount{};
+
+  private:
+    const uint8_t *Cursor;
+    const uint8_t *End;
+  };
+
+#define IROP_SERIALIZER
+#include <FEXCore/IR/IRDefines_Serializer.inc>
+}
+
+bool EncodeCompactIR(const IRListView *IR, std::vector<uint8_t> &Out) {
+  const uintptr_t Data = IR->GetData();
+  const uintptr_t List = IR->GetListData();
+  const size_t DataSize = IR->GetDataSize();
+  const size_t NodeCount = IR->GetSSACount();
+
+  if (NodeCount == 0 || IR->GetListSize() != NodeCount * sizeof(OrderedNode)) {
+    return false;
+  }
+
+  // Ops are allocated back to back, the data is walked in allocation order
+  // The data size is kept as the last offset for nodes pointing past the final op
+  std::vector<uint32_t> OpOffsets;
+  for (size_t Offset = 0; Offset < DataSize;) {
+    auto IROp = reinterpret_cast<const IROp_Header*>(Data + Offset);
+    if (IROp->Op >= OP_LAST || GetSize(IROp->Op) > DataSize - Offset) {
+      return false;
+    }
+
+    OpOffsets.push_back(Offset);
+    Offset += GetSize(IROp->Op);
+  }
+  OpOffsets.push_back(DataSize);
+
+  std::vector<uint8_t> Body;
+  CompactWriter Writer{Body, static_cast<uint32_t>(NodeCount)};
+
+  Writer.Varint(OpOffsets.size() - 1);
+  Writer.Varint(DataSize);
+  Writer.Varint(NodeCount);
+
+  for (size_t i = 0; i + 1 < OpOffsets.size(); ++i) {
+    if (!EncodeOp(reinterpret_cast<const IROp_Header*>(Data + OpOffsets[i]), i + 1, Writer)) {
+      return false;
+    }
+  }
+
+  for (uint32_t ID = 0; ID < NodeCount; ++ID) {
+    auto Node = reinterpret_cast<const OrderedNode*>(List + ID * sizeof(OrderedNode));
+
+    auto Op = std::lower_bound(OpOffsets.begin(), OpOffsets.end(), Node->Header.Value.NodeOffset);
+    uint32_t Next{}, Previous{};
+    if (Op == OpOffsets.end() || *Op != Node->Header.Value.NodeOffset ||
+        !Writer.NodeIDFromOffset(Node->Header.Next.NodeOffset, &Next) ||
+        !Writer.NodeIDFromOffset(Node->Header.Previous.NodeOffset, &Previous)) {
+      return false;
+    }
+
+    const uint32_t OpIndex = std::distance(OpOffsets.begin(), Op);
+    const uint32_t Uses = Node->GetUses();
+
+    uint8_t Flags = std::min(Uses, NODE_USES_ESCAPE) << NODE_USES_SHIFT;
+    Flags |= OpIndex == PredictedOpIndex(ID) ? NODE_PREDICTED_VALUE : 0;
+    Flags |= Next == ID + 1 ? NODE_PREDICTED_NEXT : 0;
+    Flags |= Previous + 1 == ID ? NODE_PREDICTED_PREVIOUS : 0;
+    Writer.Byte(Flags);
+
+    if (!(Flags & NODE_PREDICTED_VALUE)) {
+      Writer.Varint(OpIndex);
+    }
+    if (!(Flags & NODE_PREDICTED_NEXT)) {
+      Writer.Varint(Next);
+    }
+    if (!(Flags & NODE_PREDICTED_PREVIOUS)) {
+      Writer.Varint(Previous);
+    }
+    if (Uses >= NODE_USES_ESCAPE) {
+      Writer.Varint(Uses);
+    }
+  }
+
+  if (Writer.Failed) {
+    return false;
+  }
+
+  CompactWriter Header{Out, 0};
+  Header.Raw(&IRSchemaHash, sizeof(IRSchemaHash));
+  Header.Varint(Body.size());
+  Header.Raw(Body.data(), Body.size());
+  return true;
+}
+
+IRListView *DecodeCompactIR(const uint8_t *Data, size_t Size) {
+  CompactReader Reader{Data, Size};
+
+  uint64_t SchemaHash{};
+  Reader.Raw(&SchemaHash, sizeof(SchemaHash));
+  if (Reader.Failed || SchemaHash != IRSchemaHash) {
+    return nullptr;
+  }
+
+  const uint64_t BodySize = Reader.Varint();
+  if (Reader.Failed || BodySize > Reader.Remaining()) {
+    return nullptr;
+  }
+  Reader.Limit(BodySize);
+
+  const uint64_t OpCount = Reader.Varint();
+  const uint64_t DataSize = Reader.Varint();
+  const uint64_t NodeCount = Reader.Varint();
+
+  // Every op and node takes at least one byte, this bounds the allocation before anything is decoded
+  if (Reader.Failed || OpCount > BodySize || NodeCount == 0 || NodeCount > BodySize ||
+      DataSize > OpCount * MaxOpSize) {
+    return nullptr;
+  }
+  Reader.NodeCount = NodeCount;
+
+  auto IR = new IRListView(DataSize, NodeCount * sizeof(OrderedNode));
+  const uintptr_t OpData = IR->GetData();
+  const uintptr_t List = IR->GetListData();
+
+  // Any padding the compiler puts in the op structs isn't encoded
+  memset(reinterpret_cast<void*>(OpData), 0, DataSize);
+
+  std::vector<uint32_t> OpOffsets;
+  OpOffsets.reserve(OpCount + 1);
+
+  size_t Offset = 0;
+  for (uint32_t i = 0; i < OpCount && !Reader.Failed; ++i) {
+    const uint64_t Opcode = Reader.Varint();
+    if (Opcode >= OP_LAST || GetSize(static_cast<IROps>(Opcode)) > DataSize - Offset) {
+      Reader.Fail();
+      break;
+    }
+
+    OpOffsets.push_back(Offset);
+    DecodeOp(static_cast<IROps>(Opcode), reinterpret_cast<IROp_Header*>(OpData + Offset), i + 1, Reader);
+    Offset += GetSize(static_cast<IROps>(Opcode));
+  }
+  OpOffsets.push_back(Offset);
+
+  if (Offset != DataSize) {
+    Reader.Fail();
+  }
+
+  for (uint32_t ID = 0; ID < NodeCount && !Reader.Failed; ++ID) {
+    auto Node = reinterpret_cast<OrderedNode*>(List + ID * sizeof(OrderedNode));
+    const uint8_t Flags = Reader.Byte();
+
+    const uint64_t OpIndex = (Flags & NODE_PREDICTED_VALUE) ? PredictedOpIndex(ID) : Reader.Varint();
+    const uint32_t Next = (Flags & NODE_PREDICTED_NEXT) ? ID + 1 : Reader.NodeID();
+    const uint32_t Previous = (Flags & NODE_PREDICTED_PREVIOUS) ? ID - 1 : Reader.NodeID();
+
+    uint64_t Uses = Flags >> NODE_USES_SHIFT;
+    if (Uses == NODE_USES_ESCAPE) {
+      Uses = Reader.Varint();
+    }
+
+    if (OpIndex >= OpOffsets.size() || Next >= NodeCount || Previous >= NodeCount) {
+      Reader.Fail();
+      break;
+    }
+
+    Node->Header.Value = OpNodeWrapper::WrapOffset(OpOffsets[OpIndex]);
+    Node->Header.Next = OrderedNodeWrapper::WrapOffset(Next * sizeof(OrderedNode));
+    Node->Header.Previous = OrderedNodeWrapper::WrapOffset(Previous * sizeof(OrderedNode));
+    Node->NumUses = Uses;
+  }
+
+  if (Reader.Failed || !Reader.AtEnd()) {
+    delete IR;
+    return nullptr;
+  }
+
+  return IR;
+}
+}
@@ -0,0 +1,42 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace FEXCore::IR {
+  class IRListView;
+
+  /**
+   * @brief Compact encoding of an IR list, used by the AOT IR cache
+   *
+   * The op encoding is generated from IR.json, see print_ir_serializer in json_ir_generator.py.
+   *
+   * Layout:
+   *  - uint64_t schema hash, IR encoded with a different IR.json is rejected
+   *  - varint size of everything following it
+   *  - varint op count, data size and node count
+   *  - Every op in data order: varint opcode, varint field presence mask, then the present header fields,
+   *    SSA arguments and present non-SSA arguments.
+   *    Fields matching their default initializer are left out.
+   *    SSA arguments are zigzag varints relative to the node the op is expected to belong to, 0 being the invalid node.
+   *  - Every node in list order: one flags byte holding the use count and which links match the compacted order,
+   *    followed by the links that don't.
+   *
+   * The decoded IR is byte for byte identical to the encoded IR, node IDs keep matching the RA data stored next to it.
+   */
+
+  /**
+   * @brief Appends the compact encoding of the IR to Out
+   *
+   * @return false if the IR can't be represented, Out is left unchanged
+   */
+  bool EncodeCompactIR(const IRListView *IR, std::vector<uint8_t> &Out);
+
+  /**
+   * @brief Decodes compact IR in a single pass, never reading past Data + Size
+   *
+   * @return A new IRListView owning its data, nullptr if the data is truncated, corrupt or from a different schema
+   */
+  IRListView *DecodeCompactIR(const uint8_t *Data, size_t Size);
+}
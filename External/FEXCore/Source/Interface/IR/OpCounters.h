@@ -0,0 +1,25 @@
+#pragma once
+#include <FEXCore/IR/IR.h>
+
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <cinttypes>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <string_view>
+#include <utility>
+
+// Per-op execution counters, enabled with ENABLE_IR_OP_COUNTERS.
+// Backends call FEXCORE_IR_COUNT_OP for every op they execute and the histogram is dumped to stderr at exit.
+namespace FEXCore::IR {
+#if defined(ENABLE_IR_OP_COUNTERS) && ENABLE_IR_OP_COUNTERS
+#define IROP_COUNTERS
+#include <FEXCore/IR/IRDefines_Counters.inc>
+
+#define FEXCORE_IR_COUNT_OP(Op) FEXCore::IR::CountOp(Op)
+#else
+#define FEXCORE_IR_COUNT_OP(Op) do {} while(0)
+#endif
+}
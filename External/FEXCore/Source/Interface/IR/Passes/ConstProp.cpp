@@ -18,6 +18,7 @@ $end_info$
 
 #include <FEXCore/IR/IR.h>
 #include <FEXCore/IR/IREmitter.h>
+#include <FEXCore/IR/IRTraits.h>
 #include <FEXCore/IR/IntrusiveIRList.h>
 #include <FEXCore/Utils/LogManager.h>
 #include <FEXCore/Utils/Profiler.h>
@@ -836,6 +837,17 @@ bool ConstProp::ConstantInlining(IREmitter *IREmit, const IRListView& CurrentIR)
   bool Changed = false;
 
   for (auto [CodeNode, IROp] : CurrentIR.GetAllCode()) {
+    // Only the second argument gets inlined, move constants there when the arguments can be swapped
+    if (IsCommutative(IROp->Op) &&
+        IREmit->IsValueConstant(IROp->Args[0]) &&
+        !IREmit->IsValueConstant(IROp->Args[1])) {
+      auto Src1 = IREmit->UnwrapNode(IROp->Args[0]);
+      auto Src2 = IREmit->UnwrapNode(IROp->Args[1]);
+      IREmit->ReplaceNodeArgument(CodeNode, 0, Src2);
+      IREmit->ReplaceNodeArgument(CodeNode, 1, Src1);
+      Changed = true;
+    }
+
     switch(IROp->Op) {
       case OP_LSHR:
       case OP_ASHR:
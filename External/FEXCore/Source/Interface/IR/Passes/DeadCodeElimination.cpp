@@ -39,7 +39,7 @@ bool DeadCodeElimination::Run(IREmitter *IREmit) {
     while (1) {
       auto [CodeNode, IROp] = CodeLast();
 
-      bool HasSideEffects = IR::HasSideEffects(IROp->Op);
+      bool HasSideEffects = IR::GetDescriptor(IROp->Op).HasSideEffects();
       if (IROp->Op == OP_SYSCALL ||
           IROp->Op == OP_INLINESYSCALL) {
         FEXCore::IR::SyscallFlags Flags{};
@@ -203,7 +203,7 @@ namespace {
   FEXCore::IR::RegisterClassType GetRegClassFromNode(FEXCore::IR::IRListView *IR, FEXCore::IR::IROp_Header *IROp) {
     using namespace FEXCore;
 
-    FEXCore::IR::RegisterClassType Class = IR::GetRegClass(IROp->Op);
+    FEXCore::IR::RegisterClassType Class = IR::GetDescriptor(IROp->Op).RegClass();
     if (Class != FEXCore::IR::ComplexClass)
       return Class;
 
@@ -257,7 +257,7 @@ namespace {
   void FindNodeClasses(RegisterGraph *Graph, FEXCore::IR::IRListView *IR) {
     for (auto [CodeNode, IROp] : IR->GetAllCode()) {
       // If the destination hasn't yet been set then set it now
-      if (GetHasDest(IROp->Op)) {
+      if (GetDescriptor(IROp->Op).HasDest()) {
         const auto ID = IR->GetID(CodeNode);
         Graph->AllocData->Map[ID.Value] = PhysicalRegister(GetRegClassFromNode(IR, IROp), INVALID_REG);
       } else {
@@ -453,9 +453,10 @@ namespace {
       for (auto [CodeNode, IROp] : IR->GetCode(BlockNode)) {
         const auto Node = IR->GetID(CodeNode);
         auto& NodeLiveRange = LiveRanges[Node.Value];
+        const auto Descriptor = IR::GetDescriptor(IROp->Op);
 
         // If the destination hasn't yet been set then set it now
-        if (GetHasDest(IROp->Op)) {
+        if (Descriptor.HasDest()) {
           LOGMAN_THROW_AA_FMT(NodeLiveRange.Begin.Value == UINT32_MAX,
                              "Node begin already defined?");
           NodeLiveRange.Begin = Node;
@@ -475,7 +476,7 @@ namespace {
           continue;
         }
 
-        const uint8_t NumArgs = IR::GetRAArgs(IROp->Op);
+        const uint8_t NumArgs = Descriptor.RAArgs();
         for (uint8_t i = 0; i < NumArgs; ++i) {
           const auto& Arg = IROp->Args[i];
 
@@ -8,6 +8,8 @@
 #include <memory>
 #include <optional>
 #include <stdint.h>
+#include <string>
+#include <string_view>
 #include <unordered_map>
 
 namespace FEXCore::Config {
@@ -101,6 +103,8 @@ namespace Type {
 #undef P
 }
 
+#include <FEXCore/Config/ConfigTypedValues.inl>
+
   FEX_DEFAULT_VISIBILITY std::string GetDataDirectory();
   FEX_DEFAULT_VISIBILITY std::string GetConfigDirectory(bool Global);
   FEX_DEFAULT_VISIBILITY std::string GetConfigFileLocation(bool Global = false);
@@ -175,6 +179,14 @@ namespace Type {
   FEX_DEFAULT_VISIBILITY std::optional<LayerValue*> All(ConfigOption Option);
   FEX_DEFAULT_VISIBILITY std::optional<std::string*> Get(ConfigOption Option);
 
+  /**
+   * @brief Typed values of the merged configuration
+   *
+   * Options are converted once when the meta layer is reloaded and kept in sync with Set, Erase and EraseSet.
+   * Options without a value hold their default.
+   */
+  FEX_DEFAULT_VISIBILITY TypedValues const &GetTypedValues();
+
   FEX_DEFAULT_VISIBILITY void Set(ConfigOption Option, std::string_view Data);
   FEX_DEFAULT_VISIBILITY void Erase(ConfigOption Option);
   FEX_DEFAULT_VISIBILITY void EraseSet(ConfigOption Option, std::string_view Data);
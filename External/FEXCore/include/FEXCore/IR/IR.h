@@ -11,6 +11,7 @@
 #include <functional>
 #include <memory>
 #include <sstream>
+#include <string>
 #include <tuple>
 
 #include <fmt/format.h>
@@ -502,7 +503,11 @@ FEX_DEF_NUM_OPS(SyscallFlags)
 #define IROP_STRUCTS
 #define IROP_SIZES
 #define IROP_REG_CLASSES
-#include <FEXCore/IR/IRDefines.inc>
+#define IROP_DESCRIPTORS
+#include <FEXCore/IR/IRDefines_Enum.inc>
+#include <FEXCore/IR/IRDefines_Structs.inc>
+#include <FEXCore/IR/IRDefines_Sizes.inc>
+#include <FEXCore/IR/IRDefines_Descriptors.inc>
 
 /* This iterator can be used to step though every single node in a multi-block in SSA order.
  *
@@ -564,6 +569,19 @@ public:
 class IRListView;
 class IREmitter;
 
+enum class DumpFormat {
+  // Human readable text, round trips through Parse
+  Text,
+  // One tab separated line per node with raw values, see DumpCompact in IRDumper.cpp
+  Compact,
+};
+
+/**
+ * @brief Appends the IR to out
+ *
+ * out is only appended to, callers dumping many blocks should reuse the same buffer to keep its allocation around.
+ */
+FEX_DEFAULT_VISIBILITY void Dump(std::string *out, IRListView const* IR, IR::RegisterAllocationData *RAData, DumpFormat Format = DumpFormat::Text);
 FEX_DEFAULT_VISIBILITY void Dump(std::stringstream *out, IRListView const* IR, IR::RegisterAllocationData *RAData);
 FEX_DEFAULT_VISIBILITY std::unique_ptr<IREmitter> Parse(FEXCore::Utils::IntrusivePooledAllocator &ThreadAllocator, std::istream *in);
 
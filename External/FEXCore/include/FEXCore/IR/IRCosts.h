@@ -0,0 +1,12 @@
+#pragma once
+#include "IR.h"
+
+#include <array>
+#include <cstdint>
+
+namespace FEXCore::IR {
+
+#define IROP_COSTS
+#include <FEXCore/IR/IRDefines_Costs.inc>
+
+}
@@ -7,6 +7,7 @@
 
 #include <algorithm>
 #include <new>
+#include <stddef.h>
 #include <stdint.h>
 #include <string.h>
 #include <vector>
@@ -51,7 +52,7 @@ friend class FEXCore::IR::PassManager;
 // Use Clang!
 #define IROP_ALLOCATE_HELPERS
 #define IROP_DISPATCH_HELPERS
-#include <FEXCore/IR/IRDefines.inc>
+#include <FEXCore/IR/IRDefines_Allocate.inc>
   IRPair<IROp_Constant> _Constant(uint8_t Size, uint64_t Constant) {
     auto Op = AllocateOp<IROp_Constant, IROps::OP_CONSTANT>();
     uint64_t Mask = ~0ULL >> (64 - Size);
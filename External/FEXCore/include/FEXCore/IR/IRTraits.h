@@ -0,0 +1,12 @@
+#pragma once
+#include "IR.h"
+
+#include <array>
+#include <cstdint>
+
+namespace FEXCore::IR {
+
+#define IROP_TRAITS
+#include <FEXCore/IR/IRDefines_Traits.inc>
+
+}
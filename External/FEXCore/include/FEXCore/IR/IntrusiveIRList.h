@@ -163,6 +163,15 @@ public:
     }
   }
 
+  // Allocates storage for IR of the given size that is written in to place afterwards
+  IRListView(size_t _DataSize, size_t _ListSize) {
+    SetCopy(true);
+    DataSize = _DataSize;
+    ListSize = _ListSize;
+    IRDataInternal = malloc(DataSize + ListSize);
+    ListDataInternal = reinterpret_cast<void*>(reinterpret_cast<uintptr_t>(IRDataInternal) + DataSize);
+  }
+
   ~IRListView() {
     if (IsCopy()) {
       free (IRDataInternal);
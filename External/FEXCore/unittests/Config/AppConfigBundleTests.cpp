@@ -0,0 +1,94 @@
+#include "Interface/Config/AppConfigBundle.h"
+
+#include <catch2/catch.hpp>
+#include <cstddef>
+#include <cstdio>
+#include <filesystem>
+#include <fstream>
+#include <iterator>
+#include <string>
+#include <utility>
+#include <vector>
+
+// APP_CONFIG_TEST_BUNDLE is built by app_config_generator.py from the configs in AppConfig/
+
+using namespace FEXCore::Config::AppConfigBundle;
+
+namespace {
+using Options = std::vector<std::pair<std::string, std::string>>;
+
+bool LookupOptions(const Bundle &AppBundle, std::string_view App, Options *Result) {
+  return AppBundle.Lookup(App, [Result](const char *Name, const char *Value) {
+    Result->emplace_back(Name, Value);
+  });
+}
+
+std::vector<char> ReadBundle() {
+  std::ifstream Input {APP_CONFIG_TEST_BUNDLE, std::ios::binary};
+  return {std::istreambuf_iterator<char>(Input), std::istreambuf_iterator<char>()};
+}
+
+// Writes a modified copy of the test bundle
+std::string WriteBundle(std::string_view Name, const std::vector<char> &Data) {
+  auto Path = (std::filesystem::temp_directory_path() / Name).string();
+  std::ofstream Output {Path, std::ios::binary};
+  Output.write(Data.data(), Data.size());
+  return Path;
+}
+}
+
+TEST_CASE("AppConfigBundle: Generated options read back in order") {
+  Bundle AppBundle {APP_CONFIG_TEST_BUNDLE};
+  REQUIRE(AppBundle.IsValid());
+
+  Options Simple;
+  REQUIRE(LookupOptions(AppBundle, "Simple", &Simple));
+  CHECK(Simple == Options {{"Multiblock", "1"}, {"MaxInst", "-1"}, {"Core", "1"}});
+
+  Options Steam;
+  REQUIRE(LookupOptions(AppBundle, "Steam_1234_Game.exe", &Steam));
+  CHECK(Steam == Options {{"Env", "STEAM_COMPAT=1"}, {"SMCChecks", "255"}, {"DumpIR", "stderr"}});
+
+  // Only the Config section is bundled
+  Options Thunks;
+  REQUIRE(LookupOptions(AppBundle, "Thunks", &Thunks));
+  CHECK(Thunks == Options {{"X87ReducedPrecision", "1"}});
+}
+
+TEST_CASE("AppConfigBundle: Config without options is still found") {
+  Bundle AppBundle {APP_CONFIG_TEST_BUNDLE};
+
+  Options Empty;
+  CHECK(LookupOptions(AppBundle, "Empty", &Empty));
+  CHECK(Empty.empty());
+}
+
+TEST_CASE("AppConfigBundle: Unknown applications miss") {
+  Bundle AppBundle {APP_CONFIG_TEST_BUNDLE};
+
+  Options Result;
+  CHECK(!LookupOptions(AppBundle, "Missing", &Result));
+  CHECK(!LookupOptions(AppBundle, "Simpl", &Result));
+  CHECK(!LookupOptions(AppBundle, "Simple.json", &Result));
+  CHECK(!LookupOptions(AppBundle, "", &Result));
+  CHECK(Result.empty());
+}
+
+TEST_CASE("AppConfigBundle: Damaged bundles are rejected") {
+  CHECK(!Bundle {"/nonexistent/AppConfig.bin"}.IsValid());
+
+  auto Data = ReadBundle();
+  REQUIRE(Data.size() > sizeof(BundleHeader));
+
+  auto Truncated = Data;
+  Truncated.pop_back();
+  auto TruncatedPath = WriteBundle("FEXAppConfigTruncated.bin", Truncated);
+  CHECK(!Bundle {TruncatedPath.c_str()}.IsValid());
+  std::remove(TruncatedPath.c_str());
+
+  auto WrongVersion = Data;
+  WrongVersion[offsetof(BundleHeader, Version)] ^= 0xFF;
+  auto WrongVersionPath = WriteBundle("FEXAppConfigWrongVersion.bin", WrongVersion);
+  CHECK(!Bundle {WrongVersionPath.c_str()}.IsValid());
+  std::remove(WrongVersionPath.c_str());
+}
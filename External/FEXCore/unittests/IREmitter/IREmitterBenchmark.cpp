@@ -0,0 +1,69 @@
+#include <FEXCore/IR/IR.h>
+#include <FEXCore/IR/IREmitter.h>
+#include <FEXCore/Utils/ThreadPoolAllocator.h>
+
+#include <algorithm>
+#include <array>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <string_view>
+
+// Builds ops of every IR op class through the generated _Op helpers and reports the emission throughput.
+// Arguments come from BenchmarkArgs in IR.json and pass emit time validation. Every SSA argument of a register class
+// is the same node, only the cost of building ops is measured.
+
+// Args: [Ops per class]
+
+namespace {
+using namespace FEXCore::IR;
+
+#define IROP_EMITTER_BENCHMARK
+#include <FEXCore/IR/IRDefines_EmitterBenchmark.inc>
+
+// Upper bound of the data and list space one op can take
+constexpr size_t MaxOpFootprint = 256 + sizeof(FEXCore::IR::OrderedNode);
+// Stay well below the emitter's buffer before resetting it
+constexpr size_t ResetThreshold = 4 * 1024 * 1024;
+
+BenchmarkNodes CreateNodes(FEXCore::IR::IREmitter &IR) {
+  auto GPR = IR._Constant(64, 0);
+  return {GPR, IR._VCastFromGPR(16, 8, GPR), IR._CreateElementPair(GPR, GPR)};
+}
+}
+
+int main(int argc, char **argv) {
+  size_t OpsPerClass = 1000000;
+  if (argc > 1) {
+    OpsPerClass = strtoull(argv[1], nullptr, 0);
+  }
+
+  FEXCore::Utils::PooledAllocatorMalloc Allocator;
+  FEXCore::IR::IREmitter IR {Allocator};
+
+  printf("%-10s %12s %12s %10s\n", "Class", "Ops", "Time (ms)", "ns/op");
+  for (const auto &Benchmark : OpClassBenchmarks) {
+    IR.ResetWorkingList();
+    auto Nodes = CreateNodes(IR);
+    const size_t OpsPerRound = Benchmark.Emit(&IR, Nodes);
+    const size_t RoundsPerReset = std::max<size_t>(1, ResetThreshold / (OpsPerRound * MaxOpFootprint));
+
+    size_t Ops = 0;
+    size_t Rounds = 0;
+    const auto Start = std::chrono::steady_clock::now();
+    while (Ops < OpsPerClass) {
+      if (Rounds++ == RoundsPerReset) {
+        IR.ResetWorkingList();
+        Nodes = CreateNodes(IR);
+        Rounds = 1;
+      }
+      Ops += Benchmark.Emit(&IR, Nodes);
+    }
+    const std::chrono::duration<double, std::nano> Duration = std::chrono::steady_clock::now() - Start;
+
+    printf("%-10.*s %12zu %12.2f %10.2f\n",
+      static_cast<int>(Benchmark.Name.size()), Benchmark.Name.data(), Ops, Duration.count() / 1000000.0, Duration.count() / Ops);
+  }
+
+  return 0;
+}
@@ -0,0 +1,69 @@
+#include <FEXCore/IR/IR.h>
+#include <FEXCore/IR/IREmitter.h>
+#include <FEXCore/Utils/ThreadPoolAllocator.h>
+
+#include <catch2/catch.hpp>
+#include <cstring>
+
+// The generated _Op builders don't zero an op before writing it.
+// Builds every op on top of differently filled buffers, any byte a builder leaves alone shows up as a difference.
+// A zero filled buffer gives the same bytes the old memset in AllocateOp did.
+
+namespace {
+using namespace FEXCore::IR;
+
+#define IROP_EMITTER_BENCHMARK
+#include <FEXCore/IR/IRDefines_EmitterBenchmark.inc>
+
+class FilledEmitter final : public IREmitter {
+  public:
+    FilledEmitter(FEXCore::Utils::IntrusivePooledAllocator &ThreadAllocator, uint8_t Fill)
+      : IREmitter {ThreadAllocator} {
+      memset(reinterpret_cast<void*>(DualListData.DataBegin()), Fill, DualListData.DataBackingSize());
+      ResetWorkingList();
+    }
+
+    void EmitAll() {
+      auto GPR = _Constant(64, 0);
+      BenchmarkNodes Nodes {GPR, _VCastFromGPR(16, 8, GPR), _CreateElementPair(GPR, GPR)};
+      for (const auto &Benchmark : OpClassBenchmarks) {
+        Benchmark.Emit(this, Nodes);
+      }
+    }
+
+    const uint8_t *Data() const { return reinterpret_cast<const uint8_t*>(DualListData.DataBegin()); }
+    size_t DataSize() const { return DualListData.DataSize(); }
+
+    // Name of the op covering a data offset
+    std::string_view FindOp(size_t Offset) const {
+      for (size_t Node = 0; Node < DualListData.ListSize(); Node += sizeof(OrderedNode)) {
+        auto IROp = reinterpret_cast<const OrderedNode*>(DualListData.ListBegin() + Node)->Op(DualListData.DataBegin());
+        const size_t OpOffset = reinterpret_cast<uintptr_t>(IROp) - DualListData.DataBegin();
+        if (OpOffset <= Offset && Offset < OpOffset + GetSize(IROp->Op)) {
+          return GetName(IROp->Op);
+        }
+      }
+      return "None";
+    }
+};
+}
+
+TEST_CASE("IREmitter: Op builders write every byte of the op") {
+  FEXCore::Utils::PooledAllocatorMalloc Allocator;
+  FilledEmitter Zeroed {Allocator, 0x00};
+  FilledEmitter Filled {Allocator, 0xFF};
+
+  Zeroed.EmitAll();
+  Filled.EmitAll();
+
+  REQUIRE(Zeroed.DataSize() == Filled.DataSize());
+  REQUIRE(Zeroed.DataSize() > 0);
+
+  size_t FirstDifference = 0;
+  while (FirstDifference < Zeroed.DataSize() && Zeroed.Data()[FirstDifference] == Filled.Data()[FirstDifference]) {
+    ++FirstDifference;
+  }
+
+  INFO("First unwritten byte is in " << (FirstDifference < Zeroed.DataSize() ? Zeroed.FindOp(FirstDifference) : "None"));
+  CHECK(FirstDifference == Zeroed.DataSize());
+}
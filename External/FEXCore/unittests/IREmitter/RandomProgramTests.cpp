@@ -0,0 +1,86 @@
+#include "Interface/IR/PassManager.h"
+#include "Interface/IR/Passes.h"
+#include "Interface/IR/Passes/RegisterAllocationPass.h"
+
+#include <FEXCore/IR/IR.h>
+#include <FEXCore/IR/IREmitter.h>
+#include <FEXCore/Utils/LogManager.h>
+#include <FEXCore/Utils/ThreadPoolAllocator.h>
+
+#include <catch2/catch.hpp>
+#include <filesystem>
+#include <fstream>
+#include <stdexcept>
+#include <string>
+
+// Runs the programs json_ir_random_program.py generates through the IR parser, the register allocator and the IR validation passes.
+// RANDOM_PROGRAM_DIR is generated by the build.
+
+namespace {
+// The parser and validation passes only report errors through the log, turn them in to test failures
+void ThrowOnError(LogMan::DebugLevels Level, char const *Message) {
+  if (Level == LogMan::ERROR || Level == LogMan::ASSERT) {
+    throw std::runtime_error(Message);
+  }
+}
+
+// Same register file the Arm64 backend gives the register allocator
+void SetupRegisters(FEXCore::IR::RegisterAllocationPass *RAPass) {
+  constexpr uint32_t NumGPRs = 9;
+  constexpr uint32_t NumFixedGPRs = 16;
+  constexpr uint32_t NumFPRs = 12;
+  constexpr uint32_t NumFixedFPRs = 16;
+  constexpr uint32_t NumGPRPairs = 4;
+
+  RAPass->AllocateRegisterSet(NumGPRs + NumFPRs + NumGPRPairs, 6);
+  RAPass->AddRegisters(FEXCore::IR::GPRClass, NumGPRs);
+  RAPass->AddRegisters(FEXCore::IR::GPRFixedClass, NumFixedGPRs);
+  RAPass->AddRegisters(FEXCore::IR::FPRClass, NumFPRs);
+  RAPass->AddRegisters(FEXCore::IR::FPRFixedClass, NumFixedFPRs);
+  RAPass->AddRegisters(FEXCore::IR::GPRPairClass, NumGPRPairs);
+  RAPass->AddRegisters(FEXCore::IR::ComplexClass, 1);
+
+  for (uint32_t i = 0; i < NumGPRPairs; ++i) {
+    RAPass->AddRegisterConflict(FEXCore::IR::GPRClass, i * 2, FEXCore::IR::GPRPairClass, i);
+    RAPass->AddRegisterConflict(FEXCore::IR::GPRClass, i * 2 + 1, FEXCore::IR::GPRPairClass, i);
+  }
+}
+
+void AllocateAndValidate(const std::filesystem::path &Program) {
+  std::ifstream Input {Program};
+  REQUIRE(Input.is_open());
+
+  FEXCore::Utils::PooledAllocatorMalloc Allocator;
+  auto IREmit = FEXCore::IR::Parse(Allocator, &Input);
+  REQUIRE(IREmit);
+
+  FEXCore::IR::PassManager Manager;
+  Manager.InsertPass(FEXCore::IR::CreateIRCompaction(Allocator), "Compaction");
+  Manager.InsertRegisterAllocationPass(false, true);
+  SetupRegisters(Manager.GetPass<FEXCore::IR::RegisterAllocationPass>("RA"));
+
+  Manager.InsertPass(FEXCore::IR::Validation::CreatePhiValidation());
+  Manager.InsertPass(FEXCore::IR::Validation::CreateIRValidation(), "IRValidation");
+  Manager.InsertPass(FEXCore::IR::Validation::CreateValueDominanceValidation());
+  Manager.InsertPass(FEXCore::IR::Validation::CreateRAValidation());
+  Manager.Run(IREmit.get());
+}
+}
+
+TEST_CASE("RandomProgram: Generated programs register allocate and validate") {
+  LogMan::Msg::InstallHandler(ThrowOnError);
+
+  size_t Programs = 0;
+  for (const auto &Entry : std::filesystem::directory_iterator {RANDOM_PROGRAM_DIR}) {
+    if (Entry.path().extension() != ".ir") {
+      continue;
+    }
+
+    INFO(Entry.path().filename().string());
+    CHECK_NOTHROW(AllocateAndValidate(Entry.path()));
+    ++Programs;
+  }
+
+  LogMan::Msg::UnInstallHandlers();
+  CHECK(Programs > 0);
+}
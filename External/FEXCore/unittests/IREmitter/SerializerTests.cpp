@@ -0,0 +1,96 @@
+#include "Interface/IR/IRSerializer.h"
+
+#include <FEXCore/IR/IR.h>
+#include <FEXCore/IR/IREmitter.h>
+#include <FEXCore/IR/IntrusiveIRList.h>
+#include <FEXCore/Utils/ThreadPoolAllocator.h>
+
+#include <catch2/catch.hpp>
+#include <cstring>
+#include <memory>
+#include <vector>
+
+// Round trips IR holding every op through the compact encoding the AOT IR cache uses.
+
+namespace {
+using namespace FEXCore::IR;
+
+#define IROP_EMITTER_BENCHMARK
+#include <FEXCore/IR/IRDefines_EmitterBenchmark.inc>
+
+std::vector<uint8_t> EncodeEveryOp(FEXCore::Utils::IntrusivePooledAllocator &Allocator, IRListView **Copy) {
+  IREmitter IR {Allocator};
+  auto GPR = IR._Constant(64, 0);
+  BenchmarkNodes Nodes {GPR, IR._VCastFromGPR(16, 8, GPR), IR._CreateElementPair(GPR, GPR)};
+  for (const auto &Benchmark : OpClassBenchmarks) {
+    Benchmark.Emit(&IR, Nodes);
+  }
+
+  *Copy = IR.CreateIRCopy();
+
+  std::vector<uint8_t> Encoded;
+  REQUIRE(EncodeCompactIR(*Copy, Encoded));
+  return Encoded;
+}
+}
+
+TEST_CASE("IRSerializer: Round trip is byte identical") {
+  FEXCore::Utils::PooledAllocatorMalloc Allocator;
+  IRListView *Original;
+  auto Encoded = EncodeEveryOp(Allocator, &Original);
+  std::unique_ptr<IRListView> OriginalOwner {Original};
+
+  std::unique_ptr<IRListView> Decoded {DecodeCompactIR(Encoded.data(), Encoded.size())};
+  REQUIRE(Decoded);
+
+  REQUIRE(Decoded->GetDataSize() == Original->GetDataSize());
+  REQUIRE(Decoded->GetListSize() == Original->GetListSize());
+  CHECK(memcmp(reinterpret_cast<void*>(Decoded->GetData()), reinterpret_cast<void*>(Original->GetData()), Original->GetDataSize()) == 0);
+  CHECK(memcmp(reinterpret_cast<void*>(Decoded->GetListData()), reinterpret_cast<void*>(Original->GetListData()), Original->GetListSize()) == 0);
+
+  // Encoding the decoded IR gives the same bytes again
+  std::vector<uint8_t> Reencoded;
+  REQUIRE(EncodeCompactIR(Decoded.get(), Reencoded));
+  CHECK(Reencoded == Encoded);
+}
+
+TEST_CASE("IRSerializer: Truncated input is rejected") {
+  FEXCore::Utils::PooledAllocatorMalloc Allocator;
+  IRListView *Original;
+  auto Encoded = EncodeEveryOp(Allocator, &Original);
+  delete Original;
+
+  for (size_t Size = 0; Size < Encoded.size(); ++Size) {
+    // Copied so reads past the truncated size land outside the allocation
+    std::vector<uint8_t> Truncated(Encoded.begin(), Encoded.begin() + Size);
+    std::unique_ptr<IRListView> Decoded {DecodeCompactIR(Truncated.data(), Truncated.size())};
+    INFO("Truncated to " << Size << " of " << Encoded.size() << " bytes");
+    CHECK(!Decoded);
+  }
+}
+
+TEST_CASE("IRSerializer: Corrupted input doesn't crash") {
+  FEXCore::Utils::PooledAllocatorMalloc Allocator;
+  IRListView *Original;
+  auto Encoded = EncodeEveryOp(Allocator, &Original);
+  delete Original;
+
+  // Corrupted data has to either fail to decode or give IR the encoder can walk
+  for (const uint8_t Pattern : {0x01, 0x80, 0xFF}) {
+    for (size_t Offset = 0; Offset < Encoded.size(); ++Offset) {
+      auto Corrupted = Encoded;
+      Corrupted[Offset] ^= Pattern;
+
+      std::unique_ptr<IRListView> Decoded {DecodeCompactIR(Corrupted.data(), Corrupted.size())};
+      if (Decoded) {
+        std::vector<uint8_t> Reencoded;
+        EncodeCompactIR(Decoded.get(), Reencoded);
+      }
+    }
+  }
+
+  // The schema hash is checked before anything else
+  auto WrongSchema = Encoded;
+  WrongSchema[0] ^= 1;
+  CHECK(DecodeCompactIR(WrongSchema.data(), WrongSchema.size()) == nullptr);
+}
@@ -1,21 +1,30 @@
 #!/usr/bin/python3
-from enum import Flag
-import json
 import os
-import struct
 import sys
 import glob
-from threading import Thread
 import subprocess
+import threading
 import time
 import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import test_timings
 
 if sys.version_info[0] < 3:
         raise Exception("Python 3 or a more recent version is required.")
 
+# Args: <LockStepRunner> <Test folder prefix> [Per test timeout in seconds]
 if (len(sys.argv) < 3):
     sys.exit("We need two arguments. Location of LockStepRunner and folder containing the tests")
 
+# Durations of previous runs are used to start the slowest tests first
+TimingSuite = "Lockstep"
+TimingVariant = "vm"
+
+Timeout = None
+if (len(sys.argv) > 3):
+    Timeout = float(sys.argv[3])
+
 # Remove our SHM regions if they still exist
 SHM_Files = glob.glob("/dev/shm/*_Lockstep")
 for file in SHM_Files:
@@ -23,76 +32,102 @@ for file in SHM_Files:
 
 UnitTests = sorted(glob.glob(sys.argv[2] + "*"))
 UnitTestsSize = len(UnitTests)
-Threads = [None] * UnitTestsSize
 Results = [None] * UnitTestsSize
-ThreadResults = [[None] * 2] * UnitTestsSize
 MaxFileNameStringLen = 0
+for File in UnitTests:
+    MaxFileNameStringLen = max(MaxFileNameStringLen, len(File))
+
+PrintLock = threading.Lock()
 
-def Threaded_Runner(Args, ID, Client):
-    Log = open("Log_" + str(ID) + "_" + str(Client), "w")
-    Log.write("Args: %s\n" % " ".join(Args))
-    Log.flush()
-    Process = subprocess.Popen(Args, stdout=Log, stderr=Log)
-    Process.wait()
-    Log.flush()
-    ThreadResults[ID][Client] = Process.returncode
+def ResultString(Result):
+    if Result == "TIMEOUT":
+        return Result
+    return hex(Result)
+
+def PrintResult(ID):
+    DupLen = MaxFileNameStringLen - len(UnitTests[ID])
+    if (Results[ID] == 0):
+        print("\t'%s'%s - PASSED ID: %d - 0" % (UnitTests[ID], " "*DupLen, ID))
+    else:
+        print("\t'%s'%s - FAILED ID: %d - %s" % (UnitTests[ID], " "*DupLen, ID, ResultString(Results[ID])))
 
 def Threaded_Manager(Runner, ID, File):
     ServerArgs = ["catchsegv", Runner, "-c", "vm", "-n", "1", "-I", "R" + str(ID), File]
     ClientArgs = ["catchsegv", Runner, "-c", "vm", "-n", "1", "-I", "R" + str(ID), "-C"]
 
-    ServerThread = Thread(target = Threaded_Runner, args = (ServerArgs, ID, 0))
-    ClientThread = Thread(target = Threaded_Runner, args = (ClientArgs, ID, 1))
-
-    ServerThread.start()
-    ClientThread.start()
-
-    ClientThread.join()
-    ServerThread.join()
-
+    with PrintLock:
+        print("'%s' Running Test" % File)
+
+    Start = time.monotonic()
+    Processes = []
+    Logs = []
+    for Client, Args in enumerate([ServerArgs, ClientArgs]):
+        Log = open("Log_" + str(ID) + "_" + str(Client), "w")
+        Log.write("Args: %s\n" % " ".join(Args))
+        Log.flush()
+        Logs.append(Log)
+        # Own process group so a timeout can take down everything catchsegv started
+        Processes.append(subprocess.Popen(Args, stdout=Log, stderr=Log, start_new_session=True))
+
+    TimedOut = False
+    for Process in Processes:
+        if not test_timings.WaitForUsage(Process, Start, Timeout):
+            TimedOut = True
+            break
+
+    if TimedOut:
+        # One side hung, the other side can't make progress without it either
+        # Killing catchsegv alone would leave the runner behind holding the VM slot
+        for Process in Processes:
+            test_timings.KillProcessGroup(Process)
+            if Process.returncode == None:
+                Process.wait()
+
+    Wall = time.monotonic() - Start
+
+    for Log in Logs:
+        Log.close()
+
+    ServerResult = Processes[0].returncode
+    ClientResult = Processes[1].returncode
+
+    if TimedOut:
+        Results[ID] = "TIMEOUT"
     # The server is the one we should listen to for results
-    if (ThreadResults[ID][1] != 0 and ThreadResults[ID][0] == 0):
+    elif (ClientResult != 0 and ServerResult == 0):
         # If the client died for some reason but server thought we were fine then take client data
-        Results[ID] = ThreadResults[ID][1]
+        Results[ID] = ClientResult
     else:
         # Else just take the server data
-        Results[ID] = ThreadResults[ID][0]
+        Results[ID] = ServerResult
 
-    DupLen = MaxFileNameStringLen - len(UnitTests[ID])
+    # The server does all the work so its usage is the one recorded
+    ResultCode = -1 if TimedOut else Results[ID]
+    test_timings.RecordRun(TimingSuite, File, TimingVariant, Wall, Processes[0].rusage, ResultCode)
 
-    if (Results[ID] == 0):
-        print("\t'%s'%s - PASSED ID: %d - 0" % (UnitTests[ID], " "*DupLen, ID))
-    else:
-        print("\t'%s'%s - FAILED ID: %d - %s" % (UnitTests[ID], " "*DupLen, ID, hex(Results[ID])))
-
-RunnerSlot = 0
-MaxRunnerSlots = min(32, multiprocessing.cpu_count() / 2)
-RunnerSlots = [None] * MaxRunnerSlots
-for RunnerID in range(UnitTestsSize):
-    File = UnitTests[RunnerID]
-    print("'%s' Running Test" % File)
-    MaxFileNameStringLen = max(MaxFileNameStringLen, len(File))
-    Threads[RunnerID] = Thread(target = Threaded_Manager, args = (sys.argv[1], RunnerID, File))
-    Threads[RunnerID].start()
-    if (MaxRunnerSlots != 0):
-        RunnerSlots[RunnerSlot] = Threads[RunnerID]
-        RunnerSlot += 1
-        if (RunnerSlot == MaxRunnerSlots):
-            for i in range(MaxRunnerSlots):
-                RunnerSlots[i].join()
-            RunnerSlot = 0
+    with PrintLock:
+        PrintResult(ID)
 
-for i in range(UnitTestsSize):
-    Threads[i].join()
+# Longest expected tests go first so they don't end up as the tail of the run
+# Tests without any history are assumed to be slow
+Order = test_timings.OrderLongestFirst(range(UnitTestsSize), lambda ID: test_timings.ExpectedDuration(TimingSuite, UnitTests[ID], TimingVariant))
+
+MaxRunnerSlots = max(1, min(32, multiprocessing.cpu_count() // 2))
+with ThreadPoolExecutor(max_workers = MaxRunnerSlots) as Executor:
+    Futures = []
+    for RunnerID in Order:
+        Futures.append(Executor.submit(Threaded_Manager, sys.argv[1], RunnerID, UnitTests[RunnerID]))
+
+    for Future in as_completed(Futures):
+        # Surface exceptions from the workers
+        Future.result()
 
 print("====== PASSED RESULTS ======")
 for i in range(UnitTestsSize):
-    DupLen = MaxFileNameStringLen - len(UnitTests[i])
     if (Results[i] == 0):
-        print("\t'%s'%s - PASSED ID: %d - 0" % (UnitTests[i], " "*DupLen, i))
+        PrintResult(i)
 
 print("====== FAILED RESULTS ======")
 for i in range(UnitTestsSize):
-    DupLen = MaxFileNameStringLen - len(UnitTests[i])
     if (Results[i] != 0):
-        print("\t'%s'%s - FAILED ID: %d - %s" % (UnitTests[i], " "*DupLen, i, hex(Results[i])))
+        PrintResult(i)
@@ -1,39 +1,32 @@
 #!/usr/bin/python3
+import json
+import math
 import os
 import sys
+import tempfile
+import threading
+import time
 import subprocess
 
-def LoadTestsFile(File):
-    Dict = {}
-    if not os.path.exists(File):
-        return Dict
+import test_timings
+from test_expectations import LoadTestsFile, LoadTestsFileResults
 
-    with open(File) as dtf:
-        for line in dtf:
-            test = line.split("#")[0].strip() # remove comments and empty spaces
-            if len(test) > 0:
-                Dict[test] = 1
-
-    return Dict
-
-def LoadTestsFileResults(File):
-    Dict = {}
-    if not os.path.exists(File):
-        return Dict
-
-    with open(File) as dtf:
-        for line in dtf:
-            test = line.split("#")[0].strip() # remove comments and empty spaces
-            if len(test) > 0:
-                parts = line.split(" ")
-                Dict[parts[0]] = int(parts[1])
+# Args: <Known Failures file> <ExpectedOutputsFile> <DisabledTestsFile> <FlakeTestsFile> <TestName> <Mode> <FexExecutable> <FexArgs>...
 
-    return Dict
+# fexargs should also include the test executable
 
+# Resource usage of the test is printed as a TEST_STATS: JSON line.
+# If TEST_STATS_FILE is set the same line is also appended to that file.
 
-# Args: <Known Failures file> <ExpectedOutputsFile> <DisabledTestsFile> <FlakeTestsFile> <TestName> <Mode> <FexExecutable> <FexArgs>...
+# Timeouts come from the Timeouts file next to the Known Failures file, "<test> <seconds>" per line.
+# A "*" entry sets the default for the suite, TEST_TIMEOUT sets it for suites without one.
+# The whole process group of a test gets killed on timeout.
+# If TEST_TIMEOUT_STACKS is set the kernel stacks and wchan of every thread are printed first.
 
-# fexargs should also include the test executable
+# Retries are budgeted from the recorded pass/fail history of the test rather than a fixed count.
+# Stable tests don't get any, tests that keep flipping get more. Flake_Tests entries always get the full budget.
+# Retries run in parallel and the rest get killed as soon as one of them has the expected result.
+# Tests that flip without being on Flake_Tests are flagged as possible new flakes.
 
 if (len(sys.argv) < 7):
     sys.exit()
@@ -52,8 +45,13 @@ known_failures = LoadTestsFile(known_failures_file)
 expected_output = LoadTestsFileResults(expected_output_file)
 disabled_tests = LoadTestsFile(disabled_tests_file)
 flake_tests = LoadTestsFile(flake_tests_file)
+timeouts = LoadTestsFileResults(os.path.join(os.path.dirname(known_failures_file), "Timeouts"))
+
+Timeout = timeouts.get(test_name, timeouts.get("*"))
+if Timeout == None and os.getenv("TEST_TIMEOUT") != None:
+    Timeout = float(os.getenv("TEST_TIMEOUT"))
+CaptureStacks = os.getenv("TEST_TIMEOUT_STACKS", "0") != "0"
 
-# run with timeout to avoid locking up
 RunnerArgs = []
 
 RunnerArgs.append(fexecutable)
@@ -70,52 +68,175 @@ for i in range(len(sys.argv) - StartingFEXArgsOffset):
 
 #print(RunnerArgs)
 
+# Timing database key, the FEX options identify the variant of the test
+Suite, _, Variant = test_timings.GuestRunnerKey(sys.argv[1:])
+
 ResultCode = 0
 
 # Handle flakes
-TryCount = 1
+MaxRetries = 4
+FlakeScore = test_timings.FlakeScore(Suite, test_name, Variant)
+RetryBudget = 0
+if FlakeScore != None and FlakeScore > 0.0:
+    RetryBudget = math.ceil(MaxRetries * FlakeScore)
+
+NewFlake = False
 if (flake_tests.get(test_name)):
-    TryCount = 5
+    # Listed flakes keep the full budget, a quiet history doesn't mean they stopped flaking
+    RetryBudget = MaxRetries
+elif RetryBudget > 0:
+    NewFlake = True
+    print("Possible new flake, result changed in {:.0%} of recent runs. Consider adding it to {}".format(FlakeScore, flake_tests_file))
 
 if (disabled_tests.get(test_name)):
     ResultCode = -73
 
 # expect zero by default
-if (not test_name in expected_output):
-    expected_output[test_name] = 0
+ExpectedResult = expected_output.get(test_name, 0)
+
+# Resource usage of every attempt, emitted as structured output once the test is done
+Runs = []
+TimedOut = False
+RunsLock = threading.Lock()
+# Attempts killed because another one already had the expected result
+CancelledProcesses = set()
+
+def StartAttempt(**Kwargs):
+    print(RunnerArgs)
+    Start = time.monotonic()
+    return [subprocess.Popen(RunnerArgs, **Kwargs), Start]
+
+# Waits for an attempt and records it. Returns the result code, None if the attempt got cancelled.
+def FinishAttempt(Process, Start, Others = []):
+    global TimedOut
+    AttemptTimedOut = not test_timings.WaitForUsage(Process, Start, Timeout)
+    if AttemptTimedOut:
+        print("test timed out after", Timeout, "seconds")
+        if CaptureStacks:
+            test_timings.DumpProcessGroupStacks(Process.pid)
+
+        test_timings.KillProcessGroup(Process)
+        test_timings.WaitForUsage(Process, time.monotonic())
+
+    Wall = time.monotonic() - Start
+
+    with RunsLock:
+        Cancelled = Process in CancelledProcesses
+        Passed = not AttemptTimedOut and Process.returncode == ExpectedResult
+
+        Run = test_timings.UsageToDict(Wall, Process.rusage)
+        Run["ResultCode"] = Process.returncode
+        Run["TimedOut"] = AttemptTimedOut
+        Run["Cancelled"] = Cancelled
+        Runs.append(Run)
+
+        if Cancelled:
+            return None
+
+        TimedOut = TimedOut or AttemptTimedOut
+        # A killed attempt says nothing about the test, only finished ones go in to the history
+        test_timings.RecordRun(Suite, test_name, Variant, Wall, Process.rusage, Process.returncode, Passed)
+
+        if Passed:
+            # Early exit, nothing left to prove
+            for Other in Others:
+                if Other != Process and Other.returncode == None:
+                    CancelledProcesses.add(Other)
+                    test_timings.KillProcessGroup(Other)
+
+    return Process.returncode
 
 if ResultCode == 0:
-    for Try in range(TryCount):
-        # Run the test and wait for it to end to get the result
-        print(RunnerArgs)
-        Process = subprocess.Popen(RunnerArgs)
-        Process.wait()
-        ResultCode = Process.returncode
-
-        # Break if the expected output is the result code
-        if (expected_output[test_name] == ResultCode):
-            break
-
-if (expected_output[test_name] != ResultCode):
-    if (test_name in expected_output):
-        print("test failed, expected is", expected_output[test_name], "but got", ResultCode)
-    else:
-        print("Test doesn't have expected output,", test_name)
+    # Run the test and wait for it to end to get the result
+    # run with timeout to avoid locking up, in its own process group so children can be killed too
+    ResultCode = FinishAttempt(*StartAttempt(start_new_session = Timeout != None))
+
+    # A hang isn't going to get better by retrying it
+    if ExpectedResult != ResultCode and not TimedOut and RetryBudget > 0:
+        print("Retrying", RetryBudget, "times in parallel")
+
+        Attempts = []
+        for Retry in range(RetryBudget):
+            # Output is buffered so the attempts don't interleave
+            Output = tempfile.TemporaryFile()
+            Attempts.append([Output] + StartAttempt(stdout = Output, stderr = subprocess.STDOUT, start_new_session = True))
+
+        Processes = [Process for Output, Process, Start in Attempts]
+        Results = [None] * len(Attempts)
+        def Wait(Index, Process, Start):
+            Results[Index] = FinishAttempt(Process, Start, Processes)
+
+        Threads = [threading.Thread(target = Wait, args = (Index, Process, Start)) for Index, (Output, Process, Start) in enumerate(Attempts)]
+        for Thread in Threads:
+            Thread.start()
+        for Thread in Threads:
+            Thread.join()
+
+        for Index, (Output, Process, Start) in enumerate(Attempts):
+            if Results[Index] != None:
+                print("Retry {} output:".format(Index + 1), flush = True)
+                Output.seek(0)
+                sys.stdout.write(Output.read().decode("utf-8", errors="replace"))
+            Output.close()
+
+        Finished = [Result for Result in Results if Result != None]
+        if ExpectedResult in Finished:
+            ResultCode = ExpectedResult
+        elif len(Finished):
+            ResultCode = Finished[-1]
+
+def EmitStats(Passed):
+    Stats = {
+        "Suite": Suite,
+        "Test": test_name,
+        "Variant": Variant,
+        "Passed": Passed,
+        "ResultCode": ResultCode,
+        "ExpectedResult": ExpectedResult,
+        "KnownFailure": known_failures.get(test_name) != None,
+        "Flake": flake_tests.get(test_name) != None,
+        "FlakeScore": FlakeScore,
+        "NewFlake": NewFlake,
+        "RetryBudget": RetryBudget,
+        "Retries": max(0, len(Runs) - 1),
+        "TimedOut": TimedOut,
+        "Runs": Runs,
+    }
+
+    # Totals across every attempt, a flaky test pays for all of its retries
+    for Key in ["Wall", "User", "Sys", "MajorFaults", "MinorFaults", "VoluntaryCS", "InvoluntaryCS"]:
+        Stats[Key] = sum(Run[Key] for Run in Runs)
+    Stats["MaxRSS"] = max([Run["MaxRSS"] for Run in Runs], default = 0)
+
+    StatsLine = json.dumps(Stats)
+    print("TEST_STATS:", StatsLine)
+
+    # Optionally collect the stats of every test in one JSON lines file
+    StatsFile = os.getenv("TEST_STATS_FILE")
+    if StatsFile != None:
+        with open(StatsFile, "a") as sf:
+            sf.write(StatsLine + "\n")
+
+if (ExpectedResult != ResultCode):
+    print("test failed, expected is", ExpectedResult, "but got", ResultCode)
 
     if (known_failures.get(test_name)):
         print("Passing because it was expected to fail")
         # failed and expected to fail -- pass the test
+        EmitStats(True)
         sys.exit(0)
     else:
         # failed and unexpected to fail -- fail the test
+        EmitStats(False)
         sys.exit(1)
 else:
     print("test passed with", ResultCode)
     if (known_failures.get(test_name)):
         print("Failing because it was expected to fail")
         # passed and expected to fail -- fail the test
+        EmitStats(False)
         sys.exit(1)
     else:
         # passed and expected to pass -- pass the test
+        EmitStats(True)
         sys.exit(0)
-
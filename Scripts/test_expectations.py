@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+import atexit
+import os
+import stat
+import sys
+import zlib
+
+# Shared loader for the Known_Failures, Disabled_Tests, Expected_Output, Flake_Tests and Timeouts lists.
+# Parsed lists are kept in an index keyed by each file's name, mtime and size.
+# The index is sharded per suite folder, a runner only reads the shard of the folder its lists are in.
+# Runners only re-parse a list when it changed on disk, everything else is a dict lookup.
+# Shards are plain tab separated lines, a runner's startup is dominated by imports so json and friends are avoided.
+
+# Args: <unittests folder> [Cache folder]
+# Compiles every expectation list in every suite of the unittests folder in to the index.
+
+# The index folder can be overridden with the TEST_EXPECTATIONS_CACHE environment variable
+# By default it lives in a private fex-emu folder in the user's cache directory
+DefaultCacheDir = os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "fex-emu", "test-expectations")
+
+# Bump when the parsed format changes so stale indexes get thrown away
+IndexVersion = 4
+
+ExpectationPrefixes = ["Known_Failures", "Disabled_Tests", "Expected_Output", "Flake_Tests", "Timeouts"]
+# Lists of "<test> <value>" pairs rather than plain test names
+ResultPrefixes = ["Expected_Output", "Timeouts"]
+
+# Suite folder to its shard of the index, loaded on first use
+Shards = {}
+DirtyShards = set()
+
+def GetCacheDir():
+    return os.getenv("TEST_EXPECTATIONS_CACHE", DefaultCacheDir)
+
+def GetShardFile(SuiteFolder):
+    # The folder is checked against the shard's header, a name collision only costs a rebuild
+    return os.path.join(GetCacheDir(), "{}-{:08x}".format(os.path.basename(SuiteFolder), zlib.crc32(SuiteFolder.encode("utf-8", "surrogateescape"))))
+
+# Only trust paths that belong to us and that nobody else can write to
+def IsPrivate(Stat):
+    return Stat.st_uid == os.getuid() and (Stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)) == 0
+
+def MakePrivateDir(Dir):
+    try:
+        os.makedirs(Dir, mode = 0o700)
+    except FileExistsError:
+        pass
+
+    return IsPrivate(os.stat(Dir))
+
+def LoadShard(SuiteFolder):
+    Shard = Shards.get(SuiteFolder)
+    if Shard != None:
+        return Shard
+
+    if len(Shards) == 0:
+        atexit.register(SaveIndex)
+
+    Shard = {}
+    try:
+        with open(GetShardFile(SuiteFolder), "r", encoding = "utf-8", errors = "surrogateescape") as ShardFile:
+            if IsPrivate(os.fstat(ShardFile.fileno())) and ShardFile.readline() == "{}\t{}\n".format(IndexVersion, SuiteFolder):
+                # "=<file>\t<mtime>\t<size>\t<parser>" starts a list, followed by its "+<test>\t<value>" lines
+                Tests = None
+                for Line in ShardFile:
+                    Line = Line[:-1]
+                    if Line.startswith("="):
+                        Name, MTime, Size, Parser = Line[1:].split("\t")
+                        Tests = {}
+                        Shard[Name] = ((int(MTime), int(Size), Parser), Tests)
+                    else:
+                        Test, _, Value = Line[1:].rpartition("\t")
+                        Tests[Test] = int(Value)
+    except Exception:
+        # Missing or corrupt shard, it just gets rebuilt
+        Shard = {}
+
+    Shards[SuiteFolder] = Shard
+    return Shard
+
+def SaveShard(SuiteFolder):
+    # Only needed when something changed, keep them off the common path
+    import tempfile
+
+    CacheDir = GetCacheDir()
+    TempFile = None
+    try:
+        if not MakePrivateDir(CacheDir):
+            return
+
+        # Multiple runners can race on this, write a temporary and atomically replace
+        FD, TempFile = tempfile.mkstemp(dir = CacheDir)
+        with os.fdopen(FD, "w", encoding = "utf-8", errors = "surrogateescape") as ShardFile:
+            ShardFile.write("{}\t{}\n".format(IndexVersion, SuiteFolder))
+            for Name, (Stamp, Tests) in sorted(Shards[SuiteFolder].items()):
+                ShardFile.write("={}\t{}\t{}\t{}\n".format(Name, *Stamp))
+                ShardFile.writelines("+{}\t{}\n".format(Test, Value) for Test, Value in Tests.items())
+        os.replace(TempFile, GetShardFile(SuiteFolder))
+        TempFile = None
+        DirtyShards.discard(SuiteFolder)
+    except OSError:
+        # The index is only an optimization
+        pass
+    finally:
+        if TempFile != None:
+            try:
+                os.unlink(TempFile)
+            except OSError:
+                pass
+
+def SaveIndex():
+    for SuiteFolder in sorted(DirtyShards):
+        SaveShard(SuiteFolder)
+
+def ParseTestsFile(File):
+    Dict = {}
+    with open(File) as dtf:
+        for line in dtf:
+            test = line.split("#")[0].strip() # remove comments and empty spaces
+            if len(test) > 0:
+                Dict[test] = 1
+
+    return Dict
+
+def ParseTestsFileResults(File):
+    Dict = {}
+    with open(File) as dtf:
+        for line in dtf:
+            test = line.split("#")[0].strip() # remove comments and empty spaces
+            if len(test) > 0:
+                parts = test.split()
+                Dict[parts[0]] = int(parts[1])
+
+    return Dict
+
+# Returned dictionaries are shared with the index and must not be modified
+def LoadCached(File, Parser):
+    try:
+        Stat = os.stat(File)
+    except OSError:
+        return {}
+
+    SuiteFolder, Name = os.path.split(os.path.abspath(File))
+    Files = LoadShard(SuiteFolder)
+    Stamp = (Stat.st_mtime_ns, Stat.st_size, Parser.__name__)
+
+    Entry = Files.get(Name)
+    if Entry == None or Entry[0] != Stamp:
+        Entry = (Stamp, Parser(File))
+        Files[Name] = Entry
+        DirtyShards.add(SuiteFolder)
+
+    return Entry[1]
+
+# Returns a dictionary of test names listed in the file, empty if the file doesn't exist
+def LoadTestsFile(File):
+    return LoadCached(File, ParseTestsFile)
+
+# Returns a dictionary of test name to its integer value, empty if the file doesn't exist
+def LoadTestsFileResults(File):
+    return LoadCached(File, ParseTestsFileResults)
+
+def CompileSuites(UnitTestsFolder):
+    Count = 0
+    for Suite in sorted(os.listdir(UnitTestsFolder)):
+        SuiteFolder = os.path.join(UnitTestsFolder, Suite)
+        if not os.path.isdir(SuiteFolder):
+            continue
+
+        for File in sorted(os.listdir(SuiteFolder)):
+            Path = os.path.join(SuiteFolder, File)
+            if any(File.startswith(Prefix) for Prefix in ResultPrefixes):
+                LoadTestsFileResults(Path)
+            elif any(File.startswith(Prefix) for Prefix in ExpectationPrefixes):
+                LoadTestsFile(Path)
+            else:
+                continue
+            Count += 1
+
+    return Count
+
+def main():
+    if (len(sys.argv) < 2):
+        sys.exit("Usage: {} <unittests folder> [Cache folder]".format(sys.argv[0]))
+
+    if (len(sys.argv) > 2):
+        os.environ["TEST_EXPECTATIONS_CACHE"] = sys.argv[2]
+
+    Count = CompileSuites(sys.argv[1])
+    SaveIndex()
+    print("Compiled {} expectation lists in to {}".format(Count, GetCacheDir()))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
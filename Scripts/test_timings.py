@@ -0,0 +1,352 @@
+#!/usr/bin/python3
+import glob
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Historical per-test resource usage shared by all the test runners.
+# Every run appends wall time, CPU time, max RSS, page faults, context switches and exit code to a local SQLite database.
+# Schedulers use the history to start the longest tests first.
+
+# Args: [--flakes] [Suite] [Count]
+# Prints the slowest tests recorded in the database, or with --flakes the tests with the highest flake score.
+# Args: --ctest-costs <Build folder> <ctest regex>
+# Seeds ctest's cost data with the recorded durations of the matching guest_test_runner.py tests.
+
+# The database location can be overridden with the TEST_TIMINGS_DB environment variable
+DefaultDatabaseFile = os.path.join(tempfile.gettempdir(), "fex-test-timings-{}.sqlite".format(os.getuid()))
+
+# Only the most recent runs of a test are used for estimates
+HistoryLength = 8
+# Flakes are rarer than slow runs, look further back for them
+FlakeHistoryLength = 32
+
+# rusage fields and outcome stored alongside the base timings
+ExtraColumns = ["MajorFaults", "MinorFaults", "VoluntaryCS", "InvoluntaryCS", "Passed"]
+
+Connection = None
+# Runners with worker threads share the one connection
+DatabaseLock = threading.Lock()
+
+def GetDatabaseFile():
+    return os.getenv("TEST_TIMINGS_DB", DefaultDatabaseFile)
+
+def OpenDatabase():
+    global Connection
+    if Connection != None:
+        return Connection
+
+    # Lots of runners write concurrently, wait on the lock instead of failing
+    Connection = sqlite3.connect(GetDatabaseFile(), timeout = 60, check_same_thread = False)
+    Connection.execute("PRAGMA journal_mode=WAL")
+    Connection.execute("""CREATE TABLE IF NOT EXISTS Runs (
+        Suite TEXT NOT NULL,
+        Test TEXT NOT NULL,
+        Variant TEXT NOT NULL,
+        Timestamp REAL NOT NULL,
+        Wall REAL NOT NULL,
+        User REAL NOT NULL,
+        Sys REAL NOT NULL,
+        MaxRSS INTEGER NOT NULL,
+        ExitCode INTEGER NOT NULL)""")
+
+    # Columns added after the initial schema, older databases get them appended
+    Columns = [Row[1] for Row in Connection.execute("PRAGMA table_info(Runs)")]
+    for Column in ExtraColumns:
+        if not Column in Columns:
+            Connection.execute("ALTER TABLE Runs ADD COLUMN {} INTEGER NOT NULL DEFAULT 0".format(Column))
+            if Column == "Passed":
+                # Best guess for runs recorded before the outcome was stored
+                Connection.execute("UPDATE Runs SET Passed = (ExitCode = 0)")
+
+    Connection.execute("CREATE INDEX IF NOT EXISTS RunsByTest ON Runs (Suite, Test, Variant)")
+    Connection.commit()
+    return Connection
+
+# Suite name is the folder holding the suite's expectation lists, ie: ASM, POSIX, gvisor-tests
+def SuiteFromFile(File):
+    return os.path.basename(os.path.dirname(os.path.abspath(File)))
+
+# Timing database key of a guest_test_runner.py invocation, from the arguments after the script.
+# The FEX options identify the variant of the test.
+def GuestRunnerKey(Args):
+    FEXArgs = Args[7:]
+    if "--" in FEXArgs:
+        FEXArgs = FEXArgs[:FEXArgs.index("--")]
+    return [SuiteFromFile(Args[0]), Args[4], " ".join([Args[5]] + FEXArgs)]
+
+# Runs a process to completion while collecting its resource usage.
+# Returns [Process, Wall, rusage]. rusage is None if the process is still running after Timeout seconds.
+def RunWithUsage(Args, Timeout = None, **Kwargs):
+    Start = time.monotonic()
+    Process = subprocess.Popen(Args, **Kwargs)
+    WaitForUsage(Process, Start, Timeout)
+    return [Process, time.monotonic() - Start, Process.rusage]
+
+# Reaps the process with wait4 so its rusage is available, Popen.wait would throw it away.
+def WaitForUsage(Process, Start, Timeout = None):
+    Process.rusage = None
+    Delay = 0.0005
+    while True:
+        Pid, Status, Usage = os.wait4(Process.pid, 0 if Timeout == None else os.WNOHANG)
+        if Pid != 0:
+            break
+
+        Remaining = Timeout - (time.monotonic() - Start)
+        if Remaining <= 0:
+            return False
+
+        time.sleep(min(Delay, Remaining))
+        Delay = min(Delay * 2, 0.05)
+
+    if os.WIFSIGNALED(Status):
+        Process.returncode = -os.WTERMSIG(Status)
+    else:
+        Process.returncode = os.WEXITSTATUS(Status)
+
+    Process.rusage = Usage
+    return True
+
+def ReadProcFile(File):
+    try:
+        with open(File) as pf:
+            return pf.read().strip()
+    except OSError as e:
+        # Kernel stacks need root, the process might also be gone already
+        return "<{}>".format(e.strerror)
+
+# Returns every pid in the process group, children that forked off stay in the group
+def ProcessGroupPids(ProcessGroup):
+    Pids = []
+    for Stat in glob.glob("/proc/[0-9]*/stat"):
+        Fields = ReadProcFile(Stat)
+        # comm can contain spaces, fields after it are space separated. pgrp is the third one after comm
+        Fields = Fields[Fields.rfind(")") + 2:].split(" ")
+        if len(Fields) > 2 and Fields[2] == str(ProcessGroup):
+            Pids.append(int(Stat.split("/")[2]))
+
+    return sorted(Pids)
+
+# Prints the wchan and kernel stack of every thread in the process group
+def DumpProcessGroupStacks(ProcessGroup):
+    for Pid in ProcessGroupPids(ProcessGroup):
+        print("Process {}: {}".format(Pid, ReadProcFile("/proc/{}/cmdline".format(Pid)).replace("\0", " ")))
+        for Task in sorted(glob.glob("/proc/{}/task/*".format(Pid))):
+            print("  Thread {} ({}) wchan: {}".format(
+                os.path.basename(Task),
+                ReadProcFile(Task + "/comm"),
+                ReadProcFile(Task + "/wchan")))
+            for Line in ReadProcFile(Task + "/stack").splitlines():
+                print("    " + Line)
+
+def KillProcessGroup(Process):
+    try:
+        os.killpg(Process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+# Converts a run in to the dictionary emitted by the runners' structured output
+def UsageToDict(Wall, Usage):
+    Stats = {
+        "Wall": Wall,
+        "User": 0.0,
+        "Sys": 0.0,
+        "MaxRSS": 0,
+        "MajorFaults": 0,
+        "MinorFaults": 0,
+        "VoluntaryCS": 0,
+        "InvoluntaryCS": 0,
+    }
+
+    if Usage != None:
+        Stats["User"] = Usage.ru_utime
+        Stats["Sys"] = Usage.ru_stime
+        Stats["MaxRSS"] = Usage.ru_maxrss
+        Stats["MajorFaults"] = Usage.ru_majflt
+        Stats["MinorFaults"] = Usage.ru_minflt
+        Stats["VoluntaryCS"] = Usage.ru_nvcsw
+        Stats["InvoluntaryCS"] = Usage.ru_nivcsw
+
+    return Stats
+
+# Passed is whether the run had the expected result, before any known failure inversion
+def RecordRun(Suite, Test, Variant, Wall, Usage, ExitCode, Passed = None):
+    Stats = UsageToDict(Wall, Usage)
+    if Passed == None:
+        Passed = ExitCode == 0
+
+    try:
+        with DatabaseLock:
+            DB = OpenDatabase()
+            DB.execute("""INSERT INTO Runs
+                (Suite, Test, Variant, Timestamp, Wall, User, Sys, MaxRSS, ExitCode, MajorFaults, MinorFaults, VoluntaryCS, InvoluntaryCS, Passed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (Suite, Test, Variant, time.time(), Wall, Stats["User"], Stats["Sys"], Stats["MaxRSS"], ExitCode,
+                 Stats["MajorFaults"], Stats["MinorFaults"], Stats["VoluntaryCS"], Stats["InvoluntaryCS"], int(Passed)))
+            DB.commit()
+    except sqlite3.Error as e:
+        # Timings are only used for scheduling, never fail a test because of them
+        print("Couldn't record test timing:", e, file = sys.stderr)
+
+# Returns the average wall time of the most recent runs for a test, None if it has never run
+def ExpectedDuration(Suite, Test, Variant):
+    try:
+        with DatabaseLock:
+            Row = OpenDatabase().execute("""SELECT AVG(Wall) FROM (
+                SELECT Wall FROM Runs WHERE Suite = ? AND Test = ? AND Variant = ?
+                ORDER BY Timestamp DESC LIMIT ?)""", (Suite, Test, Variant, HistoryLength)).fetchone()
+    except sqlite3.Error:
+        return None
+
+    return Row[0]
+
+# Returns how often the outcome of a test flipped between its recent runs.
+# 0.0 is a test that always passes or always fails, 1.0 alternates on every run.
+# A single flip is what a regression or a fix looks like, so it takes at least two to score above 0.0.
+# None if there isn't enough history to tell.
+def FlakeScore(Suite, Test, Variant):
+    try:
+        with DatabaseLock:
+            Rows = OpenDatabase().execute("""SELECT Passed FROM Runs WHERE Suite = ? AND Test = ? AND Variant = ?
+                ORDER BY Timestamp DESC LIMIT ?""", (Suite, Test, Variant, FlakeHistoryLength)).fetchall()
+    except sqlite3.Error:
+        return None
+
+    if len(Rows) < 2:
+        return None
+
+    Flips = 0
+    for i in range(1, len(Rows)):
+        if Rows[i][0] != Rows[i - 1][0]:
+            Flips += 1
+
+    if Flips < 2:
+        return 0.0
+
+    return Flips / (len(Rows) - 1)
+
+# Sorts items so the longest expected ones come first.
+# Items without any history are assumed to be slow and start before everything else.
+# Taking work from this order on a worker pool greedily packs the long tests across cores.
+def OrderLongestFirst(Items, DurationFunc):
+    def SortKey(Item):
+        Duration = DurationFunc(Item)
+        return float("inf") if Duration == None else Duration
+
+    return sorted(Items, key = SortKey, reverse = True)
+
+# `ctest -j` starts tests in order of the costs in Testing/Temporary/CTestCostData.txt, highest first.
+# Overwrite the costs of the selected guest_test_runner.py tests with their recorded durations.
+# Tests without any history get a cost above everything else, like OrderLongestFirst.
+def SeedCTestCosts(BuildDir, Regex):
+    Listing = json.loads(subprocess.check_output(["ctest", "--show-only=json-v1", "-R", Regex], cwd = BuildDir))
+
+    Durations = {}
+    for Test in Listing.get("tests", []):
+        Command = Test.get("command", [])
+        Script = [i for i, Arg in enumerate(Command) if os.path.basename(Arg) == "guest_test_runner.py"]
+        if len(Script) == 0 or len(Command) < Script[0] + 8:
+            continue
+        Durations[Test["name"]] = ExpectedDuration(*GuestRunnerKey(Command[Script[0] + 1:]))
+
+    # Keep ctest's data for every other test, along with its list of failed tests
+    CostFile = os.path.join(BuildDir, "Testing", "Temporary", "CTestCostData.txt")
+    Costs = {}
+    Failed = []
+    try:
+        with open(CostFile) as cf:
+            Lines = cf.read().splitlines()
+        if "---" in Lines:
+            Failed = Lines[Lines.index("---") + 1:]
+            Lines = Lines[:Lines.index("---")]
+        for Line in Lines:
+            Parts = Line.split()
+            if len(Parts) == 3:
+                Costs[Parts[0]] = [int(Parts[1]), float(Parts[2])]
+    except (OSError, ValueError):
+        Costs = {}
+        Failed = []
+
+    Known = [Duration for Duration in Durations.values() if Duration != None]
+    UnknownCost = max(Known + [Cost[1] for Cost in Costs.values()] + [0.0]) + 1.0
+    for Name, Duration in Durations.items():
+        if Duration != None:
+            Costs[Name] = [1, Duration]
+        elif not Name in Costs:
+            # No previous runs so ctest replaces the cost with its own measurement
+            Costs[Name] = [0, UnknownCost]
+
+    os.makedirs(os.path.dirname(CostFile), exist_ok = True)
+    with open(CostFile, "w") as cf:
+        for Name, Cost in Costs.items():
+            cf.write("{} {} {}\n".format(Name, Cost[0], Cost[1]))
+        cf.write("---\n")
+        for Name in Failed:
+            cf.write(Name + "\n")
+
+    print("Seeded ctest costs for {} tests, {} with recorded timings".format(len(Durations), len(Known)))
+
+def PrintFlakes(Suite, Count):
+    Query = "SELECT DISTINCT Suite, Test, Variant FROM Runs"
+    Params = []
+    if Suite != None:
+        Query += " WHERE Suite = ?"
+        Params.append(Suite)
+
+    Scores = []
+    for Row in OpenDatabase().execute(Query, Params).fetchall():
+        Score = FlakeScore(*Row)
+        if Score != None and Score > 0.0:
+            Scores.append([Score] + list(Row))
+
+    print("{:>6}  {}".format("Score", "Test"))
+    for Score, Suite, Test, Variant in sorted(Scores, reverse = True)[:Count]:
+        print("{:>6.2f}  {}/{} {}".format(Score, Suite, Test, Variant))
+
+def main():
+    Args = sys.argv[1:]
+    if len(Args) > 0 and Args[0] == "--ctest-costs":
+        if len(Args) < 3:
+            sys.exit("Usage: {} --ctest-costs <Build folder> <ctest regex>".format(sys.argv[0]))
+        SeedCTestCosts(Args[1], Args[2])
+        return 0
+
+    Flakes = len(Args) > 0 and Args[0] == "--flakes"
+    if Flakes:
+        Args = Args[1:]
+
+    Suite = None
+    Count = 20
+    if (len(Args) > 0):
+        Suite = Args[0]
+    if (len(Args) > 1):
+        Count = int(Args[1])
+
+    if Flakes:
+        PrintFlakes(Suite, Count)
+        return 0
+
+    Query = """SELECT Suite, Test, Variant, COUNT(*), AVG(Wall), AVG(User + Sys), MAX(MaxRSS), SUM(Passed = 0)
+        FROM Runs {} GROUP BY Suite, Test, Variant ORDER BY AVG(Wall) DESC LIMIT ?"""
+    Params = [Count]
+    if Suite != None:
+        Query = Query.format("WHERE Suite = ?")
+        Params.insert(0, Suite)
+    else:
+        Query = Query.format("")
+
+    print("{:>9} {:>9} {:>10} {:>5} {:>5}  {}".format("Wall(s)", "CPU(s)", "MaxRSS(KB)", "Runs", "Fails", "Test"))
+    for Row in OpenDatabase().execute(Query, Params):
+        Suite, Test, Variant, Runs, Wall, CPU, MaxRSS, Fails = Row
+        print("{:>9.2f} {:>9.2f} {:>10} {:>5} {:>5}  {}/{} {}".format(Wall, CPU, MaxRSS, Runs, Fails, Suite, Test, Variant))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
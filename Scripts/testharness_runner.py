@@ -1,73 +1,206 @@
 #!/usr/bin/python3
+import json
 import sys
 import subprocess
 import os.path
+import re
+import tempfile
 from os import path
 
+import test_timings
+from test_expectations import LoadTestsFile
+
 # Args: <Known Failures file> <Known Failures Type File> <DisabledTestsFile> <DisabledTestsTypeFile> <DisabledTestsRunnerFile> <TestName> <Test Harness Executable> <Args>...
+# Batch Args: --batch <Test filter regex> <Manifest>...
+# Manifest lines are tab separated, the ctest name followed by the same arguments as above.
+# Batch mode streams one JSON object per test variant to stdout.
+
+def LoadManifest(File, Filter):
+    Tests = []
+    with open(File) as mf:
+        for line in mf:
+            line = line.rstrip("\n")
+            if len(line) == 0:
+                continue
+
+            Parts = line.split("\t")
+            if len(Parts) < 8:
+                sys.exit("Malformed manifest line in {}: {}".format(File, line))
+
+            if Filter != None and not Filter.search(Parts[0]):
+                continue
+
+            Tests.append({
+                "Name": Parts[0],
+                "KnownFailures": Parts[1:3],
+                "Disabled": Parts[3:6],
+                "TestName": Parts[6],
+                "Runner": Parts[7],
+                "Args": Parts[8:],
+            })
+    return Tests
+
+# Groups manifest entries so every variant of a test binary runs as one batch
+def GroupByTest(Tests):
+    Groups = {}
+    for Test in Tests:
+        Key = (Test["TestName"], Test["Runner"])
+        if not Key in Groups:
+            Groups[Key] = []
+        Groups[Key].append(Test)
+
+    return list(Groups.values())
+
+# Timing database key for a manifest entry
+def TimingKey(Test):
+    Suite = test_timings.SuiteFromFile(Test["KnownFailures"][0])
+    # The test binary and its config are always the last two arguments
+    Variant = " ".join(Test["Args"][:-2])
+    return [Suite, Test["TestName"], Variant]
+
+def ExpectedBatchDuration(Batch):
+    Total = 0.0
+    for Test in Batch:
+        Duration = test_timings.ExpectedDuration(*TimingKey(Test))
+        if Duration == None:
+            return None
+        Total += Duration
+    return Total
+
+def RunBatch(Batch):
+    Results = []
+
+    # Work shared between variants only happens once per batch
+    InList = {}
+    def TestInList(TestName, Files):
+        for File in Files:
+            if not File in InList:
+                InList[File] = LoadTestsFile(File).get(TestName) != None
+            if InList[File]:
+                return True
+        return False
+
+    MissingFiles = [Batch[0]["Runner"]]
+    # The test binary and its config are always the last two arguments
+    MissingFiles.extend(Batch[0]["Args"][-2:])
+    MissingFiles = [File for File in MissingFiles if not path.exists(File)]
+
+    for Test in Batch:
+        Result = {
+            "Name": Test["Name"],
+            "Test": Test["TestName"],
+            "Status": "Passed",
+            "ResultCode": 0,
+            "Duration": 0.0,
+        }
+        Results.append(Result)
+
+        if TestInList(Test["TestName"], Test["Disabled"]):
+            Result["Status"] = "Skipped"
+            continue
+
+        if len(MissingFiles):
+            Result["Status"] = "Failed"
+            Result["ResultCode"] = -1
+            Result["Output"] = "Missing files: {}\n".format(", ".join(MissingFiles))
+            continue
+
+        RunnerArgs = ["catchsegv", Test["Runner"]] + Test["Args"]
+
+        OutputFile = tempfile.TemporaryFile()
+        Process, Wall, Usage = test_timings.RunWithUsage(RunnerArgs, stdout=OutputFile, stderr=subprocess.STDOUT)
+        Result["Duration"] = Wall
+        Result["ResultCode"] = Process.returncode
+        test_timings.RecordRun(*TimingKey(Test), Wall, Usage, Process.returncode)
+
+        if TestInList(Test["TestName"], Test["KnownFailures"]):
+            Passed = Process.returncode != 0
+        else:
+            Passed = Process.returncode == 0
+
+        if not Passed:
+            Result["Status"] = "Failed"
+            OutputFile.seek(0)
+            Result["Output"] = OutputFile.read().decode("utf-8", errors="replace")
+        OutputFile.close()
+
+    return Results
+
+def RunBatchMode():
+    if (len(sys.argv) < 4):
+        sys.exit("Usage: {} --batch <Test filter regex> <Manifest>...".format(sys.argv[0]))
+
+    Filter = None
+    if len(sys.argv[2]):
+        Filter = re.compile(sys.argv[2])
+
+    Tests = []
+    for Manifest in sys.argv[3:]:
+        Tests.extend(LoadManifest(Manifest, Filter))
+
+    Failed = False
+    for Batch in GroupByTest(Tests):
+        for Result in RunBatch(Batch):
+            Failed = Failed or Result["Status"] == "Failed"
+            print(json.dumps(Result), flush=True)
+
+    return 1 if Failed else 0
+
+def main():
+    if (len(sys.argv) > 1 and sys.argv[1] == "--batch"):
+        return RunBatchMode()
+
+    if (len(sys.argv) < 7):
+        return 0
+
+    known_failures_file = sys.argv[1]
+    known_failures_type_file = sys.argv[2]
+    disabled_tests_file = sys.argv[3]
+    disabled_tests_type_file = sys.argv[4]
+    disabled_tests_runner_file = sys.argv[5]
+
+    current_test = sys.argv[6]
+    runner = sys.argv[7]
+    args_start_index = 8
+
+    # Load the known failures and disabled tests in to dictionaries
+    known_failures = {}
+    known_failures.update(LoadTestsFile(known_failures_file))
+    known_failures.update(LoadTestsFile(known_failures_type_file))
+
+    disabled_tests = {}
+    disabled_tests.update(LoadTestsFile(disabled_tests_file))
+    disabled_tests.update(LoadTestsFile(disabled_tests_type_file))
+    disabled_tests.update(LoadTestsFile(disabled_tests_runner_file))
+
+    RunnerArgs = ["catchsegv", runner]
+    # Add the rest of the arguments
+    for i in range(len(sys.argv) - args_start_index):
+        RunnerArgs.append(sys.argv[args_start_index + i])
+
+    if (disabled_tests.get(current_test)):
+        print("Skipping", current_test)
+        return 0
+
+    # Run the test and wait for it to end to get the result
+    Process, Wall, Usage = test_timings.RunWithUsage(RunnerArgs)
+    ResultCode = Process.returncode
+
+    # The test binary and its config are always the last two arguments
+    Variant = " ".join(sys.argv[args_start_index:-2])
+    test_timings.RecordRun(test_timings.SuiteFromFile(known_failures_file), current_test, Variant, Wall, Usage, ResultCode)
 
-if (len(sys.argv) < 7):
-    sys.exit()
-
-known_failures = {}
-disabled_tests = {}
-known_failures_file = sys.argv[1]
-known_failures_type_file = sys.argv[2]
-disabled_tests_file = sys.argv[3]
-disabled_tests_type_file = sys.argv[4]
-disabled_tests_runner_file = sys.argv[5]
-
-current_test = sys.argv[6]
-runner = sys.argv[7]
-args_start_index = 8
-
-# Open the known failures file and add it to a dictionary
-with open(known_failures_file) as kff:
-    for line in kff:
-        known_failures[line.strip()] = 1
-
-if path.exists(known_failures_type_file):
-    with open(known_failures_type_file) as dtf:
-        for line in dtf:
-            known_failures[line.strip()] = 1
-
-with open(disabled_tests_file) as dtf:
-    for line in dtf:
-        disabled_tests[line.strip()] = 1
-
-if path.exists(disabled_tests_type_file):
-    with open(disabled_tests_type_file) as dtf:
-        for line in dtf:
-            disabled_tests[line.strip()] = 1
-
-if path.exists(disabled_tests_runner_file):
-    with open(disabled_tests_runner_file) as dtf:
-        for line in dtf:
-            disabled_tests[line.strip()] = 1
-
-RunnerArgs = ["catchsegv", runner]
-# Add the rest of the arguments
-for i in range(len(sys.argv) - args_start_index):
-    RunnerArgs.append(sys.argv[args_start_index + i])
-
-if (disabled_tests.get(current_test)):
-    print("Skipping", current_test)
-    sys.exit(0)
-
-# Run the test and wait for it to end to get the result
-Process = subprocess.Popen(RunnerArgs)
-Process.wait()
-ResultCode = Process.returncode
-
-if (known_failures.get(current_test)):
-    # If the test is on the known failures list
-    if (ResultCode):
-        # If we errored but are on the known failures list then "pass" the test
-        sys.exit(0)
+    if (known_failures.get(current_test)):
+        # If the test is on the known failures list
+        if (ResultCode):
+            # If we errored but are on the known failures list then "pass" the test
+            return 0
+        else:
+            # If we didn't error but are in the known failure list then we need to fail the test
+            return 1
     else:
-        # If we didn't error but are in the known failure list then we need to fail the test
-        sys.exit(1)
-else:
-    # Just return the result code if we don't have this test as a known failure
-    sys.exit(ResultCode);
+        # Just return the result code if we don't have this test as a known failure
+        return ResultCode
 
+if __name__ == "__main__":
+    sys.exit(main())
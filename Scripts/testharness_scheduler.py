@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import test_timings
+import testharness_runner
+
+# Long lived replacement for spawning testharness_runner.py once per test.
+# Expectation lists are loaded once and shared by every test in the manifest.
+# All variants of a test binary run as one batch on a single worker.
+# Batches are started longest first based on the timings of previous runs.
+
+# Args: [--json <Results file>] <Worker count> <Test filter regex> <Manifest>...
+# Manifest format is documented in testharness_runner.py
+# With --json every result is also streamed to the results file as one JSON object per line.
+
+def main():
+    Args = sys.argv[1:]
+    ResultsFile = None
+    if (len(Args) > 1 and Args[0] == "--json"):
+        ResultsFile = open(Args[1], "w")
+        Args = Args[2:]
+
+    if (len(Args) < 3):
+        sys.exit("Usage: {} [--json <Results file>] <Worker count> <Test filter regex> <Manifest>...".format(sys.argv[0]))
+
+    WorkerCount = int(Args[0])
+    if WorkerCount <= 0:
+        WorkerCount = os.cpu_count()
+
+    Filter = None
+    if len(Args[1]):
+        Filter = re.compile(Args[1])
+
+    Tests = []
+    for Manifest in Args[2:]:
+        Tests.extend(testharness_runner.LoadManifest(Manifest, Filter))
+
+    # Load every expectation file up front so the workers only ever read the cache
+    for Test in Tests:
+        for File in Test["KnownFailures"] + Test["Disabled"]:
+            testharness_runner.LoadTestsFile(File)
+
+    TestCount = len(Tests)
+    Failures = []
+    Completed = 0
+    Start = time.monotonic()
+
+    Batches = test_timings.OrderLongestFirst(testharness_runner.GroupByTest(Tests), testharness_runner.ExpectedBatchDuration)
+
+    with ThreadPoolExecutor(max_workers = WorkerCount) as Executor:
+        Futures = [Executor.submit(testharness_runner.RunBatch, Batch) for Batch in Batches]
+        for Future in as_completed(Futures):
+            for Result in Future.result():
+                Completed += 1
+                if Result["Status"] == "Failed":
+                    # Only dump output of failing tests to keep the log readable
+                    sys.stdout.write(Result["Output"])
+                    Failures.append([Result["Name"], Result["ResultCode"]])
+
+                print("{:>5}/{} {:<8} {} ({:.2f}s)".format(Completed, TestCount, Result["Status"], Result["Name"], Result["Duration"]))
+
+                if ResultsFile != None:
+                    ResultsFile.write(json.dumps(Result) + "\n")
+                    ResultsFile.flush()
+
+    if ResultsFile != None:
+        ResultsFile.close()
+
+    PassPercent = 100.0
+    if TestCount != 0:
+        PassPercent = 100.0 * (TestCount - len(Failures)) / TestCount
+
+    print("\n{:.0f}% tests passed, {} tests failed out of {} in {:.2f}s".format(PassPercent, len(Failures), TestCount, time.monotonic() - Start))
+    if len(Failures):
+        print("\nThe following tests FAILED:")
+        for Name, ResultCode in Failures:
+            print("\t{} ({})".format(Name, hex(ResultCode)))
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,8 +33,6 @@ namespace FEX::ArgLoader {
 
     optparse::Values Options = Parser.parse_args(argc, argv);
 
-    using int32 = int32_t;
-    using uint32 = uint32_t;
 #define AFTER_PARSE
 #include <FEXCore/Config/ConfigOptions.inl>
     RemainingArgs = Parser.args();
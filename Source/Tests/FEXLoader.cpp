@@ -226,10 +226,11 @@ int main(int argc, char **argv, char **const envp) {
   FEXCore::Config::Set(FEXCore::Config::CONFIG_IS_INTERPRETER, IsInterpreter ? "1" : "0");
   FEXCore::Config::Set(FEXCore::Config::CONFIG_INTERPRETER_INSTALLED, IsInterpreterInstalled() ? "1" : "0");
 
+  const auto &TypedConfig = FEXCore::Config::GetTypedValues();
+
   // Early check for process stall
   // Doesn't use CONFIG_ROOTFS and we don't want it to spin up a squashfs instance
-  FEX_CONFIG_OPT(StallProcess, STALLPROCESS);
-  if (StallProcess) {
+  if (TypedConfig.GetStallProcess()) {
     while (1) {
       // Stall this process out forever
       select(0, nullptr, nullptr, nullptr, nullptr);
@@ -242,22 +243,20 @@ int main(int argc, char **argv, char **const envp) {
     return -1;
   }
 
-  FEX_CONFIG_OPT(SilentLog, SILENTLOG);
-  FEX_CONFIG_OPT(AOTIRCapture, AOTIRCAPTURE);
-  FEX_CONFIG_OPT(AOTIRGenerate, AOTIRGENERATE);
-  FEX_CONFIG_OPT(AOTIRLoad, AOTIRLOAD);
-  FEX_CONFIG_OPT(OutputLog, OUTPUTLOG);
+  const bool AOTIRCapture = TypedConfig.GetAOTIRCapture();
+  const bool AOTIRGenerate = TypedConfig.GetAOTIRGenerate();
+  const bool AOTIRLoad = TypedConfig.GetAOTIRLoad();
   FEX_CONFIG_OPT(LDPath, ROOTFS);
   FEX_CONFIG_OPT(Environment, ENV);
   FEX_CONFIG_OPT(HostEnvironment, HOSTENV);
-  ::SilentLog = SilentLog();
+  ::SilentLog = TypedConfig.GetSilentLog();
 
   if (::SilentLog) {
     LogMan::Throw::UnInstallHandlers();
     LogMan::Msg::UnInstallHandlers();
   }
   else {
-    auto LogFile = OutputLog();
+    auto LogFile = TypedConfig.GetOutputLog();
     // If stderr or stdout then we need to dup the FD
     // In some cases some applications will close stderr and stdout
     // then redirect the FD to either a log OR some cases just not use
@@ -442,7 +441,7 @@ int main(int argc, char **argv, char **const envp) {
     });
   }
 
-  const bool AOTEnabled = AOTIRLoad() || AOTIRCapture() || AOTIRGenerate();
+  const bool AOTEnabled = AOTIRLoad || AOTIRCapture || AOTIRGenerate;
   if (AOTEnabled) {
     LogMan::Msg::IFmt("Warning: AOTIR is experimental, and might lead to crashes. "
                       "Capture doesn't work with programs that fork.");
@@ -475,7 +474,7 @@ int main(int argc, char **argv, char **const envp) {
     });
   }
 
-  if (AOTIRGenerate()) {
+  if (AOTIRGenerate) {
     for(auto &Section: Loader.Sections) {
       FEX::AOT::AOTGenSection(CTX, Section);
     }
@@ -496,7 +495,7 @@ int main(int argc, char **argv, char **const envp) {
       });
     }
 
-    if (AOTIRCapture() || AOTIRGenerate()) {
+    if (AOTIRCapture || AOTIRGenerate) {
       FEXCore::Context::FinalizeAOTIRCache(CTX);
       LogMan::Msg::IFmt("AOTIR Cache Stored");
     }
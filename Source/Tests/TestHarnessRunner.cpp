@@ -23,6 +23,7 @@ $end_info$
 #include <FEXCore/Utils/Allocator.h>
 #include <FEXCore/Utils/LogManager.h>
 
+#include <array>
 #include <csetjmp>
 #include <cstdint>
 #include <errno.h>
@@ -67,10 +68,8 @@ void AssertHandler(char const *Message) {
 }
 
 namespace {
-static const std::vector<std::pair<const char*, FEXCore::Config::ConfigOption>> EnvConfigLookup = {{
-#define OPT_BASE(type, group, enum, json, default) {"FEX_" #enum, FEXCore::Config::ConfigOption::CONFIG_##enum},
-#include <FEXCore/Config/ConfigValues.inl>
-}};
+#define ENVLOADER_TABLE
+#include <FEXCore/Config/ConfigOptions.inl>
 
 // Claims to be a local application config layer
 class TestEnvLoader final : public FEXCore::Config::Layer {
@@ -82,29 +81,12 @@ public:
   }
 
   void Load() override {
-    std::unordered_map<std::string_view, std::string_view> EnvMap;
     for (auto &Option : Env) {
       std::string_view Key = Option.first;
       std::string_view Value = Option.second;
 
 #define ENVLOADER
 #include <FEXCore/Config/ConfigOptions.inl>
-
-      EnvMap.insert_or_assign(Key, Value);
-    }
-
-    auto GetVar = [&](const std::string_view id) -> std::optional<std::string_view> {
-      const auto it = EnvMap.find(id);
-      if (it == EnvMap.end())
-        return std::nullopt;
-
-      return it->second;
-    };
-
-    for (auto &it : EnvConfigLookup) {
-      if (auto Value = GetVar(it.first); Value) {
-        Set(it.second, *Value);
-      }
     }
   }
 